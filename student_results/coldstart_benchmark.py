@@ -0,0 +1,110 @@
+"""
+Cold-start benchmark for the WSGI entry point.
+
+Each run starts a fresh interpreter with ``-X importtime`` that imports
+student_results.wsgi (as the Vercel lambda does) and serves one request, then
+reports import time, first-request latency and the slowest imports.
+
+Usage:
+    python coldstart_benchmark.py [--settings student_results.settings_production]
+                                  [--path /] [--runs 5] [--top 15]
+
+Set DATABASE_URL to benchmark against a real database; the first request
+includes opening the database connection.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+
+CHILD = r'''
+import json, sys, time
+started = time.perf_counter()
+from student_results.wsgi import application
+imported = time.perf_counter()
+
+def start_response(status, headers, exc_info=None):
+    start_response.status = status
+
+environ = {
+    'REQUEST_METHOD': 'GET', 'PATH_INFO': sys.argv[1], 'QUERY_STRING': '',
+    'SERVER_NAME': 'localhost', 'SERVER_PORT': '80', 'HTTP_HOST': 'localhost',
+    'wsgi.url_scheme': 'http', 'wsgi.input': sys.stdin.buffer, 'wsgi.errors': sys.stderr,
+}
+body = b''.join(application(environ, start_response))
+served = time.perf_counter()
+print(json.dumps({
+    'import_ms': (imported - started) * 1000,
+    'first_request_ms': (served - imported) * 1000,
+    'status': start_response.status,
+    'bytes': len(body),
+}))
+'''
+
+
+def parse_importtime(stderr):
+    """Return {module: cumulative microseconds} for every imported module"""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        modules[name.strip()] = int(cumulative)
+    return modules
+
+
+def run_once(settings, path):
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE=settings, PYTHONDONTWRITEBYTECODE='0')
+    env.setdefault('ALLOWED_HOSTS', 'localhost')
+    # The production settings refuse to start without one
+    env.setdefault('DJANGO_SECRET_KEY', 'coldstart-benchmark')
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', CHILD, path],
+        cwd=Path(__file__).resolve().parent,
+        env=env,
+        capture_output=True,
+        text=True,
+        stdin=subprocess.DEVNULL,
+    )
+    if completed.returncode != 0:
+        sys.exit(completed.stderr)
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    result['imports'] = parse_importtime(completed.stderr)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--settings', default=os.environ.get('DJANGO_SETTINGS_MODULE', 'student_results.settings'))
+    parser.add_argument('--path', default='/')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=15)
+    args = parser.parse_args()
+    
+    runs = [run_once(args.settings, args.path) for _ in range(args.runs)]
+    
+    print(f'Settings: {args.settings}   path: {args.path}   status: {runs[-1]["status"]}   runs: {args.runs}')
+    for key, label in [('import_ms', 'import wsgi'), ('first_request_ms', 'first request')]:
+        values = [run[key] for run in runs]
+        print(f'  {label:<14} median {statistics.median(values):8.1f} ms   max {max(values):8.1f} ms')
+    
+    print(f'\nSlowest imports (median cumulative ms over {args.runs} runs):')
+    names = set().union(*(run['imports'] for run in runs))
+    medians = {
+        name: statistics.median(run['imports'].get(name, 0) for run in runs) / 1000
+        for name in names
+    }
+    for name, ms in sorted(medians.items(), key=lambda item: item[1], reverse=True)[:args.top]:
+        print(f'  {ms:8.1f} ms  {name}')
+    
+    for heavy in ('PIL', 'django.contrib.admin', 'psycopg2', 'psycopg'):
+        loaded = any(name == heavy or name.startswith(heavy + '.') for name in names)
+        print(f'  {heavy:<22} {"imported" if loaded else "not imported"}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,182 @@
+"""
+Concurrency benchmark: requests/sec of the WSGI and ASGI deployments.
+
+Starts gunicorn with ``gunicorn.conf.py`` twice -- threaded sync workers on
+``student_results.wsgi``, then uvicorn workers on ``student_results.asgi``
+(async read views) -- and drives each with ``--concurrency`` client threads
+for ``--duration`` seconds per level, reporting throughput, latency
+percentiles and errors side by side.
+
+The page and fragment caches are replaced by DummyCache unless ``--with-cache``
+is given, so every request reaches the database. The async views pay off when
+queries wait on the network: benchmark against PostgreSQL (ideally a remote
+one), not SQLite.
+
+Usage:
+    DATABASE_URL=postgres://... python concurrency_benchmark.py \\
+        [--workers 2] [--threads 4] [--concurrency 8 --concurrency 64] [--duration 10]
+        [--path / --path /courses/] [--output run.json]
+
+Needs a migrated database with some data (see populate_data.py) and the
+uvicorn-worker package.
+"""
+import argparse
+import http.client
+import json
+import os
+import signal
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+
+BASE_DIR = Path(__file__).resolve().parent
+
+SERVERS = {
+    'wsgi': ('student_results.wsgi', {}),
+    'asgi': ('student_results.asgi', {'GUNICORN_ASGI': '1'}),
+}
+
+
+def start_server(mode, port, options):
+    module, extra_env = SERVERS[mode]
+    env = {
+        **os.environ,
+        **extra_env,
+        'GUNICORN_BIND': f'127.0.0.1:{port}',
+        'GUNICORN_WORKERS': str(options.workers),
+        'GUNICORN_THREADS': str(options.threads),
+        'ALLOWED_HOSTS': 'localhost',
+    }
+    if not options.with_cache:
+        env['CACHE_BACKEND'] = 'django.core.cache.backends.dummy.DummyCache'
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', module],
+        cwd=BASE_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+    )
+    
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise SystemExit(f'{mode} server exited:\n{process.stderr.read().decode()}')
+        try:
+            status, _ = fetch(http.client.HTTPConnection('127.0.0.1', port, timeout=5), options.paths[0])
+            if status == 200:
+                return process
+        except OSError:
+            time.sleep(0.2)
+    process.kill()
+    raise SystemExit(f'{mode} server did not answer on port {port}')
+
+
+def stop_server(process):
+    process.send_signal(signal.SIGTERM)
+    try:
+        process.wait(timeout=15)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+def fetch(connection, path):
+    connection.request('GET', path, headers={'Host': 'localhost'})
+    response = connection.getresponse()
+    body = response.read()
+    return response.status, len(body)
+
+
+def run_load(port, paths, concurrency, duration):
+    """Hammer the server from ``concurrency`` threads, each on a keep-alive connection"""
+    timings, errors = [], []
+    lock = threading.Lock()
+    stop_at = time.monotonic() + duration
+    
+    def client(offset):
+        connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+        local_timings, local_errors, index = [], [], offset
+        while time.monotonic() < stop_at:
+            path = paths[index % len(paths)]
+            index += 1
+            started = time.perf_counter()
+            try:
+                status, _ = fetch(connection, path)
+            except (OSError, http.client.HTTPException) as error:
+                local_errors.append(repr(error))
+                connection.close()
+                connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+                continue
+            if status != 200:
+                local_errors.append(f'{path}: {status}')
+            local_timings.append((time.perf_counter() - started) * 1000)
+        connection.close()
+        with lock:
+            timings.extend(local_timings)
+            errors.extend(local_errors)
+    
+    threads = [threading.Thread(target=client, args=(offset,)) for offset in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    
+    quantiles = statistics.quantiles(timings, n=100, method='inclusive') if len(timings) > 1 else [0] * 99
+    return {
+        'requests': len(timings),
+        'requests_per_second': round(len(timings) / elapsed, 1),
+        'p50_ms': round(quantiles[49], 2),
+        'p95_ms': round(quantiles[94], 2),
+        'errors': len(errors),
+        'first_error': errors[0] if errors else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, default=2, help='gunicorn worker processes per server')
+    parser.add_argument('--threads', type=int, default=4, help='threads per WSGI worker')
+    parser.add_argument('--concurrency', type=int, action='append', help='client threads (repeatable)')
+    parser.add_argument('--duration', type=float, default=10, help='seconds per concurrency level')
+    parser.add_argument('--path', action='append', dest='paths')
+    parser.add_argument('--mode', action='append', dest='modes', choices=list(SERVERS))
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--with-cache', action='store_true', help='keep the configured cache backend')
+    parser.add_argument('--output', help='write the results as JSON')
+    options = parser.parse_args()
+    options.paths = options.paths or ['/', '/courses/', '/results/search/?search=a']
+    levels = options.concurrency or [8, 32, 128]
+    
+    report = {}
+    for mode in options.modes or list(SERVERS):
+        process = start_server(mode, options.port, options)
+        try:
+            # Warm up: imports, template compilation, connection setup
+            run_load(options.port, options.paths, min(levels), 1)
+            report[mode] = {
+                str(level): run_load(options.port, options.paths, level, options.duration)
+                for level in levels
+            }
+        finally:
+            stop_server(process)
+    
+    print(f"{'mode':<6}{'clients':>8}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'errors':>8}")
+    for mode, rows in report.items():
+        for level, row in rows.items():
+            print(
+                f"{mode:<6}{level:>8}{row['requests_per_second']:>10}{row['p50_ms']:>10}"
+                f"{row['p95_ms']:>10}{row['errors']:>8}"
+            )
+            if row['first_error']:
+                print(f'        first error: {row["first_error"]}')
+    
+    if options.output:
+        with open(options.output, 'w', encoding='utf-8') as fileobj:
+            json.dump({'workers': options.workers, 'threads': options.threads, 'paths': options.paths, 'servers': report}, fileobj, indent=2)
+            fileobj.write('\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,177 @@
+"""
+Connection load test: do database connections stay bounded under a spike?
+
+Starts ``--instances`` processes (each standing in for a lambda instance or a
+gunicorn worker) that serve requests through the WSGI application from
+``--threads`` threads, while the parent polls ``pg_stat_activity`` and records
+how many server connections the app holds. Run it once per DATABASE_POOL_MODE
+and compare the peaks.
+
+Usage:
+    DATABASE_URL=postgres://... DATABASE_POOL_MODE=pgbouncer \\
+        python connection_loadtest.py [--instances 8] [--threads 8] [--requests 50]
+                                      [--path / --path /students/] [--max-connections N]
+
+Needs a migrated PostgreSQL database with some data (see populate_data.py).
+Exits with status 1 if ``--max-connections`` is given and the peak exceeds it.
+"""
+import argparse
+import multiprocessing
+import os
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+
+
+BASE_DIR = Path(__file__).resolve().parent
+
+
+def _setup(settings):
+    sys.path.insert(0, str(BASE_DIR))
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings)
+    os.environ.setdefault('ALLOWED_HOSTS', 'localhost')
+    import django
+    
+    django.setup()
+
+
+def _request(application, path):
+    """Serve one GET through the full WSGI stack, including request_finished"""
+    status = {}
+    
+    def start_response(value, headers, exc_info=None):
+        status['value'] = value
+    
+    path, _, query = path.partition('?')
+    environ = {
+        'REQUEST_METHOD': 'GET', 'PATH_INFO': path, 'QUERY_STRING': query,
+        'SERVER_NAME': 'localhost', 'SERVER_PORT': '80', 'HTTP_HOST': 'localhost',
+        'wsgi.url_scheme': 'http', 'wsgi.input': sys.stdin.buffer if sys.stdin else None,
+        'wsgi.errors': sys.stderr,
+    }
+    response = application(environ, start_response)
+    try:
+        for _ in response:
+            pass
+    finally:
+        # Closing the response sends request_finished, which is where Django
+        # closes (or keeps) the connection according to CONN_MAX_AGE
+        if hasattr(response, 'close'):
+            response.close()
+    return int(status['value'].split()[0])
+
+
+def _instance(settings, paths, threads, requests, results):
+    _setup(settings)
+    from django.core.wsgi import get_wsgi_application
+    
+    application = get_wsgi_application()
+    timings, errors = [], []
+    
+    def worker():
+        for index in range(requests):
+            started = time.perf_counter()
+            try:
+                code = _request(application, paths[index % len(paths)])
+            except Exception as error:
+                errors.append(repr(error))
+                continue
+            timings.append((time.perf_counter() - started) * 1000)
+            if code >= 500:
+                errors.append(f'HTTP {code}')
+    
+    pool = [threading.Thread(target=worker) for _ in range(threads)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    results.put((timings, errors))
+
+
+def _count_connections(cursor):
+    cursor.execute(
+        """
+        SELECT state, count(*) FROM pg_stat_activity
+        WHERE datname = current_database() AND pid <> pg_backend_pid()
+          AND backend_type = 'client backend'
+        GROUP BY state
+        """
+    )
+    return dict(cursor.fetchall())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--settings', default=os.environ.get('DJANGO_SETTINGS_MODULE', 'student_results.settings'))
+    parser.add_argument('--instances', type=int, default=8)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=50, help='requests per thread')
+    parser.add_argument('--path', action='append', dest='paths')
+    parser.add_argument('--interval', type=float, default=0.05, help='pg_stat_activity polling interval (s)')
+    parser.add_argument('--max-connections', type=int)
+    args = parser.parse_args()
+    paths = args.paths or ['/', '/students/', '/courses/', '/results/search/?search=a']
+    
+    _setup(args.settings)
+    from django.conf import settings
+    from django.db import connection
+    
+    if connection.vendor != 'postgresql':
+        sys.exit('connection_loadtest.py needs DATABASE_URL pointing at PostgreSQL')
+    
+    database = settings.DATABASES['default']
+    print(
+        f"Pool mode: {settings.DATABASE_POOL_MODE}   CONN_MAX_AGE: {database['CONN_MAX_AGE']}   "
+        f"pool: {database.get('OPTIONS', {}).get('pool')}"
+    )
+    print(f'{args.instances} instances x {args.threads} threads x {args.requests} requests over {paths}')
+    
+    with connection.cursor() as cursor:
+        cursor.execute('SHOW max_connections')
+        print(f'Server max_connections: {cursor.fetchone()[0]}')
+        baseline = sum(_count_connections(cursor).values())
+    
+    context = multiprocessing.get_context('spawn')
+    results = context.Queue()
+    processes = [
+        context.Process(target=_instance, args=(args.settings, paths, args.threads, args.requests, results))
+        for _ in range(args.instances)
+    ]
+    started = time.perf_counter()
+    for process in processes:
+        process.start()
+    
+    samples = []
+    collected = []
+    with connection.cursor() as cursor:
+        while len(collected) < len(processes):
+            states = _count_connections(cursor)
+            samples.append((sum(states.values()) - baseline, states))
+            while not results.empty():
+                collected.append(results.get())
+            time.sleep(args.interval)
+        elapsed = time.perf_counter() - started
+    for process in processes:
+        process.join()
+    
+    timings = [ms for instance_timings, _ in collected for ms in instance_timings]
+    errors = [error for _, instance_errors in collected for error in instance_errors]
+    peak, peak_states = max(samples, key=lambda sample: sample[0])
+    
+    print(f'\nRequests: {len(timings)} ok, {len(errors)} failed in {elapsed:.1f}s ({len(timings) / elapsed:.0f} req/s)')
+    if timings:
+        quantiles = statistics.quantiles(timings, n=100)
+        print(f'Latency: p50 {quantiles[49]:.1f} ms   p95 {quantiles[94]:.1f} ms   p99 {quantiles[98]:.1f} ms')
+    print(f'Connections: peak {peak} {peak_states}   mean {statistics.mean(s[0] for s in samples):.1f}')
+    for error in sorted(set(errors))[:5]:
+        print(f'  error: {error}')
+    
+    if args.max_connections is not None and peak > args.max_connections:
+        print(f'FAIL: peak {peak} exceeds --max-connections {args.max_connections}')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
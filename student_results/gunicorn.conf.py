@@ -0,0 +1,27 @@
+"""
+Gunicorn settings for both deployment paths (run from this directory).
+
+WSGI, threaded sync workers (each in-flight request holds a thread):
+    gunicorn -c gunicorn.conf.py student_results.wsgi
+
+ASGI, uvicorn workers running the async read views (results/async_views.py);
+a request waiting on the database only holds a coroutine:
+    GUNICORN_ASGI=1 gunicorn -c gunicorn.conf.py student_results.asgi
+
+Or uvicorn on its own:
+    uvicorn student_results.asgi:application --workers 4 --port 8000
+"""
+import multiprocessing
+import os
+
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.environ.get('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG') or None
+
+if os.environ.get('GUNICORN_ASGI') == '1':
+    worker_class = 'uvicorn_worker.UvicornWorker'
+else:
+    worker_class = 'gthread'
+    threads = int(os.environ.get('GUNICORN_THREADS', 4))
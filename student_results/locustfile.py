@@ -0,0 +1,67 @@
+"""
+Locust profile for the hot views.
+
+Seed the target database first with
+``python manage.py generate_dataset --students 1000 --courses 20``, then:
+
+    pip install locust
+    BENCH_STUDENTS=1000 locust -f locustfile.py --host http://localhost:8000
+
+Set BENCH_USERNAME/BENCH_PASSWORD to a teacher account (the generator creates
+``synthetic.teacher0000`` with password ``teacher123``) to include the dashboard. Locust reports p50/p95/p99 and bytes per endpoint; use
+``--headless --csv`` for runs that are compared between deploys.
+"""
+import os
+import random
+
+from locust import HttpUser, task, between
+
+
+STUDENTS = int(os.environ.get('BENCH_STUDENTS', 1000))
+SEARCH_TERMS = ['Chen', 'Patel', 'Emily', 'Computer', 'SYN00001', 'Math']
+
+
+def student_code(index):
+    # Matches results.synthetic.student_code without importing Django
+    return f'SYN{index:07d}'
+
+
+class PublicVisitor(HttpUser):
+    """Students checking results: home, lists, their own page and search"""
+    wait_time = between(0.5, 2)
+    weight = 9
+    
+    @task(2)
+    def home(self):
+        self.client.get('/', name='home')
+    
+    @task(2)
+    def student_list(self):
+        self.client.get('/students/', name='student_list')
+    
+    @task(5)
+    def student_detail(self):
+        self.client.get(f'/students/{student_code(random.randrange(STUDENTS))}/', name='student_detail')
+    
+    @task(3)
+    def search_results(self):
+        self.client.get('/results/search/', params={'search': random.choice(SEARCH_TERMS)}, name='search_results')
+
+
+class Teacher(HttpUser):
+    """Logged-in staff polling the dashboard (only with BENCH_USERNAME set)"""
+    abstract = not os.environ.get('BENCH_USERNAME')
+    wait_time = between(1, 3)
+    weight = 1
+    
+    def on_start(self):
+        self.client.get('/login/')
+        self.client.post('/login/', {
+            'username': os.environ['BENCH_USERNAME'],
+            'password': os.environ.get('BENCH_PASSWORD', ''),
+            'csrfmiddlewaretoken': self.client.cookies.get('csrftoken', ''),
+        }, name='login')
+    
+    @task
+    def dashboard(self):
+        self.client.get('/dashboard/', name='dashboard')
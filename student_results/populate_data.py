@@ -2,9 +2,12 @@
 Django Shell Script to Populate Sample Data
 Run this with: python manage.py shell < populate_data.py
 Or copy-paste into: python manage.py shell
+
+For large synthetic datasets use: python manage.py generate_dataset --students N --courses M
 """
 
 from django.contrib.auth.models import User
+from django.contrib.auth.hashers import make_password
 from results.models import Student, Course, Teacher, Result
 from datetime import date, timedelta
 import random
@@ -76,10 +79,9 @@ courses_data = [
     },
 ]
 
-courses = []
-for course_data in courses_data:
-    course = Course.objects.create(**course_data)
-    courses.append(course)
+courses = Course.objects.bulk_create([Course(**course_data) for course_data in courses_data])
+courses_by_code = {course.course_code: course for course in courses}
+for course in courses:
     print(f"  ✓ Created: {course.course_code} - {course.course_name}")
 
 print(f"✓ Created {len(courses)} courses")
@@ -179,10 +181,8 @@ students_data = [
     },
 ]
 
-students = []
-for student_data in students_data:
-    student = Student.objects.create(**student_data)
-    students.append(student)
+students = Student.objects.bulk_create([Student(**student_data) for student_data in students_data])
+for student in students:
     print(f"  ✓ Created: {student.student_id} - {student.get_full_name()}")
 
 print(f"✓ Created {len(students)} students")
@@ -232,13 +232,17 @@ teachers_data = [
     },
 ]
 
+# Hash the shared default password once rather than once per teacher
+password_hash = make_password('teacher123')
+
 teachers = []
+course_teachers = {}
 for teacher_data in teachers_data:
     # Create Django User
-    user = User.objects.create_user(
+    user = User.objects.create(
         username=teacher_data['username'],
         email=teacher_data['email'],
-        password='teacher123',  # Default password
+        password=password_hash,  # Default password: teacher123
         first_name=teacher_data['first_name'],
         last_name=teacher_data['last_name']
     )
@@ -252,9 +256,10 @@ for teacher_data in teachers_data:
     )
     
     # Assign courses
-    for course_code in teacher_data['course_codes']:
-        course = Course.objects.get(course_code=course_code)
-        teacher.courses.add(course)
+    teacher_courses = [courses_by_code[course_code] for course_code in teacher_data['course_codes']]
+    teacher.courses.add(*teacher_courses)
+    for course in teacher_courses:
+        course_teachers.setdefault(course.pk, teacher)
     
     teachers.append(teacher)
     print(f"  ✓ Created: {teacher.employee_id} - {user.get_full_name()} (username: {teacher_data['username']}, password: teacher123)")
@@ -278,7 +283,7 @@ for student in students:
         marks = max(0, min(100, marks))  # Ensure 0-100 range
         
         # Find a teacher who teaches this course
-        teacher_for_course = Teacher.objects.filter(courses=course).first()
+        teacher_for_course = course_teachers.get(course.pk)
         created_by_user = teacher_for_course.user if teacher_for_course else teachers[0].user
         
         # Create result
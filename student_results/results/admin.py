@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Student, Course, Teacher, Result
+from .models import Student, Course, Teacher, Result, Job
 
 
 @admin.register(Student)
@@ -23,6 +23,8 @@ class TeacherAdmin(admin.ModelAdmin):
     list_filter = ['department']
     search_fields = ['employee_id', 'user__username', 'user__first_name', 'user__last_name']
     filter_horizontal = ['courses']
+    list_select_related = ['user']
+    autocomplete_fields = ['user']
 
 
 @admin.register(Result)
@@ -32,8 +34,24 @@ class ResultAdmin(admin.ModelAdmin):
     search_fields = ['student__student_id', 'student__first_name', 'student__last_name', 'course__course_code']
     date_hierarchy = 'exam_date'
     readonly_fields = ['created_at', 'updated_at']
+    autocomplete_fields = ['student', 'course']
+    raw_id_fields = ['created_by']
+    
+    def get_queryset(self, request):
+        # Applied to the changelist (in place of list_select_related) and to the
+        # delete confirmation / bulk action pages, which all render Result.__str__
+        return super().get_queryset(request).select_related('student', 'course', 'created_by')
     
     def save_model(self, request, obj, form, change):
         if not change:  # Only set created_by on creation
             obj.created_by = request.user
         super().save_model(request, obj, form, change)
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ['id', 'kind', 'status', 'progress', 'total', 'attempts', 'created_by', 'created_at', 'finished_at']
+    list_filter = ['status', 'kind']
+    readonly_fields = ['created_at', 'started_at', 'finished_at', 'heartbeat_at', 'locked_by']
+    raw_id_fields = ['created_by']
+    list_select_related = ['created_by']
@@ -0,0 +1,111 @@
+"""
+Per-course mark statistics: mean, median, standard deviation, range, pass
+rate and grade distribution.
+
+All courses in a set are summarised by one grouped aggregate query (``Avg``,
+``StdDev``, ``Min``/``Max`` and a conditional ``Count`` per grade). On
+PostgreSQL the median comes from ``PERCENTILE_CONT(0.5)`` in the same query;
+other databases fetch the marks of the uncached courses once and take the
+median in Python. Each course's figures are cached under its course version
+(see ``caching.py``), so they are recomputed only after its results change.
+The versions are kept in the database, so a change made by another web
+worker or by the job worker is seen here at once.
+"""
+import statistics
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Aggregate, Avg, Count, FloatField, Max, Min, Q, StdDev
+
+from .caching import get_course_versions
+from .grading import DEFAULT_SCALE
+from .models import Course, Result
+
+
+class PercentileCont(Aggregate):
+    """PostgreSQL ``PERCENTILE_CONT(fraction) WITHIN GROUP (ORDER BY expression)``"""
+    function = 'PERCENTILE_CONT'
+    name = 'PercentileCont'
+    template = '%(function)s(%(fraction)s) WITHIN GROUP (ORDER BY %(expressions)s)'
+    output_field = FloatField()
+    
+    def __init__(self, expression, fraction, **extra):
+        super().__init__(expression, fraction=float(fraction), **extra)
+
+
+def _round(value):
+    return round(float(value), 2) if value is not None else None
+
+
+def _aggregate(course_ids):
+    """Compute statistics for ``course_ids`` in one query"""
+    marks = 'result__marks'
+    annotations = {
+        'result_count': Count('result'),
+        'mean': Avg(marks),
+        'stddev': StdDev(marks),
+        'lowest': Min(marks),
+        'highest': Max(marks),
+        'passed': Count('result', filter=Q(result__marks__gte=DEFAULT_SCALE.pass_marks)),
+    }
+    for index, (grade, _) in enumerate(Result.GRADE_CHOICES):
+        annotations[f'grade_{index}'] = Count('result', filter=Q(result__grade=grade))
+    if connection.vendor == 'postgresql':
+        annotations['median'] = PercentileCont(marks, 0.5)
+    
+    rows = Course.objects.filter(pk__in=course_ids).order_by().values('id').annotate(**annotations)
+    stats = {}
+    for row in rows:
+        count = row['result_count']
+        stats[row['id']] = {
+            'result_count': count,
+            'mean': _round(row['mean']),
+            'median': _round(row.get('median')),
+            'stddev': _round(row['stddev']),
+            'lowest': _round(row['lowest']),
+            'highest': _round(row['highest']),
+            'pass_count': row['passed'],
+            'pass_rate': round(row['passed'] / count * 100, 1) if count else None,
+            'grades': {
+                grade: row[f'grade_{index}'] for index, (grade, _) in enumerate(Result.GRADE_CHOICES)
+            },
+        }
+    
+    if connection.vendor != 'postgresql':
+        marks_by_course = {}
+        for course_id, value in (
+            Result.objects.filter(course_id__in=course_ids).order_by().values_list('course_id', 'marks')
+        ):
+            marks_by_course.setdefault(course_id, []).append(value)
+        for course_id, values in marks_by_course.items():
+            stats[course_id]['median'] = _round(statistics.median(values))
+    return stats
+
+
+def course_statistics(course_ids):
+    """``{course pk: statistics}``, served from cache for courses whose results are unchanged"""
+    course_ids = list(course_ids)
+    if not course_ids:
+        return {}
+    
+    versions = get_course_versions(course_ids)
+    keys = {course_id: f'results:course-stats:{course_id}:{versions[course_id]}' for course_id in course_ids}
+    cached = cache.get_many(keys.values())
+    stats = {course_id: cached[key] for course_id, key in keys.items() if key in cached}
+    
+    missing = [course_id for course_id in course_ids if course_id not in stats]
+    if missing:
+        computed = _aggregate(missing)
+        cache.set_many(
+            {keys[course_id]: value for course_id, value in computed.items()},
+            settings.RESULTS_COURSE_STATS_CACHE_TIMEOUT,
+        )
+        stats.update(computed)
+    return stats
+
+
+def grade_histogram(stats):
+    """``[(grade, count, percent of the largest bar)]``, best grade first, for templates"""
+    largest = max(stats['grades'].values(), default=0) or 1
+    return [(grade, count, round(count / largest * 100)) for grade, count in stats['grades'].items()]
@@ -0,0 +1,291 @@
+"""
+Read-only JSON API (v1) for students, courses and results.
+
+Every endpoint selects only the columns it returns via ``.values()``, and
+accepts ``?fields=a,b`` to narrow the payload further. Result-backed
+endpoints send ``Last-Modified``, the newest ``updated_at`` of the results
+they are built from, and an ``ETag`` that also covers the global data version
+(``caching.py``), so conditional requests are answered with one aggregate
+query. Deleting a result or renaming a course moves no result's
+``updated_at``, but it does bump the data version, so it changes the ETag and,
+through the version's own timestamp, Last-Modified too. List endpoints use the same keyset cursors as the HTML pages (``?after=`` /
+``?before=``). Course statistics are read from the per-course cache in
+``analytics.py``.
+"""
+import hashlib
+from decimal import Decimal
+
+from django.db.models import Max
+from django.http import JsonResponse
+from django.utils.cache import get_conditional_response, set_response_etag
+from django.utils.http import http_date, quote_etag
+from django.views.decorators.http import require_GET
+
+from .models import Student, Course, Result, StudentStanding
+from .analytics import course_statistics
+from .caching import get_data_version_info
+from .pagination import paginate
+
+
+STUDENT_FIELDS = {
+    'student_id': 'student_id',
+    'first_name': 'first_name',
+    'last_name': 'last_name',
+    'email': 'email',
+    'enrollment_date': 'enrollment_date',
+}
+
+COURSE_FIELDS = {
+    'course_code': 'course_code',
+    'course_name': 'course_name',
+    'description': 'description',
+    'credits': 'credits',
+    'semester': 'semester',
+}
+
+RESULT_FIELDS = {
+    'id': 'id',
+    'student_id': 'student__student_id',
+    'course_code': 'course__course_code',
+    'marks': 'marks',
+    'grade': 'grade',
+    'exam_date': 'exam_date',
+    'remarks': 'remarks',
+    'updated_at': 'updated_at',
+}
+
+TRANSCRIPT_FIELDS = {
+    'course_code': 'course__course_code',
+    'course_name': 'course__course_name',
+    'credits': 'course__credits',
+    'semester': 'course__semester',
+    'marks': 'marks',
+    'grade': 'grade',
+    'exam_date': 'exam_date',
+}
+
+PAGE_SIZE = 100
+
+
+class FieldSelectionError(Exception):
+    pass
+
+
+def _selected_fields(request, available):
+    """Return ``{output name: ORM path}`` for the ``fields`` query parameter"""
+    requested = request.GET.get('fields')
+    if not requested:
+        return dict(available)
+    
+    names = [name.strip() for name in requested.split(',') if name.strip()]
+    unknown = [name for name in names if name not in available]
+    if unknown:
+        raise FieldSelectionError(
+            f"Unknown field(s): {', '.join(unknown)}. Available: {', '.join(available)}"
+        )
+    return {name: available[name] for name in names}
+
+
+def _serialize(row, fields):
+    data = {}
+    for name, path in fields.items():
+        value = row[path]
+        if isinstance(value, Decimal):
+            value = float(value)
+        elif hasattr(value, 'isoformat'):
+            value = value.isoformat()
+        data[name] = value
+    return data
+
+
+def _json(request, payload, etag=None, last_modified=None):
+    """JsonResponse honouring If-None-Match and If-Modified-Since"""
+    response = JsonResponse(payload)
+    if etag is None:
+        set_response_etag(response)
+        etag = response['ETag']
+    else:
+        response.headers['ETag'] = etag
+    if last_modified is not None:
+        response.headers['Last-Modified'] = http_date(last_modified)
+    response.headers['Cache-Control'] = 'no-cache'
+    return get_conditional_response(request, etag=etag, last_modified=last_modified, response=response)
+
+
+def _result_validators(request, results):
+    """``(etag, last_modified timestamp)`` for a response built from ``results``"""
+    version, version_changed_at = get_data_version_info()
+    newest = results.aggregate(newest=Max('updated_at'))['newest']
+    last_modified = max(filter(None, [newest, version_changed_at]))
+    source = f'{request.get_full_path()}|{version}|{newest}'
+    return quote_etag(hashlib.md5(source.encode()).hexdigest()), int(last_modified.timestamp())
+
+
+def _not_modified(request, etag, last_modified):
+    return get_conditional_response(request, etag=etag, last_modified=last_modified)
+
+
+def _list(request, queryset, fields, ordering):
+    """Keyset-paginated list payload containing only ``fields``"""
+    paths = set(fields.values()) | {name.lstrip('-') for name in ordering}
+    page = paginate(request, queryset.values(*paths), ordering, per_page=PAGE_SIZE)
+    base = request.path
+    return {
+        'results': [_serialize(row, fields) for row in page.object_list],
+        'next': f'{base}?{page.next_query}' if page.has_next() else None,
+        'previous': f'{base}?{page.previous_query}' if page.has_previous() else None,
+    }
+
+
+def _field_error(error):
+    return JsonResponse({'error': str(error)}, status=400)
+
+
+def _not_found(message):
+    return JsonResponse({'error': message}, status=404)
+
+
+@require_GET
+def student_list(request):
+    try:
+        fields = _selected_fields(request, STUDENT_FIELDS)
+    except FieldSelectionError as error:
+        return _field_error(error)
+    
+    return _json(request, _list(request, Student.objects.all(), fields, ('student_id',)))
+
+
+@require_GET
+def student_detail(request, student_id):
+    try:
+        fields = _selected_fields(request, STUDENT_FIELDS)
+    except FieldSelectionError as error:
+        return _field_error(error)
+    
+    row = Student.objects.filter(student_id=student_id).values(*set(fields.values())).first()
+    if row is None:
+        return _not_found('Student not found')
+    return _json(request, _serialize(row, fields))
+
+
+@require_GET
+def student_transcript(request, student_id):
+    try:
+        fields = _selected_fields(request, TRANSCRIPT_FIELDS)
+    except FieldSelectionError as error:
+        return _field_error(error)
+    
+    results = Result.objects.filter(student__student_id=student_id)
+    etag, last_modified = _result_validators(request, results)
+    not_modified = _not_modified(request, etag, last_modified)
+    if not_modified is not None:
+        return not_modified
+    
+    student = Student.objects.filter(student_id=student_id).values('id', 'student_id', 'first_name', 'last_name').first()
+    if student is None:
+        return _not_found('Student not found')
+    
+    standing = StudentStanding.objects.filter(student_id=student['id']).values(
+        'gpa', 'credit_sum', 'result_count'
+    ).first() or {'gpa': Decimal('0'), 'credit_sum': 0, 'result_count': 0}
+    
+    payload = {
+        'student_id': student['student_id'],
+        'name': f"{student['first_name']} {student['last_name']}",
+        'gpa': float(standing['gpa']),
+        'credits': standing['credit_sum'],
+        'result_count': standing['result_count'],
+        'results': [
+            _serialize(row, fields)
+            for row in results.order_by('-exam_date', 'course__course_code').values(*set(fields.values()))
+        ],
+    }
+    return _json(request, payload, etag=etag, last_modified=last_modified)
+
+
+@require_GET
+def course_list(request):
+    try:
+        fields = _selected_fields(request, COURSE_FIELDS)
+    except FieldSelectionError as error:
+        return _field_error(error)
+    
+    courses = Course.objects.all()
+    if request.GET.get('semester'):
+        courses = courses.filter(semester=request.GET['semester'])
+    return _json(request, _list(request, courses, fields, ('course_code',)))
+
+
+@require_GET
+def course_detail(request, course_code):
+    try:
+        fields = _selected_fields(request, COURSE_FIELDS)
+    except FieldSelectionError as error:
+        return _field_error(error)
+    
+    row = Course.objects.filter(course_code=course_code).values(*set(fields.values())).first()
+    if row is None:
+        return _not_found('Course not found')
+    return _json(request, _serialize(row, fields))
+
+
+@require_GET
+def result_list(request):
+    try:
+        fields = _selected_fields(request, RESULT_FIELDS)
+    except FieldSelectionError as error:
+        return _field_error(error)
+    
+    results = Result.objects.all()
+    if request.GET.get('semester'):
+        results = results.filter(course__semester=request.GET['semester'])
+    if request.GET.get('course'):
+        results = results.filter(course__course_code=request.GET['course'])
+    if request.GET.get('student'):
+        results = results.filter(student__student_id=request.GET['student'])
+    if request.GET.get('grade'):
+        results = results.filter(grade=request.GET['grade'])
+    
+    etag, last_modified = _result_validators(request, results)
+    not_modified = _not_modified(request, etag, last_modified)
+    if not_modified is not None:
+        return not_modified
+    
+    payload = _list(request, results, fields, ('-exam_date', '-id'))
+    return _json(request, payload, etag=etag, last_modified=last_modified)
+
+
+def _with_statistics(courses):
+    stats = course_statistics([course['id'] for course in courses])
+    return [
+        {
+            'course_code': course['course_code'],
+            'course_name': course['course_name'],
+            'semester': course['semester'],
+            **stats[course['id']],
+        }
+        for course in courses
+    ]
+
+
+@require_GET
+def course_statistics_list(request):
+    courses = Course.objects.values('id', 'course_code', 'course_name', 'semester')
+    if request.GET.get('semester'):
+        courses = courses.filter(semester=request.GET['semester'])
+    page = paginate(request, courses, ('course_code',), per_page=PAGE_SIZE)
+    return _json(request, {
+        'results': _with_statistics(page.object_list),
+        'next': f'{request.path}?{page.next_query}' if page.has_next() else None,
+        'previous': f'{request.path}?{page.previous_query}' if page.has_previous() else None,
+    })
+
+
+@require_GET
+def course_statistics_detail(request, course_code):
+    course = Course.objects.filter(course_code=course_code).values(
+        'id', 'course_code', 'course_name', 'semester'
+    ).first()
+    if course is None:
+        return _not_found('Course not found')
+    return _json(request, _with_statistics([course])[0])
@@ -0,0 +1,13 @@
+from django.urls import path
+from . import api
+
+urlpatterns = [
+    path('students/', api.student_list, name='api_student_list'),
+    path('students/<str:student_id>/', api.student_detail, name='api_student_detail'),
+    path('students/<str:student_id>/transcript/', api.student_transcript, name='api_student_transcript'),
+    path('courses/', api.course_list, name='api_course_list'),
+    path('courses/statistics/', api.course_statistics_list, name='api_course_statistics'),
+    path('courses/<str:course_code>/statistics/', api.course_statistics_detail, name='api_course_statistics_detail'),
+    path('courses/<str:course_code>/', api.course_detail, name='api_course_detail'),
+    path('results/', api.result_list, name='api_result_list'),
+]
@@ -0,0 +1,15 @@
+"""
+The site with the async read views routed, as ``asgi.py`` serves it, for
+tests that run under the default (sync) settings.
+"""
+from django.urls import path
+
+from . import async_views, urls
+
+
+urlpatterns = [
+    path('', async_views.home, name='home'),
+    path('students/<str:student_id>/', async_views.student_detail, name='student_detail'),
+    path('courses/', async_views.course_list, name='course_list'),
+    path('results/search/', async_views.search_results, name='search_results'),
+] + urls.urlpatterns
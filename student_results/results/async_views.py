@@ -0,0 +1,106 @@
+"""
+Async versions of the read-heavy public pages, routed instead of their
+``views.py`` counterparts when ``RESULTS_ASYNC_VIEWS`` is on (the default
+under ``asgi.py``).
+
+While a query runs the request awaits it rather than holding a worker
+thread, so one ASGI worker can keep many more requests in flight when the
+database is the bottleneck. Everything a template touches is fetched here
+with the async ORM first: templates render synchronously and must not query.
+``request.user`` is replaced by the user from ``request.auser()`` for the
+same reason.
+"""
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.shortcuts import render, aget_object_or_404
+from django.utils.safestring import mark_safe
+
+from .models import Student, Course, Result
+from .pagination import apaginate
+from .stats import aget_site_stats
+from .caching import cache_public_page, public_cache_control, transcript_version
+from .ranking import astudent_course_rankings
+from . import search
+
+
+async def _resolve_user(request):
+    # The lazy request.user would query synchronously while the template renders
+    request.user = await request.auser()
+    return request.user
+
+
+@public_cache_control(max_age=60, stale_while_revalidate=300)
+async def home(request):
+    """Home page view"""
+    await _resolve_user(request)
+    return render(request, 'results/home.html', await aget_site_stats())
+
+
+@public_cache_control(max_age=60, stale_while_revalidate=300)
+@cache_public_page
+async def student_detail(request, student_id):
+    """View student details and their results"""
+    user = await _resolve_user(request)
+    student = await aget_object_or_404(Student.objects.select_related('standing'), student_id=student_id)
+    # Reads the prefetched standing; falls back to a query for students without one
+    gpa = await sync_to_async(student.calculate_gpa)()
+    course_ids = [
+        course_id async for course_id in Result.objects.filter(student=student).values_list('course_id', flat=True)
+    ]
+    # Cache reads; a network cache would block the event loop
+    version = await sync_to_async(transcript_version)(student.pk, course_ids)
+    
+    # Look the transcript fragment up here: on a miss the rows must be fetched
+    # before rendering, and the {% cache %} tag cannot wait for them
+    transcript = await cache.aget(
+        make_template_fragment_key('student-transcript', [student.pk, version, user.is_authenticated])
+    )
+    results = []
+    if transcript is None:
+        results = [result async for result in Result.objects.filter(student=student).select_related('course')]
+        course_rankings = await astudent_course_rankings(student)
+        for result in results:
+            result.course_ranking = course_rankings.get(result.pk)
+    
+    context = {
+        'student': student,
+        'results': results,
+        'transcript': mark_safe(transcript) if transcript is not None else None,
+        'transcript_version': version,
+        'fragment_cache_timeout': settings.RESULTS_FRAGMENT_CACHE_TIMEOUT,
+        'gpa': gpa,
+        'semester_rankings': [ranking async for ranking in student.semester_rankings.all()],
+    }
+    return render(request, 'results/student_detail.html', context)
+
+
+@public_cache_control(max_age=300, stale_while_revalidate=600)
+@cache_public_page
+async def course_list(request):
+    """List all courses"""
+    await _resolve_user(request)
+    page = await apaginate(request, Course.objects.all(), ('course_code',))
+    return render(request, 'results/course_list.html', {'courses': page.object_list, 'page': page})
+
+
+@public_cache_control(max_age=30, stale_while_revalidate=120)
+@cache_public_page
+async def search_results(request):
+    """Search for student results"""
+    await _resolve_user(request)
+    search_query = request.GET.get('search', '')
+    results = []
+    page = None
+    
+    if search_query:
+        page = await apaginate(request, search.search_results(search_query), ('-rank', '-exam_date', '-id'), per_page=50)
+        results = page.object_list
+    
+    context = {
+        'results': results,
+        'page': page,
+        'search_query': search_query,
+    }
+    return render(request, 'results/search_results.html', context)
@@ -0,0 +1,128 @@
+"""
+Request benchmarks for the hot views.
+
+Each view is requested through the test client: the first request runs with
+an empty cache ("cold") and the rest are timed for p50/p95/p99. Queries and
+bytes rendered come from the cold request, which is what a cache miss costs.
+``wire_bytes`` then records the body size sent with gzip and Brotli and
+whether a revalidation with the ETag gets an empty 304.
+``compare`` checks a run against a saved baseline: any extra query is a
+regression, timings and payload size may drift by ``tolerance``.
+"""
+import statistics
+import time
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .synthetic import student_code
+
+
+BENCHMARK_VIEWS = [
+    # (name, url name, url args, query string, needs login)
+    ('home', 'home', (), '', False),
+    ('student_list', 'student_list', (), '', False),
+    ('student_detail', 'student_detail', (student_code(0),), '', False),
+    ('search_results', 'search_results', (), 'search=Chen', False),
+    ('dashboard', 'dashboard', (), '', True),
+]
+
+
+class BenchmarkError(Exception):
+    pass
+
+
+def _percentile(quantiles, value):
+    return round(quantiles[value - 1], 2)
+
+
+def measure(client, url, iterations=50):
+    """Time ``iterations`` (at least 2) GETs of ``url`` after one cold, query-counted request"""
+    cache.clear()
+    with CaptureQueriesContext(connection) as queries:
+        started = time.perf_counter()
+        response = client.get(url)
+        cold_ms = (time.perf_counter() - started) * 1000
+    # Read now: every request_started signal resets the connection's query log
+    query_count = len(queries)
+    if response.status_code != 200:
+        raise BenchmarkError(f'GET {url} returned {response.status_code}')
+    
+    timings = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        client.get(url)
+        timings.append((time.perf_counter() - started) * 1000)
+    
+    quantiles = statistics.quantiles(timings, n=100, method='inclusive')
+    return {
+        'url': url,
+        'cold_ms': round(cold_ms, 2),
+        'p50_ms': _percentile(quantiles, 50),
+        'p95_ms': _percentile(quantiles, 95),
+        'p99_ms': _percentile(quantiles, 99),
+        'queries': query_count,
+        'bytes': len(response.content),
+        **wire_bytes(client, url, response),
+    }
+
+
+def wire_bytes(client, url, response):
+    """Body bytes sent for ``url`` per ``Accept-Encoding``, and on revalidation with the ETag.
+    
+    ``br`` is ``None`` when the brotli package is not installed.
+    """
+    sizes = {}
+    for coding in ('gzip', 'br'):
+        encoded = client.get(url, headers={'Accept-Encoding': coding})
+        sizes[f'{coding}_bytes'] = len(encoded.content) if encoded.get('Content-Encoding') == coding else None
+    if sizes['gzip_bytes'] is None:
+        # Below the compression threshold: sent as is
+        sizes['gzip_bytes'] = len(response.content)
+    
+    revalidated = None
+    if response.has_header('ETag'):
+        revalidated = client.get(url, headers={'If-None-Match': response['ETag']})
+    sizes['revalidated_bytes'] = len(revalidated.content) if revalidated and revalidated.status_code == 304 else None
+    return sizes
+
+
+def run_benchmarks(user, iterations=50, views=None):
+    """Benchmark ``BENCHMARK_VIEWS`` (or the named subset); ``user`` is used for login-only views"""
+    anonymous = Client()
+    authenticated = Client()
+    authenticated.force_login(user)
+    
+    report = {}
+    for name, url_name, args, query, login in BENCHMARK_VIEWS:
+        if views and name not in views:
+            continue
+        url = reverse(url_name, args=args) + (f'?{query}' if query else '')
+        report[name] = measure(authenticated if login else anonymous, url, iterations)
+    return report
+
+
+def compare(report, baseline, tolerance=0.25, min_delta_ms=1.0):
+    """Return a list of regressions of ``report`` against ``baseline``.
+    
+    Timings only count as regressions when they are also ``min_delta_ms``
+    slower, so sub-millisecond jitter on cached views is ignored.
+    """
+    regressions = []
+    for name, current in report.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        if current['queries'] > previous['queries']:
+            regressions.append(f"{name}: queries {previous['queries']} -> {current['queries']}")
+        for key in ('bytes', 'gzip_bytes'):
+            if key in previous and current[key] > previous[key] * (1 + tolerance):
+                regressions.append(f'{name}: {key} {previous[key]} -> {current[key]}')
+        for key in ('p50_ms', 'p95_ms'):
+            limit = max(previous[key] * (1 + tolerance), previous[key] + min_delta_ms)
+            if current[key] > limit:
+                regressions.append(f'{name}: {key} {previous[key]} -> {current[key]}')
+    return regressions
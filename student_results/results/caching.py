@@ -0,0 +1,231 @@
+"""
+Response caching for the public, read-heavy pages.
+
+Cached pages are keyed by a global data version that ``signals.py`` bumps
+whenever a Student, Course or Result changes, so an edit makes every cached
+page stale at once without having to track which pages it appears on. Old
+entries are never read again and simply expire. Like the per-course and
+per-student versions below, the data version is a ``CacheVersion`` row
+rather than a cache entry: under the default per-process
+LocMemCache a counter kept in the cache would only move in the process that
+handled the write, and every other web worker (and the job worker) would keep
+serving its old pages. Reading it costs one primary-key query. Per-course and per-student
+versions do the same for data derived from one course's or one student's
+results (``analytics.py``, the transcript fragment on the student page), and
+the site-stats version does it for the cached totals in ``stats.py``.
+"""
+import hashlib
+import time
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.contrib import messages
+from django.core.cache import cache
+from django.db.models import F
+from django.db.models.functions import Now
+from django.utils.cache import patch_cache_control, patch_vary_headers
+
+from .models import CacheVersion
+
+
+DATA_VERSION_KEY = 'data'
+SITE_STATS_VERSION_KEY = 'site-stats'
+
+
+def _counter_seed():
+    # Seed from the clock so a lost counter never reuses an old version
+    return int(time.time() * 1000)
+
+
+def _read_counters(keys):
+    """``{key: version}`` of the ``CacheVersion`` counters, creating missing ones"""
+    versions = dict(CacheVersion.objects.filter(key__in=keys).values_list('key', 'version'))
+    missing = [key for key in keys if key not in versions]
+    if missing:
+        CacheVersion.objects.bulk_create(
+            [CacheVersion(key=key, version=_counter_seed()) for key in missing], ignore_conflicts=True,
+        )
+        versions.update(CacheVersion.objects.filter(key__in=missing).values_list('key', 'version'))
+    return versions
+
+
+def _bump_counters(keys):
+    keys = sorted(set(keys))
+    if not keys:
+        return
+    counters = CacheVersion.objects.filter(key__in=keys)
+    if counters.update(version=F('version') + 1, updated_at=Now()) < len(keys):
+        missing = set(keys) - set(counters.values_list('key', flat=True))
+        CacheVersion.objects.bulk_create(
+            [CacheVersion(key=key, version=_counter_seed()) for key in missing], ignore_conflicts=True,
+        )
+        # Also counts the bump when another process created the row first
+        CacheVersion.objects.filter(key__in=missing).update(version=F('version') + 1, updated_at=Now())
+
+
+def get_data_version():
+    return _read_counters([DATA_VERSION_KEY])[DATA_VERSION_KEY]
+
+
+def bump_data_version():
+    _bump_counters([DATA_VERSION_KEY])
+
+
+def get_data_version_info():
+    """``(data version, when it last changed)``"""
+    counter = CacheVersion.objects.filter(key=DATA_VERSION_KEY).values_list('version', 'updated_at')
+    info = counter.first()
+    if info is None:
+        get_data_version()
+        info = counter.first()
+    return info
+
+
+def get_site_stats_version():
+    return _read_counters([SITE_STATS_VERSION_KEY])[SITE_STATS_VERSION_KEY]
+
+
+def bump_site_stats_version():
+    _bump_counters([SITE_STATS_VERSION_KEY])
+
+
+def _course_key(pk):
+    return f'course:{pk}'
+
+
+def get_course_versions(course_ids):
+    """``{course pk: version}``; a course's version changes whenever its results do"""
+    versions = _read_counters([_course_key(pk) for pk in course_ids])
+    return {pk: versions[_course_key(pk)] for pk in course_ids}
+
+
+def bump_course_versions(course_ids):
+    _bump_counters([_course_key(pk) for pk in course_ids])
+
+
+def _student_key(pk):
+    return f'student:{pk}'
+
+
+def get_student_versions(student_ids):
+    """``{student pk: version}``; a student's version changes whenever their results do"""
+    versions = _read_counters([_student_key(pk) for pk in student_ids])
+    return {pk: versions[_student_key(pk)] for pk in student_ids}
+
+
+def bump_student_versions(student_ids):
+    _bump_counters([_student_key(pk) for pk in student_ids])
+
+
+def transcript_version(student_id, course_ids):
+    """Cache version for a student's transcript table.
+    
+    Combines the student's version with those of their courses, which change
+    when anyone's result in the course does (and so when class ranks move).
+    All of them are read in one query.
+    """
+    student_key = _student_key(student_id)
+    course_keys = [_course_key(pk) for pk in sorted(set(course_ids))]
+    versions = _read_counters([student_key] + course_keys)
+    digest = hashlib.md5(repr([(key, versions[key]) for key in course_keys]).encode()).hexdigest()
+    return f'{versions[student_key]}-{digest}'
+
+
+def _page_cache_key(request, user):
+    if user.is_authenticated:
+        # Logged-in pages show the username and edit buttons
+        audience = f'user-{user.pk}'
+    else:
+        audience = 'anon'
+    path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    return f'results:page:{get_data_version()}:{audience}:{path}'
+
+
+def _bypasses_page_cache(request):
+    # Pages carrying flash messages are one-offs
+    return request.method not in ('GET', 'HEAD') or len(messages.get_messages(request))
+
+
+def _cacheable(response):
+    patch_vary_headers(response, ['Cookie'])
+    return response.status_code == 200 and not response.streaming and not response.cookies
+
+
+def cache_public_page(view_func):
+    """Cache a GET view's response until the data version changes (sync or async views)"""
+    if iscoroutinefunction(view_func):
+        @wraps(view_func)
+        async def async_wrapper(request, *args, **kwargs):
+            # Also loads the session, so reading messages below does no blocking I/O
+            user = await request.auser()
+            if _bypasses_page_cache(request):
+                return await view_func(request, *args, **kwargs)
+            
+            key = await sync_to_async(_page_cache_key)(request, user)
+            response = await cache.aget(key)
+            if response is not None:
+                return response
+            
+            response = await view_func(request, *args, **kwargs)
+            if _cacheable(response):
+                await cache.aset(key, response, settings.RESULTS_PAGE_CACHE_TIMEOUT)
+            return response
+        return async_wrapper
+    
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        if _bypasses_page_cache(request):
+            return view_func(request, *args, **kwargs)
+        
+        key = _page_cache_key(request, request.user)
+        response = cache.get(key)
+        if response is not None:
+            return response
+        
+        response = view_func(request, *args, **kwargs)
+        if _cacheable(response):
+            cache.set(key, response, settings.RESULTS_PAGE_CACHE_TIMEOUT)
+        return response
+    return wrapper
+
+
+def public_cache_control(max_age, stale_while_revalidate=None):
+    """Let browsers and shared caches reuse anonymous responses for ``max_age`` seconds.
+    
+    Responses for logged-in users, or carrying flash messages or cookies, are
+    marked ``private, no-cache`` instead: clients keep them but revalidate
+    with the ETag every time (see ``middleware.py``). Works on sync and async
+    views.
+    """
+    def patch(request, user, response):
+        if request.method not in ('GET', 'HEAD') or response.status_code != 200:
+            return
+        if response.has_header('Cache-Control'):
+            return
+        
+        if user.is_authenticated or response.cookies or len(messages.get_messages(request)):
+            patch_cache_control(response, private=True, no_cache=True)
+        else:
+            directives = {'public': True, 'max_age': max_age}
+            if stale_while_revalidate:
+                directives['stale_while_revalidate'] = stale_while_revalidate
+            patch_cache_control(response, **directives)
+        patch_vary_headers(response, ['Cookie'])
+    
+    def decorator(view_func):
+        if iscoroutinefunction(view_func):
+            @wraps(view_func)
+            async def async_wrapper(request, *args, **kwargs):
+                response = await view_func(request, *args, **kwargs)
+                patch(request, await request.auser(), response)
+                return response
+            return async_wrapper
+        
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            response = view_func(request, *args, **kwargs)
+            patch(request, request.user, response)
+            return response
+        return wrapper
+    return decorator
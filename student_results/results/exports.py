@@ -0,0 +1,101 @@
+"""
+Streaming CSV / JSON Lines export of results joined to student and course.
+
+Rows are read in fixed-size keyset batches (``id > last_id``) as flat tuples
+from ``values_list``, and encoded one line at a time, so memory use does not
+depend on the size of the export. Keyset batches are used rather than a
+server-side cursor because a streamed response outlives the view, and a
+cursor held open across it does not survive transaction-mode poolers.
+"""
+import csv
+import json
+from decimal import Decimal
+
+from .models import Result
+
+
+EXPORT_COLUMNS = [
+    ('student_id', 'student__student_id'),
+    ('first_name', 'student__first_name'),
+    ('last_name', 'student__last_name'),
+    ('course_code', 'course__course_code'),
+    ('course_name', 'course__course_name'),
+    ('semester', 'course__semester'),
+    ('credits', 'course__credits'),
+    ('marks', 'marks'),
+    ('grade', 'grade'),
+    ('exam_date', 'exam_date'),
+]
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'jsonl': 'application/x-ndjson',
+}
+
+# Keyword arguments of filtered_results, as taken from a request or job
+EXPORT_FILTERS = ['semester', 'course', 'grade', 'student']
+
+DEFAULT_CHUNK_SIZE = 2000
+
+
+def filtered_results(semester=None, course=None, grade=None, student=None):
+    """Results matching the export filters (course by code, student by student_id)"""
+    results = Result.objects.all()
+    if semester:
+        results = results.filter(course__semester=semester)
+    if course:
+        results = results.filter(course__course_code=course)
+    if grade:
+        results = results.filter(grade=grade)
+    if student:
+        results = results.filter(student__student_id=student)
+    return results
+
+
+def iter_rows(queryset, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield export tuples in primary key order, ``chunk_size`` rows per query"""
+    paths = [path for _, path in EXPORT_COLUMNS]
+    last_id = 0
+    while True:
+        chunk = list(
+            queryset.filter(id__gt=last_id).order_by('id').values_list('id', *paths)[:chunk_size]
+        )
+        if not chunk:
+            return
+        for row in chunk:
+            yield row[1:]
+        last_id = chunk[-1][0]
+
+
+class _Echo:
+    """File-like object whose write() just returns the value, for csv.writer"""
+    
+    def write(self, value):
+        return value
+
+
+def csv_lines(rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow([name for name, _ in EXPORT_COLUMNS])
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def _json_default(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    return value.isoformat()
+
+
+def jsonl_lines(rows):
+    names = [name for name, _ in EXPORT_COLUMNS]
+    for row in rows:
+        yield json.dumps(dict(zip(names, row)), default=_json_default) + '\n'
+
+
+def export_lines(queryset, export_format, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Encoded lines of the export in ``export_format`` ('csv' or 'jsonl')"""
+    rows = iter_rows(queryset, chunk_size=chunk_size)
+    if export_format == 'jsonl':
+        return jsonl_lines(rows)
+    return csv_lines(rows)
@@ -1,7 +1,44 @@
 from django import forms
+from django.core.exceptions import ValidationError
+from django.urls import reverse
 from .models import Student, Course, Result
 
 
+class AutocompleteSelect(forms.Select):
+    """Select that only renders the chosen option; other options are fetched as JSON.
+    
+    The page stays the same size however many rows the queryset holds. The
+    script in result_form.html adds a search box that fills the select from
+    ``url_name`` (see views.student_autocomplete / views.course_autocomplete).
+    """
+    
+    def __init__(self, url_name, attrs=None):
+        super().__init__(attrs)
+        self.url_name = url_name
+    
+    def get_context(self, name, value, attrs):
+        context = super().get_context(name, value, attrs)
+        context['widget']['attrs']['data-autocomplete-url'] = reverse(self.url_name)
+        return context
+    
+    def optgroups(self, name, value, attrs=None):
+        # Bound data is unvalidated: skip values that are not valid primary keys
+        pk_field = self.choices.queryset.model._meta.pk
+        selected = []
+        for v in value:
+            if v in (None, ''):
+                continue
+            try:
+                selected.append(pk_field.to_python(v))
+            except (ValidationError, ValueError):
+                continue
+        options = [self.create_option(name, '', self.choices.field.empty_label or '', not selected, 0)]
+        if selected:
+            for index, obj in enumerate(self.choices.queryset.filter(pk__in=selected), start=1):
+                options.append(self.create_option(name, obj.pk, str(obj), True, index))
+        return [(None, options, 0)]
+
+
 class StudentForm(forms.ModelForm):
     class Meta:
         model = Student
@@ -22,11 +59,25 @@ class CourseForm(forms.ModelForm):
         }
 
 
+class ResultImportForm(forms.Form):
+    file = forms.FileField(
+        help_text='CSV or XLSX with columns: student_id, course_code, marks, exam_date (YYYY-MM-DD), remarks (optional)'
+    )
+    
+    def clean_file(self):
+        upload = self.cleaned_data['file']
+        if not upload.name.lower().endswith(('.csv', '.xlsx')):
+            raise forms.ValidationError('Upload a .csv or .xlsx file.')
+        return upload
+
+
 class ResultForm(forms.ModelForm):
     class Meta:
         model = Result
         fields = ['student', 'course', 'marks', 'exam_date', 'remarks']
         widgets = {
+            'student': AutocompleteSelect('student_autocomplete'),
+            'course': AutocompleteSelect('course_autocomplete'),
             'exam_date': forms.DateInput(attrs={'type': 'date'}),
             'remarks': forms.Textarea(attrs={'rows': 3}),
         }
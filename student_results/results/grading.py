@@ -0,0 +1,94 @@
+"""
+Grading scale: the single definition of grade bands and grade points.
+
+``Result.save()``, bulk imports, GPA aggregation and the ``GRADE_CHOICES`` on
+the model all read from ``DEFAULT_SCALE``. Lookups use a precompiled, sorted
+threshold table and ``bisect``; the same table is exposed as SQL ``Case/When``
+expressions so grades and grade points can be recomputed in the database.
+"""
+from bisect import bisect_right
+
+from django.db.models import Case, When, Value, CharField, FloatField
+
+
+class GradingScale:
+    """Letter grade bands defined by their minimum mark and grade point.
+    
+    ``bands`` is an iterable of ``(grade, min_marks, grade_point)``; the band
+    with the lowest minimum must start at 0.
+    """
+    
+    def __init__(self, bands, max_marks=100):
+        bands = sorted(bands, key=lambda band: band[1])
+        if not bands or bands[0][1] != 0:
+            raise ValueError('The lowest grade band must start at 0 marks')
+        
+        self.max_marks = max_marks
+        self.thresholds = [min_marks for _, min_marks, _ in bands]
+        self.grades = [grade for grade, _, _ in bands]
+        self.grade_points = {grade: point for grade, _, point in bands}
+    
+    def grade(self, marks):
+        """Return the letter grade for a single mark"""
+        return self.grades[max(bisect_right(self.thresholds, marks) - 1, 0)]
+    
+    def grade_many(self, marks):
+        """Grade a list (or NumPy array) of marks in one pass"""
+        if hasattr(marks, 'dtype'):
+            import numpy
+            
+            indexes = numpy.searchsorted(self.thresholds, marks, side='right') - 1
+            return numpy.asarray(self.grades, dtype=object)[numpy.clip(indexes, 0, None)].tolist()
+        
+        thresholds, grades = self.thresholds, self.grades
+        return [grades[max(bisect_right(thresholds, value) - 1, 0)] for value in marks]
+    
+    def grade_point(self, grade):
+        return self.grade_points.get(grade, 0.0)
+    
+    @property
+    def pass_marks(self):
+        """Lowest mark earning a non-zero grade point"""
+        return next(
+            min_marks for grade, min_marks in zip(self.grades, self.thresholds) if self.grade_points[grade] > 0
+        )
+    
+    @property
+    def choices(self):
+        """Model field choices, best grade first, e.g. ``('A', 'A (85-89)')``"""
+        choices = []
+        upper = self.max_marks
+        for grade, min_marks in reversed(list(zip(self.grades, self.thresholds))):
+            choices.append((grade, f'{grade} ({min_marks}-{upper})'))
+            upper = min_marks - 1
+        return choices
+    
+    def grade_expression(self, field='marks'):
+        """SQL expression computing the letter grade from a marks column"""
+        whens = [
+            When(**{f'{field}__gte': min_marks}, then=Value(grade))
+            for grade, min_marks in reversed(list(zip(self.grades, self.thresholds)))
+        ]
+        return Case(*whens[:-1], default=Value(self.grades[0]), output_field=CharField())
+    
+    def grade_point_expression(self, field='grade'):
+        """SQL expression mapping a grade column to its grade point"""
+        return Case(
+            *[When(**{field: grade}, then=Value(point)) for grade, point in self.grade_points.items()],
+            default=Value(0.0),
+            output_field=FloatField(),
+        )
+
+
+DEFAULT_SCALE = GradingScale([
+    ('A+', 90, 4.0),
+    ('A', 85, 3.7),
+    ('A-', 80, 3.3),
+    ('B+', 75, 3.0),
+    ('B', 70, 2.7),
+    ('B-', 65, 2.3),
+    ('C+', 60, 2.0),
+    ('C', 55, 1.7),
+    ('D', 50, 1.0),
+    ('F', 0, 0.0),
+])
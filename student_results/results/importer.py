@@ -0,0 +1,220 @@
+"""
+Streaming bulk import of marks sheets (CSV or XLSX).
+
+Rows are read lazily and processed in batches: each batch resolves its
+student IDs and course codes with one query apiece, grades all marks in a
+single pass and upserts on (student, course) with one ``bulk_create``.
+Invalid rows are reported back with their row number and skipped; they do
+not abort the rest of the batch.
+"""
+import csv
+import io
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction, DatabaseError
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from .models import Student, Course, Result, StudentStanding
+from .caching import bump_data_version, bump_course_versions
+from .ranking import rebuild_rankings
+from .stats import invalidate_site_stats
+
+
+REQUIRED_COLUMNS = ['student_id', 'course_code', 'marks', 'exam_date']
+OPTIONAL_COLUMNS = ['remarks']
+DEFAULT_BATCH_SIZE = 2000
+
+
+class ImportFileError(Exception):
+    pass
+
+
+class ImportReport:
+    """Outcome of an import: rows written and per-row errors"""
+    
+    def __init__(self):
+        self.imported = 0
+        self.errors = []
+        self.course_ids = set()
+    
+    def add_error(self, row_number, message):
+        self.errors.append((row_number, message))
+    
+    @property
+    def rows_read(self):
+        return self.imported + len(self.errors)
+
+
+def read_rows(fileobj, filename):
+    """Yield ``(row_number, row_dict)`` from a CSV or XLSX file without loading it all"""
+    if filename.lower().endswith('.xlsx'):
+        return _read_xlsx(fileobj)
+    return _read_csv(fileobj)
+
+
+def _normalise_header(header):
+    return [str(name or '').strip().lower() for name in header]
+
+
+def _check_header(header):
+    missing = [name for name in REQUIRED_COLUMNS if name not in header]
+    if missing:
+        raise ImportFileError(f"Missing required column(s): {', '.join(missing)}")
+
+
+def _read_csv(fileobj):
+    if isinstance(fileobj.read(0), bytes):
+        fileobj = io.TextIOWrapper(fileobj, encoding='utf-8-sig', newline='')
+    reader = csv.reader(fileobj)
+    header = _normalise_header(next(reader, []))
+    _check_header(header)
+    for row_number, values in enumerate(reader, start=2):
+        if any(values):
+            yield row_number, dict(zip(header, values))
+
+
+def _read_xlsx(fileobj):
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ImportFileError('Reading .xlsx files requires openpyxl (pip install openpyxl)')
+    
+    workbook = load_workbook(fileobj, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = _normalise_header(next(rows, []))
+        _check_header(header)
+        for row_number, values in enumerate(rows, start=2):
+            if any(value not in (None, '') for value in values):
+                yield row_number, dict(zip(header, values))
+    finally:
+        workbook.close()
+
+
+def _parse_marks(value):
+    try:
+        marks = Decimal(str(value).strip()).quantize(Decimal('0.01'))
+    except (InvalidOperation, ValueError):
+        raise ValueError(f'invalid marks "{value}"')
+    if not marks.is_finite():
+        raise ValueError(f'invalid marks "{value}"')
+    if not Decimal('0') <= marks <= Decimal('100'):
+        raise ValueError(f'marks {marks} out of range 0-100')
+    return marks
+
+
+def _parse_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    try:
+        parsed = parse_date(str(value).strip())
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        raise ValueError(f'invalid exam_date "{value}" (expected YYYY-MM-DD)')
+    return parsed
+
+
+def _clean(value):
+    return str(value).strip() if value is not None else ''
+
+
+def import_results(rows, created_by=None, batch_size=DEFAULT_BATCH_SIZE, progress=None):
+    """Import ``(row_number, row_dict)`` pairs, returning an ImportReport.
+    
+    ``progress(rows_read, imported)`` is called after each batch.
+    """
+    report = ImportReport()
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            _import_batch(batch, created_by, report)
+            batch = []
+            if progress is not None:
+                progress(report.rows_read, report.imported)
+    if batch:
+        _import_batch(batch, created_by, report)
+        if progress is not None:
+            progress(report.rows_read, report.imported)
+    
+    if report.course_ids:
+        rebuild_rankings(course_ids=report.course_ids)
+        bump_course_versions(report.course_ids)
+    invalidate_site_stats()
+    bump_data_version()
+    return report
+
+
+def import_file(fileobj, filename, created_by=None, batch_size=DEFAULT_BATCH_SIZE, progress=None):
+    return import_results(
+        read_rows(fileobj, filename), created_by=created_by, batch_size=batch_size, progress=progress,
+    )
+
+
+def _import_batch(batch, created_by, report):
+    student_ids = {_clean(row.get('student_id')) for _, row in batch}
+    course_codes = {_clean(row.get('course_code')) for _, row in batch}
+    students = dict(Student.objects.filter(student_id__in=student_ids).values_list('student_id', 'id'))
+    courses = dict(Course.objects.filter(course_code__in=course_codes).values_list('course_code', 'id'))
+    
+    parsed = {}
+    for row_number, row in batch:
+        student_id = _clean(row.get('student_id'))
+        course_code = _clean(row.get('course_code'))
+        try:
+            if student_id not in students:
+                raise ValueError(f'unknown student_id "{student_id}"')
+            if course_code not in courses:
+                raise ValueError(f'unknown course_code "{course_code}"')
+            marks = _parse_marks(row.get('marks'))
+            exam_date = _parse_date(row.get('exam_date'))
+        except ValueError as error:
+            report.add_error(row_number, str(error))
+            continue
+        
+        # A later row for the same (student, course) replaces an earlier one
+        parsed[(students[student_id], courses[course_code])] = (
+            row_number, marks, exam_date, _clean(row.get('remarks')) or None,
+        )
+    
+    if not parsed:
+        return
+    
+    grades = Result.grades_for_marks([marks for _, marks, _, _ in parsed.values()])
+    now = timezone.now()
+    objects = [
+        Result(
+            student_id=student_pk,
+            course_id=course_pk,
+            marks=marks,
+            grade=grade,
+            exam_date=exam_date,
+            remarks=remarks,
+            created_by=created_by,
+            created_at=now,
+            updated_at=now,
+        )
+        for ((student_pk, course_pk), (_, marks, exam_date, remarks)), grade in zip(parsed.items(), grades)
+    ]
+    
+    try:
+        with transaction.atomic():
+            Result.objects.bulk_create(
+                objects,
+                update_conflicts=True,
+                unique_fields=['student', 'course'],
+                update_fields=['marks', 'grade', 'exam_date', 'remarks', 'updated_at'],
+            )
+            StudentStanding.rebuild(student_ids={student_pk for student_pk, _ in parsed})
+    except DatabaseError as error:
+        for row_number, _, _, _ in parsed.values():
+            report.add_error(row_number, f'database error: {error}')
+        return
+    
+    report.imported += len(objects)
+    report.course_ids.update(course_pk for _, course_pk in parsed)
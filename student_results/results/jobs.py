@@ -0,0 +1,328 @@
+"""
+A small database-backed job queue for work that can outlast a request.
+
+Requests on a serverless deployment are cut off after a fixed timeout, so
+bulk imports, large exports and whole-table recomputation (regrading after a
+scale change, rebuilding standings and rankings) are stored as ``Job`` rows
+and run by ``manage.py run_worker`` on a host without that limit. Views
+enqueue a job and redirect to a status page that polls ``job_status``.
+Result edits queue rerank jobs for the courses and semesters they touch (see
+``ranking.py``). The worker is a separate process, so whatever its jobs
+change is announced through the database-backed cache versions of
+``caching.py``, which the web processes read.
+
+Workers claim the oldest due job with ``SELECT ... FOR UPDATE SKIP LOCKED``,
+so several can run against one database without handing out the same job
+twice; the status change is also made conditional, which keeps claims safe
+on backends that ignore row locks (SQLite). A job that raises is retried
+with exponential backoff up to ``max_attempts`` times; ``PermanentJobError``
+(a malformed upload, say) fails it at once. Handlers report progress through
+a callable that writes at most once per ``PROGRESS_INTERVAL`` seconds and
+doubles as the worker's heartbeat, so long steps without progress to report
+call ``report.heartbeat()`` as they go. A running job whose heartbeat is
+older than ``RESULTS_JOB_STALE_AFTER`` seconds (its worker was killed, or is
+stuck) is put back in the queue or, out of attempts, failed. Every write a
+worker makes to a job it claimed is conditional on still holding it, so a
+worker that was given up on cannot overwrite the outcome of the one that took
+the job over.
+"""
+import logging
+import os
+import tempfile
+import time
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .caching import bump_course_versions, bump_data_version
+from .exports import EXPORT_FILTERS, EXPORT_FORMATS, export_lines, filtered_results
+from .importer import ImportFileError, import_file
+from .models import Job, Result, StudentStanding
+from .ranking import rebuild_course_rankings, rebuild_rankings, rebuild_semester_rankings
+from .stats import invalidate_site_stats
+
+
+logger = logging.getLogger(__name__)
+
+PROGRESS_INTERVAL = 1.0
+# Rejected import rows kept on the job for the status page
+MAX_STORED_ERRORS = 500
+
+HANDLERS = {}
+
+
+class PermanentJobError(Exception):
+    """A failure that retrying cannot fix; the job fails without further attempts"""
+
+
+def handler(kind):
+    """Register the decorated function as the runner for jobs of ``kind``"""
+    def register(func):
+        HANDLERS[kind] = func
+        return func
+    return register
+
+
+def enqueue(kind, params=None, created_by=None, input_file=None):
+    """Queue a job, storing ``input_file`` (an upload) for the worker to read"""
+    job = Job(kind=kind, params=params or {}, created_by=created_by)
+    if input_file is not None:
+        job.input_file.save(os.path.basename(input_file.name), input_file, save=False)
+    job.save()
+    return job
+
+
+def enqueue_once(kind, params):
+    """Queue a job unless one with the same kind and params is still waiting to run
+    
+    A job that is already running may have read the data before the change
+    that asks for this one, so only queued jobs count.
+    """
+    if Job.objects.filter(kind=kind, params=params, status=Job.QUEUED).exists():
+        return None
+    return enqueue(kind, params)
+
+
+def enqueue_rerank(course_ids=(), semesters=()):
+    """Queue ranking rebuilds for these courses and semesters, one job each"""
+    for course_id in course_ids:
+        enqueue_once(Job.KIND_RERANK_COURSE, {'course': course_id})
+    for semester in semesters:
+        enqueue_once(Job.KIND_RERANK_SEMESTER, {'semester': semester})
+
+
+def requeue_stale(now=None):
+    """Recover jobs whose worker stopped sending heartbeats; return how many"""
+    now = now or timezone.now()
+    stale = Job.objects.filter(
+        status=Job.RUNNING,
+        heartbeat_at__lt=now - timedelta(seconds=settings.RESULTS_JOB_STALE_AFTER),
+    )
+    failed = stale.filter(attempts__gte=F('max_attempts')).update(
+        status=Job.FAILED, error='The worker stopped responding', locked_by='', finished_at=now,
+    )
+    requeued = stale.update(status=Job.QUEUED, locked_by='', run_after=now)
+    return failed + requeued
+
+
+def claim_job(worker_id, now=None):
+    """Mark the oldest due job as running for ``worker_id`` and return it (None if idle)"""
+    now = now or timezone.now()
+    requeue_stale(now)
+    with transaction.atomic():
+        job = (
+            Job.objects.select_for_update(skip_locked=True)
+            .filter(status=Job.QUEUED, run_after__lte=now)
+            .order_by('run_after', 'id')
+            .first()
+        )
+        if job is None:
+            return None
+        claimed = Job.objects.filter(pk=job.pk, status=Job.QUEUED).update(
+            status=Job.RUNNING,
+            locked_by=worker_id,
+            attempts=job.attempts + 1,
+            started_at=now,
+            heartbeat_at=now,
+            message='',
+        )
+    if not claimed:
+        return None
+    job.refresh_from_db()
+    return job
+
+
+def _owned(job):
+    """The job's row, as long as this attempt still holds it"""
+    return Job.objects.filter(pk=job.pk, locked_by=job.locked_by, attempts=job.attempts)
+
+
+class ProgressReporter:
+    """``report(done, total=None, message=None)`` for handlers, throttled to one write per interval"""
+    
+    def __init__(self, job, interval=PROGRESS_INTERVAL):
+        self.job = job
+        self.interval = interval
+        self.last_write = 0.0
+    
+    def __call__(self, done, total=None, message=None, force=False):
+        self.job.progress = done
+        if total is not None:
+            self.job.total = total
+        if message is not None:
+            self.job.message = message[:255]
+        
+        now = time.monotonic()
+        if not force and now - self.last_write < self.interval:
+            return
+        self.last_write = now
+        _owned(self.job).update(
+            progress=self.job.progress,
+            total=self.job.total,
+            message=self.job.message,
+            heartbeat_at=timezone.now(),
+        )
+    
+    def heartbeat(self):
+        """Show the worker is alive without changing the progress (throttled like a report)"""
+        self(self.job.progress)
+
+
+def retry_delay(attempts):
+    """Seconds to wait before attempt ``attempts + 1``: the base delay, doubled per failure"""
+    return settings.RESULTS_JOB_RETRY_DELAY * 2 ** max(attempts - 1, 0)
+
+
+def run_job(job):
+    """Run a claimed job to completion, recording its result, a retry or the failure"""
+    report = ProgressReporter(job)
+    try:
+        run = HANDLERS.get(job.kind)
+        if run is None:
+            raise PermanentJobError(f'No handler for job kind "{job.kind}"')
+        result = run(job, report)
+    except PermanentJobError as error:
+        job.status = Job.FAILED
+        job.error = str(error)
+    except Exception:
+        logger.exception('Job %s (%s) failed on attempt %s', job.pk, job.kind, job.attempts)
+        job.error = traceback.format_exc()
+        if job.attempts < job.max_attempts:
+            delay = retry_delay(job.attempts)
+            job.status = Job.QUEUED
+            job.run_after = timezone.now() + timedelta(seconds=delay)
+            job.message = f'Attempt {job.attempts} of {job.max_attempts} failed; retrying in {delay}s'
+        else:
+            job.status = Job.FAILED
+    else:
+        job.status = Job.SUCCEEDED
+        job.result = result or {}
+        job.error = ''
+    
+    if job.is_finished:
+        job.finished_at = timezone.now()
+    written = _owned(job).update(
+        status=job.status, result=job.result, error=job.error, message=job.message,
+        progress=job.progress, total=job.total, run_after=job.run_after,
+        locked_by='', finished_at=job.finished_at, output_file=job.output_file,
+    )
+    if not written:
+        # Given up on as stale and handed to another worker (or failed) meanwhile
+        logger.warning('Job %s (%s) was taken from this worker; discarding attempt %s', job.pk, job.kind, job.attempts)
+        output_name = job.output_file.name
+        job.refresh_from_db()
+        if output_name and output_name != job.output_file.name:
+            job.output_file.storage.delete(output_name)
+        return job
+    
+    job.locked_by = ''
+    if job.status == Job.SUCCEEDED and job.input_file:
+        job.input_file.delete(save=False)
+        Job.objects.filter(pk=job.pk).update(input_file='')
+    return job
+
+
+@handler(Job.KIND_IMPORT)
+def run_import(job, report):
+    """Import the uploaded marks sheet"""
+    def on_batch(rows_read, imported):
+        report(rows_read, message=f'{imported} results imported')
+    
+    try:
+        with job.input_file.open('rb') as fileobj:
+            outcome = import_file(
+                fileobj,
+                job.params.get('filename', job.input_file.name),
+                created_by=job.created_by,
+                progress=on_batch,
+            )
+    except ImportFileError as error:
+        raise PermanentJobError(str(error))
+    
+    report(outcome.rows_read, total=outcome.rows_read, force=True)
+    return {
+        'imported': outcome.imported,
+        'rejected': len(outcome.errors),
+        'errors': outcome.errors[:MAX_STORED_ERRORS],
+    }
+
+
+@handler(Job.KIND_EXPORT)
+def run_export(job, report):
+    """Write a filtered CSV / JSON Lines export to ``output_file``"""
+    export_format = job.params.get('format', 'csv')
+    if export_format not in EXPORT_FORMATS:
+        raise PermanentJobError(f'Unknown export format "{export_format}"')
+    
+    results = filtered_results(**{name: job.params.get(name) for name in EXPORT_FILTERS})
+    total = results.count()
+    report(0, total=total, force=True)
+    
+    # The CSV header line is not a result
+    header_lines = 1 if export_format == 'csv' else 0
+    lines = 0
+    with tempfile.TemporaryFile() as output:
+        for line in export_lines(results, export_format):
+            output.write(line.encode('utf-8'))
+            lines += 1
+            if lines % 1000 == 0:
+                report(lines - header_lines)
+        output.seek(0)
+        report(max(lines - header_lines, 0), message='Saving the export file', force=True)
+        job.output_file.save(
+            f"results-{timezone.now():%Y%m%d-%H%M%S}.{export_format}", File(output), save=False,
+        )
+    
+    rows = max(lines - header_lines, 0)
+    report(rows, force=True)
+    return {'rows': rows}
+
+
+@handler(Job.KIND_REGRADE)
+def run_regrade(job, report):
+    """Recompute stored grades from marks, e.g. after the grading scale changes"""
+    results = Result.objects.all()
+    if job.params.get('course'):
+        results = results.filter(course__course_code=job.params['course'])
+    report(0, message='Recomputing grades', force=True)
+    updated = results.regrade(progress=report.heartbeat)
+    report(updated, total=updated, message='', force=True)
+    return {'regraded': updated}
+
+
+@handler(Job.KIND_REBUILD_STANDINGS)
+def run_rebuild_standings(job, report):
+    """Rebuild every GPA standing and all course and semester rankings"""
+    report(0, total=2, message='Rebuilding standings', force=True)
+    StudentStanding.rebuild(progress=report.heartbeat)
+    report(1, message='Rebuilding rankings', force=True)
+    rebuild_rankings(progress=report.heartbeat)
+    invalidate_site_stats()
+    bump_data_version()
+    report(2, message='', force=True)
+    return {'students': StudentStanding.objects.count()}
+
+
+@handler(Job.KIND_RERANK_COURSE)
+def run_rerank_course(job, report):
+    """Rebuild one course's rankings after its results changed"""
+    course_id = job.params['course']
+    rebuild_course_rankings([course_id], progress=report.heartbeat)
+    # Class ranks are shown in cached transcripts and pages
+    bump_course_versions([course_id])
+    bump_data_version()
+    return {'course': course_id}
+
+
+@handler(Job.KIND_RERANK_SEMESTER)
+def run_rerank_semester(job, report):
+    """Rebuild one semester's GPA rankings after its results changed"""
+    semester = job.params['semester']
+    rebuild_semester_rankings([semester], progress=report.heartbeat)
+    bump_data_version()
+    return {'semester': semester}
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+
+from results.exports import filtered_results, export_lines, EXPORT_FORMATS, DEFAULT_CHUNK_SIZE
+
+
+class Command(BaseCommand):
+    help = 'Stream results (joined to student and course) as CSV or JSON Lines'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=sorted(EXPORT_FORMATS), default='csv')
+        parser.add_argument('--output', help='File to write to (default: stdout)')
+        parser.add_argument('--semester')
+        parser.add_argument('--course', help='Course code')
+        parser.add_argument('--grade')
+        parser.add_argument('--student', help='Student ID (exports that student\'s transcript)')
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    
+    def handle(self, *args, **options):
+        results = filtered_results(
+            semester=options['semester'],
+            course=options['course'],
+            grade=options['grade'],
+            student=options['student'],
+        )
+        lines = export_lines(results, options['format'], chunk_size=options['chunk_size'])
+        
+        if options['output']:
+            with open(options['output'], 'w', newline='', encoding='utf-8') as output:
+                output.writelines(lines)
+        else:
+            for line in lines:
+                self.stdout.write(line, ending='')
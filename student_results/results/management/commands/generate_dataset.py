@@ -0,0 +1,61 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from results.models import Student, Course
+from results.synthetic import seed_dataset, student_code, course_code, DEFAULT_BATCH_SIZE, DEFAULT_PASSWORD
+
+
+class Command(BaseCommand):
+    help = (
+        'Generate a deterministic synthetic dataset (students, courses, teachers and results) '
+        'with batched bulk inserts, for load testing'
+    )
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=1000)
+        parser.add_argument('--courses', type=int, default=20)
+        parser.add_argument('--results-per-student', type=int, default=6)
+        parser.add_argument('--teachers', type=int, help='Teacher accounts (default: one per 3 courses)')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+        parser.add_argument('--password', default=DEFAULT_PASSWORD, help='Password for every teacher account')
+    
+    def handle(self, *args, **options):
+        if options['students'] < 0 or options['courses'] < 1:
+            raise CommandError('--students must be >= 0 and --courses >= 1')
+        if (Student.objects.filter(student_id=student_code(0)).exists()
+                or Course.objects.filter(course_code=course_code(0)).exists()):
+            raise CommandError('Synthetic data already exists in this database; generate into an empty one')
+        
+        teachers = options['teachers']
+        if teachers is None:
+            teachers = max(1, options['courses'] // 3)
+        total = options['students']
+        started = time.monotonic()
+        
+        def progress(students_done, results_done):
+            elapsed = time.monotonic() - started
+            self.stdout.write(
+                f'  {students_done}/{total} students, {results_done} results '
+                f'({results_done / elapsed:,.0f} results/s)'
+            )
+        
+        with transaction.atomic():
+            counts = seed_dataset(
+                students=total,
+                courses=options['courses'],
+                results_per_student=options['results_per_student'],
+                seed=options['seed'],
+                teachers=teachers,
+                batch_size=options['batch_size'],
+                password=options['password'],
+                progress=progress,
+            )
+        
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {counts['students']} students, {counts['courses']} courses, "
+            f"{counts['teachers']} teachers and {counts['results']} results "
+            f'in {time.monotonic() - started:.1f}s'
+        ))
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from results.models import Student
+
+
+class Command(BaseCommand):
+    help = 'Generate photo thumbnails for students that have a photo but no (or stale) thumbnails'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all', action='store_true',
+            help='Recheck every student with a photo, e.g. after THUMBNAIL_SIZES changes',
+        )
+    
+    def handle(self, *args, **options):
+        students = Student.objects.exclude(photo='').exclude(photo__isnull=True)
+        if not options['all']:
+            students = students.filter(thumbnails={})
+        
+        generated = failed = 0
+        for student in students.iterator(chunk_size=200):
+            if options['all']:
+                student.thumbnails = {}
+            student.refresh_thumbnails()
+            if student.thumbnails:
+                generated += 1
+            else:
+                failed += 1
+                self.stderr.write(f'{student.student_id}: could not read {student.photo.name}')
+        
+        self.stdout.write(self.style.SUCCESS(f'Thumbnails generated for {generated} students ({failed} failed)'))
@@ -0,0 +1,34 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from results.importer import import_file, ImportFileError, DEFAULT_BATCH_SIZE
+
+
+class Command(BaseCommand):
+    help = 'Bulk import marks from a CSV or XLSX sheet (student_id, course_code, marks, exam_date[, remarks])'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Path to a .csv or .xlsx file')
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+        parser.add_argument('--user', help='Username recorded as created_by for new results')
+    
+    def handle(self, *args, **options):
+        created_by = None
+        if options['user']:
+            try:
+                created_by = User.objects.get(username=options['user'])
+            except User.DoesNotExist:
+                raise CommandError(f"User {options['user']} does not exist")
+        
+        path = options['path']
+        try:
+            with open(path, 'rb') as fileobj:
+                report = import_file(fileobj, path, created_by=created_by, batch_size=options['batch_size'])
+        except (OSError, ImportFileError) as error:
+            raise CommandError(str(error))
+        
+        for row_number, message in report.errors:
+            self.stderr.write(f'Row {row_number}: {message}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {report.imported} results ({len(report.errors)} rows rejected)'
+        ))
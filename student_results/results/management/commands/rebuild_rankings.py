@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from results.models import Course, CourseRanking, SemesterRanking
+from results.ranking import rebuild_rankings
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the precomputed course and semester rankings from the Result table'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'course_codes', nargs='*',
+            help='Only rebuild these courses (and their semesters); defaults to everything',
+        )
+    
+    def handle(self, *args, **options):
+        course_ids = None
+        if options['course_codes']:
+            course_ids = list(
+                Course.objects.filter(course_code__in=options['course_codes']).values_list('id', flat=True)
+            )
+        
+        rebuild_rankings(course_ids=course_ids)
+        self.stdout.write(self.style.SUCCESS(
+            f'Rankings: {CourseRanking.objects.count()} results, {SemesterRanking.objects.count()} semester ranks'
+        ))
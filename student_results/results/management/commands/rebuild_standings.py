@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from results.models import Student, StudentStanding
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the materialised GPA standings from the Result table'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'student_ids', nargs='*',
+            help='Only rebuild these students (by student_id); defaults to everyone',
+        )
+        parser.add_argument('--batch-size', type=int, default=1000)
+    
+    def handle(self, *args, **options):
+        student_ids = None
+        if options['student_ids']:
+            student_ids = list(
+                Student.objects.filter(student_id__in=options['student_ids']).values_list('id', flat=True)
+            )
+        
+        StudentStanding.rebuild(student_ids=student_ids, batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Rebuilt standings for {StudentStanding.objects.count()} students'
+        ))
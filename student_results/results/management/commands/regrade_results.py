@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from results.models import Result
+
+
+class Command(BaseCommand):
+    help = 'Recompute every stored grade from its marks using the current grading scale'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--course', help='Only regrade results for this course code')
+    
+    def handle(self, *args, **options):
+        results = Result.objects.all()
+        if options['course']:
+            results = results.filter(course__course_code=options['course'])
+        
+        updated = results.regrade()
+        self.stdout.write(self.style.SUCCESS(f'Regraded {updated} results'))
@@ -0,0 +1,102 @@
+import json
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import setup_test_environment, teardown_test_environment, setup_databases, teardown_databases
+
+from results.benchmarks import run_benchmarks, compare, BenchmarkError, BENCHMARK_VIEWS
+from results.synthetic import seed_dataset
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark the hot views against a synthetic dataset in a throwaway test database; '
+        'reports p50/p95/p99, queries and bytes (raw, gzip, Brotli) per view and compares them with a JSON baseline'
+    )
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=1000)
+        parser.add_argument('--courses', type=int, default=20)
+        parser.add_argument('--results-per-student', type=int, default=6)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--iterations', type=int, default=50, help='Timed requests per view (min 2)')
+        parser.add_argument('--view', action='append', dest='views', choices=[view[0] for view in BENCHMARK_VIEWS])
+        parser.add_argument('--output', help='Write this run as JSON')
+        parser.add_argument('--baseline', help='JSON file from an earlier --output to compare against')
+        parser.add_argument('--tolerance', type=float, default=0.25, help='Allowed relative slowdown (default 0.25)')
+        parser.add_argument('--keepdb', action='store_true', help='Reuse the test database between runs')
+    
+    def handle(self, *args, **options):
+        if options['iterations'] < 2:
+            raise CommandError('--iterations must be at least 2')
+        
+        baseline = None
+        if options['baseline']:
+            try:
+                with open(options['baseline'], encoding='utf-8') as fileobj:
+                    baseline = json.load(fileobj)
+            except (OSError, ValueError) as error:
+                raise CommandError(f"Cannot read baseline {options['baseline']}: {error}")
+        
+        setup_test_environment()
+        old_config = setup_databases(verbosity=0, interactive=False, keepdb=options['keepdb'])
+        try:
+            report = self.benchmark(options)
+        finally:
+            teardown_databases(old_config, verbosity=0, keepdb=options['keepdb'])
+            teardown_test_environment()
+        
+        self.stdout.write(
+            f"{'view':<16}{'cold ms':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'queries':>9}"
+            f"{'bytes':>9}{'gzip':>8}{'br':>8}{'304':>6}"
+        )
+        for name, row in report['views'].items():
+            self.stdout.write(
+                f"{name:<16}{row['cold_ms']:>9}{row['p50_ms']:>9}{row['p95_ms']:>9}"
+                f"{row['p99_ms']:>9}{row['queries']:>9}{row['bytes']:>9}{row['gzip_bytes']:>8}"
+                f"{row['br_bytes'] if row['br_bytes'] is not None else '-':>8}"
+                f"{row['revalidated_bytes'] if row['revalidated_bytes'] is not None else '-':>6}"
+            )
+        
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as fileobj:
+                json.dump(report, fileobj, indent=2)
+                fileobj.write('\n')
+        
+        if baseline is not None:
+            regressions = compare(report['views'], baseline.get('views', {}), options['tolerance'])
+            if regressions:
+                for regression in regressions:
+                    self.stderr.write(regression)
+                raise CommandError(f'{len(regressions)} regression(s) against {options["baseline"]}')
+            self.stdout.write(self.style.SUCCESS(f"No regressions against {options['baseline']}"))
+    
+    def benchmark(self, options):
+        if not options['keepdb'] or not User.objects.filter(username='benchmark').exists():
+            user = User.objects.create_user('benchmark', password='benchmark')
+            counts = seed_dataset(
+                students=options['students'],
+                courses=options['courses'],
+                results_per_student=options['results_per_student'],
+                seed=options['seed'],
+                created_by=user,
+            )
+        else:
+            user = User.objects.get(username='benchmark')
+            counts = None
+        
+        try:
+            views = run_benchmarks(user, iterations=options['iterations'], views=options['views'])
+        except BenchmarkError as error:
+            raise CommandError(str(error))
+        
+        return {
+            'dataset': counts or {
+                'students': options['students'],
+                'courses': options['courses'],
+                'results_per_student': options['results_per_student'],
+            },
+            'seed': options['seed'],
+            'iterations': options['iterations'],
+            'views': views,
+        }
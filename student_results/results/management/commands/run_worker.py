@@ -0,0 +1,52 @@
+import os
+import signal
+import socket
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from results.jobs import claim_job, run_job
+
+
+class Command(BaseCommand):
+    help = 'Run queued background jobs (imports, exports, regrades, reranking) until stopped'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Exit when the queue is empty instead of waiting for more jobs (e.g. from cron)',
+        )
+        parser.add_argument('--sleep', type=float, default=2.0, help='Seconds to wait when the queue is empty')
+        parser.add_argument('--max-jobs', type=int, default=0, help='Exit after this many jobs (0: no limit)')
+        parser.add_argument('--worker-id', help='Name recorded on claimed jobs; defaults to host:pid')
+    
+    def handle(self, *args, **options):
+        worker_id = options['worker_id'] or f'{socket.gethostname()}:{os.getpid()}'
+        self.stopping = False
+        # Finish the current job on SIGTERM/SIGINT rather than abandoning it
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        
+        processed = 0
+        while not self.stopping:
+            close_old_connections()
+            job = claim_job(worker_id)
+            if job is None:
+                if options['once']:
+                    break
+                time.sleep(options['sleep'])
+                continue
+            
+            self.stdout.write(f'{worker_id}: running {job} (attempt {job.attempts}/{job.max_attempts})')
+            job = run_job(job)
+            style = self.style.SUCCESS if job.status == job.SUCCEEDED else self.style.WARNING
+            self.stdout.write(style(f'{worker_id}: {job}'))
+            processed += 1
+            if options['max_jobs'] and processed >= options['max_jobs']:
+                break
+        
+        self.stdout.write(self.style.SUCCESS(f'Processed {processed} jobs'))
+    
+    def stop(self, signum, frame):
+        self.stopping = True
@@ -0,0 +1,170 @@
+"""
+Per-request query instrumentation (opt-in with RESULTS_QUERY_METRICS=1).
+
+``QueryMetricsMiddleware`` installs a ``connection.execute_wrapper`` for the
+duration of each request and records the number of queries, total SQL time,
+the slowest statement and statements repeated at least
+``RESULTS_REPEATED_QUERY_THRESHOLD`` times (the usual sign of an N+1 loop).
+Each response carries a ``Server-Timing`` header, repeated statements are
+logged, as is the slowest statement's SQL once it takes at least
+``RESULTS_SLOW_QUERY_THRESHOLD_MS``, and per-view totals are kept in process and served in Prometheus
+text format at ``/metrics``. Every worker process exposes its own counters.
+"""
+import logging
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse, Http404
+
+
+logger = logging.getLogger(__name__)
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+class QueryRecorder:
+    """``execute_wrapper`` callable collecting statistics for one request"""
+    
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.slowest_sql = None
+        self.slowest_duration = 0.0
+        self.statements = Counter()
+    
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.count += 1
+            self.duration += elapsed
+            # Parameters are passed separately, so identical SQL text means
+            # the same statement run with different values
+            self.statements[sql] += 1
+            if elapsed > self.slowest_duration:
+                self.slowest_sql, self.slowest_duration = sql, elapsed
+    
+    def repeated(self, threshold):
+        """``[(sql, times)]`` for statements run at least ``threshold`` times"""
+        return [(sql, times) for sql, times in self.statements.most_common() if times >= threshold]
+
+
+class MetricsRegistry:
+    """Thread-safe per-view counters rendered in Prometheus text format"""
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+    
+    def reset(self):
+        self.requests = Counter()
+        self.queries = Counter()
+        self.db_seconds = defaultdict(float)
+        self.request_seconds = defaultdict(float)
+        self.slowest_query_seconds = defaultdict(float)
+        self.repeated_queries = Counter()
+        self.buckets = defaultdict(lambda: [0] * len(DURATION_BUCKETS))
+    
+    def observe(self, view, recorder, duration, repeated):
+        with self.lock:
+            self.requests[view] += 1
+            self.queries[view] += recorder.count
+            self.db_seconds[view] += recorder.duration
+            self.request_seconds[view] += duration
+            self.slowest_query_seconds[view] = max(self.slowest_query_seconds[view], recorder.slowest_duration)
+            self.repeated_queries[view] += len(repeated)
+            buckets = self.buckets[view]
+            for index, bound in enumerate(DURATION_BUCKETS):
+                if duration <= bound:
+                    buckets[index] += 1
+    
+    def render(self):
+        with self.lock:
+            views = sorted(self.requests)
+            lines = []
+            
+            def metric(name, kind, help_text, values):
+                lines.append(f'# HELP {name} {help_text}')
+                lines.append(f'# TYPE {name} {kind}')
+                for view in views:
+                    lines.append(f'{name}{{view="{view}"}} {values[view]}')
+            
+            metric('results_requests_total', 'counter', 'Requests handled', self.requests)
+            metric('results_db_queries_total', 'counter', 'SQL statements executed', self.queries)
+            metric('results_db_seconds_total', 'counter', 'Time spent executing SQL', self.db_seconds)
+            metric('results_db_slowest_query_seconds', 'gauge', 'Slowest single SQL statement seen', self.slowest_query_seconds)
+            metric('results_repeated_queries_total', 'counter', 'Statements repeated within one request (possible N+1)', self.repeated_queries)
+            
+            name = 'results_request_duration_seconds'
+            lines.append(f'# HELP {name} Request duration')
+            lines.append(f'# TYPE {name} histogram')
+            for view in views:
+                for bound, count in zip(DURATION_BUCKETS, self.buckets[view]):
+                    lines.append(f'{name}_bucket{{view="{view}",le="{bound}"}} {count}')
+                lines.append(f'{name}_bucket{{view="{view}",le="+Inf"}} {self.requests[view]}')
+                lines.append(f'{name}_sum{{view="{view}"}} {self.request_seconds[view]}')
+                lines.append(f'{name}_count{{view="{view}"}} {self.requests[view]}')
+            return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+
+
+def _view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unresolved'
+    return match.view_name or match._func_path
+
+
+class QueryMetricsMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.threshold = getattr(settings, 'RESULTS_REPEATED_QUERY_THRESHOLD', 5)
+        self.slow_threshold = getattr(settings, 'RESULTS_SLOW_QUERY_THRESHOLD_MS', 100) / 1000
+    
+    def __call__(self, request):
+        recorder = QueryRecorder()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            response = self.get_response(request)
+        duration = time.perf_counter() - started
+        
+        view = _view_name(request)
+        repeated = recorder.repeated(self.threshold)
+        registry.observe(view, recorder, duration, repeated)
+        
+        for sql, times in repeated:
+            logger.warning(
+                '%s ran the same statement %d times (possible N+1): %s; slowest statement (%.1f ms): %s',
+                view, times, sql, recorder.slowest_duration * 1000, recorder.slowest_sql,
+            )
+        if recorder.slowest_sql is not None and recorder.slowest_duration >= self.slow_threshold:
+            logger.warning(
+                '%s ran a slow statement (%.1f ms): %s', view, recorder.slowest_duration * 1000, recorder.slowest_sql,
+            )
+        
+        response.headers['Server-Timing'] = ', '.join([
+            f'db;dur={recorder.duration * 1000:.1f};desc="{recorder.count} queries"',
+            f'db-slowest;dur={recorder.slowest_duration * 1000:.1f}',
+            f'total;dur={duration * 1000:.1f}',
+        ])
+        return response
+
+
+def metrics_view(request):
+    """Prometheus scrape endpoint; 404 unless metrics are enabled"""
+    if not getattr(settings, 'RESULTS_QUERY_METRICS', False):
+        raise Http404
+    token = getattr(settings, 'RESULTS_METRICS_TOKEN', '')
+    if token and request.headers.get('Authorization') != f'Bearer {token}':
+        return HttpResponse('Unauthorized', status=401, content_type='text/plain')
+    return HttpResponse(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,141 @@
+"""
+Compression and conditional GET for dynamic responses.
+
+WhiteNoise pre-compresses static files; these two middlewares do the same job
+for HTML, JSON and CSV produced by the views:
+
+``ConditionalGetMiddleware`` gives every successful GET a weak ``ETag``
+computed from the uncompressed body (weak, because the bytes on the wire
+differ per ``Content-Encoding``) and answers a matching ``If-None-Match``
+with an empty 304. ``CompressionMiddleware`` then compresses bodies of at
+least ``RESULTS_COMPRESSION_MIN_SIZE`` bytes with Brotli when the client
+accepts it and the ``brotli`` package is installed, and with gzip otherwise.
+Streaming responses (exports) are compressed chunk by chunk. As in Django's
+``GZipMiddleware``, gzip output is padded with random bytes to blunt
+BREACH-style length attacks; CSRF tokens are masked per response anyway.
+
+Per-view ``Cache-Control`` is set by ``caching.public_cache_control``.
+"""
+import hashlib
+import re
+
+from django.conf import settings
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+from django.utils.http import parse_http_date_safe, quote_etag
+from django.utils.text import compress_sequence, compress_string
+
+
+COMPRESSIBLE_TYPES = re.compile(r'^(text/|application/(json|javascript|xml|x-ndjson))')
+
+
+def _accepts(request, coding):
+    """Whether ``Accept-Encoding`` lists ``coding`` with a non-zero quality"""
+    for part in request.META.get('HTTP_ACCEPT_ENCODING', '').split(','):
+        name, _, params = part.partition(';')
+        if name.strip().lower() != coding:
+            continue
+        quality = re.search(r'q\s*=\s*([0-9.]+)', params)
+        try:
+            return float(quality.group(1)) > 0 if quality else True
+        except ValueError:
+            return False
+    return False
+
+
+def _weaken_etag(response):
+    etag = response.get('ETag')
+    if etag and etag.startswith('"'):
+        response.headers['ETag'] = f'W/{etag}'
+
+
+class ConditionalGetMiddleware(MiddlewareMixin):
+    """Weak ETags for GET responses and 304 Not Modified for matching revalidations"""
+    
+    def process_response(self, request, response):
+        if request.method not in ('GET', 'HEAD') or response.status_code != 200 or response.streaming:
+            return response
+        if 'no-store' in response.get('Cache-Control', ''):
+            return response
+        
+        if not response.has_header('ETag'):
+            response.headers['ETag'] = 'W/' + quote_etag(hashlib.md5(response.content).hexdigest())
+        return get_conditional_response(
+            request,
+            etag=response['ETag'],
+            last_modified=parse_http_date_safe(response.get('Last-Modified')),
+            response=response,
+        )
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """Brotli or gzip for text responses above a size threshold"""
+    
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.min_size = getattr(settings, 'RESULTS_COMPRESSION_MIN_SIZE', 1024)
+        self.brotli_quality = getattr(settings, 'RESULTS_BROTLI_QUALITY', 5)
+        try:
+            import brotli
+        except ImportError:
+            brotli = None
+        self.brotli = brotli
+    
+    def process_response(self, request, response):
+        if not response.streaming and len(response.content) < self.min_size:
+            return response
+        if response.has_header('Content-Encoding'):
+            return response
+        if not COMPRESSIBLE_TYPES.match(response.get('Content-Type', '')):
+            return response
+        
+        patch_vary_headers(response, ('Accept-Encoding',))
+        if self.brotli is not None and _accepts(request, 'br'):
+            coding = 'br'
+        elif _accepts(request, 'gzip'):
+            coding = 'gzip'
+        else:
+            return response
+        
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = self._compress_async(response.streaming_content, coding)
+            elif coding == 'br':
+                response.streaming_content = self._brotli_sequence(response.streaming_content)
+            else:
+                response.streaming_content = compress_sequence(response.streaming_content, max_random_bytes=100)
+            del response['Content-Length']
+        else:
+            if coding == 'br':
+                compressed = self.brotli.compress(response.content, quality=self.brotli_quality)
+            else:
+                compressed = compress_string(response.content, max_random_bytes=100)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers['Content-Length'] = str(len(compressed))
+        
+        _weaken_etag(response)
+        response.headers['Content-Encoding'] = coding
+        return response
+    
+    def _brotli_sequence(self, sequence):
+        compressor = self.brotli.Compressor(quality=self.brotli_quality)
+        for chunk in sequence:
+            data = compressor.process(chunk)
+            if data:
+                yield data
+        yield compressor.finish()
+    
+    async def _compress_async(self, sequence, coding):
+        if coding == 'br':
+            compressor = self.brotli.Compressor(quality=self.brotli_quality)
+            async for chunk in sequence:
+                data = compressor.process(chunk)
+                if data:
+                    yield data
+            yield compressor.finish()
+        else:
+            # One gzip member per chunk, as Django's GZipMiddleware does for async streams
+            async for chunk in sequence:
+                yield compress_string(chunk, max_random_bytes=100)
@@ -0,0 +1,56 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:07
+
+from decimal import Decimal
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+GRADE_POINTS = {
+    'A+': 4.0, 'A': 3.7, 'A-': 3.3,
+    'B+': 3.0, 'B': 2.7, 'B-': 2.3,
+    'C+': 2.0, 'C': 1.7, 'D': 1.0, 'F': 0.0
+}
+
+
+def populate_standings(apps, schema_editor):
+    Result = apps.get_model('results', 'Result')
+    StudentStanding = apps.get_model('results', 'StudentStanding')
+    
+    totals = {}
+    for student_id, grade, credits in Result.objects.values_list('student_id', 'grade', 'course__credits').iterator():
+        points, credit_sum, count = totals.get(student_id, (Decimal('0'), 0, 0))
+        totals[student_id] = (points + Decimal(str(GRADE_POINTS.get(grade, 0.0))), credit_sum + credits, count + 1)
+    
+    StudentStanding.objects.bulk_create([
+        StudentStanding(
+            student_id=student_id,
+            grade_point_sum=points,
+            credit_sum=credit_sum,
+            result_count=count,
+            gpa=round(points / count, 2),
+        )
+        for student_id, (points, credit_sum, count) in totals.items()
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('results', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StudentStanding',
+            fields=[
+                ('student', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='standing', serialize=False, to='results.student')),
+                ('grade_point_sum', models.DecimalField(decimal_places=2, default=0, max_digits=8)),
+                ('credit_sum', models.IntegerField(default=0)),
+                ('result_count', models.IntegerField(default=0)),
+                ('gpa', models.DecimalField(decimal_places=2, default=0, max_digits=3)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(populate_standings, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,43 @@
+from django.db import migrations
+
+
+TRIGRAM_INDEXES = [
+    ('results_student', 'student_id'),
+    ('results_student', 'first_name'),
+    ('results_student', 'last_name'),
+    ('results_student', 'email'),
+    ('results_course', 'course_code'),
+    ('results_course', 'course_name'),
+]
+
+
+def create_trigram_indexes(apps, schema_editor):
+    """GIN trigram indexes on UPPER(column), matching Django's icontains SQL (PostgreSQL only)"""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for table, column in TRIGRAM_INDEXES:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {table}_{column}_trgm '
+            f'ON {table} USING gin ((UPPER({column}::text)) gin_trgm_ops)'
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    
+    for table, column in TRIGRAM_INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {table}_{column}_trgm')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('results', '0002_studentstanding'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
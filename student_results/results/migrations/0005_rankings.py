@@ -0,0 +1,115 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:26
+
+from decimal import Decimal
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Avg, Case, Count, F, FloatField, Q, Value, When, Window
+from django.db.models.functions import CumeDist, PercentRank, Rank, Round
+
+
+GRADE_POINTS = {
+    'A+': 4.0, 'A': 3.7, 'A-': 3.3,
+    'B+': 3.0, 'B': 2.7, 'B-': 2.3,
+    'C+': 2.0, 'C': 1.7, 'D': 1.0, 'F': 0.0
+}
+
+
+def _windows(partition_by=None, order_by=None):
+    return {
+        'rank': Window(Rank(), partition_by=partition_by, order_by=order_by),
+        'percent_rank': Window(PercentRank(), partition_by=partition_by, order_by=order_by),
+        'cume_dist': Window(CumeDist(), partition_by=partition_by, order_by=order_by),
+        'cohort_size': Window(Count('id'), partition_by=partition_by),
+    }
+
+
+def populate_rankings(apps, schema_editor):
+    Course = apps.get_model('results', 'Course')
+    Result = apps.get_model('results', 'Result')
+    Student = apps.get_model('results', 'Student')
+    CourseRanking = apps.get_model('results', 'CourseRanking')
+    SemesterRanking = apps.get_model('results', 'SemesterRanking')
+    
+    rows = Result.objects.order_by().annotate(
+        **_windows(partition_by=[F('course_id')], order_by=F('marks').desc())
+    ).values('id', 'course_id', 'rank', 'percent_rank', 'cume_dist', 'cohort_size')
+    CourseRanking.objects.bulk_create(
+        (
+            CourseRanking(
+                result_id=row['id'], course_id=row['course_id'], rank=row['rank'],
+                percent_rank=row['percent_rank'], cume_dist=row['cume_dist'], cohort_size=row['cohort_size'],
+            )
+            for row in rows.iterator()
+        ),
+        batch_size=1000,
+    )
+    
+    points = Case(
+        *[When(result__grade=grade, then=Value(point)) for grade, point in GRADE_POINTS.items()],
+        default=Value(0.0),
+        output_field=FloatField(),
+    )
+    for semester in Course.objects.order_by().values_list('semester', flat=True).distinct():
+        in_semester = Q(result__course__semester=semester)
+        rows = Student.objects.annotate(
+            results_in_semester=Count('result', filter=in_semester),
+            gpa=Round(Avg(points, filter=in_semester), 2),
+        ).filter(results_in_semester__gt=0).order_by().annotate(
+            **_windows(order_by=F('gpa').desc())
+        ).values('id', 'gpa', 'rank', 'percent_rank', 'cume_dist', 'cohort_size')
+        SemesterRanking.objects.bulk_create(
+            (
+                SemesterRanking(
+                    student_id=row['id'], semester=semester, gpa=Decimal(str(row['gpa'])), rank=row['rank'],
+                    percent_rank=row['percent_rank'], cume_dist=row['cume_dist'], cohort_size=row['cohort_size'],
+                )
+                for row in rows.iterator()
+            ),
+            batch_size=1000,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('results', '0004_result_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CourseRanking',
+            fields=[
+                ('result', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='ranking', serialize=False, to='results.result')),
+                ('rank', models.PositiveIntegerField()),
+                ('percent_rank', models.FloatField()),
+                ('cume_dist', models.FloatField()),
+                ('cohort_size', models.PositiveIntegerField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rankings', to='results.course')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['course', 'rank', 'result'], name='courseranking_leaderboard_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='SemesterRanking',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('semester', models.CharField(max_length=20)),
+                ('gpa', models.DecimalField(decimal_places=2, max_digits=3)),
+                ('rank', models.PositiveIntegerField()),
+                ('percent_rank', models.FloatField()),
+                ('cume_dist', models.FloatField()),
+                ('cohort_size', models.PositiveIntegerField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='semester_rankings', to='results.student')),
+            ],
+            options={
+                'ordering': ['semester'],
+                'indexes': [models.Index(fields=['semester', 'rank'], name='semesterranking_rank_idx')],
+                'constraints': [models.UniqueConstraint(fields=('student', 'semester'), name='semesterranking_student_semester_uniq')],
+            },
+        ),
+        migrations.RunPython(populate_rankings, migrations.RunPython.noop),
+    ]
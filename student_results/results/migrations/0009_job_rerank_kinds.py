@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('results', '0008_cacheversion'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='job',
+            name='kind',
+            field=models.CharField(choices=[('import', 'Import results'), ('export', 'Export results'), ('regrade', 'Regrade results'), ('rebuild_standings', 'Rebuild standings and rankings'), ('rerank_course', 'Rebuild course rankings'), ('rerank_semester', 'Rebuild semester rankings')], max_length=30),
+        ),
+    ]
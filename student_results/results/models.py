@@ -1,9 +1,50 @@
+from decimal import Decimal
+
 from django.db import models
 
 # Create your models here.
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Value, Sum, Count, Avg, F, Q, FloatField, ExpressionWrapper
+from django.db.models.functions import Coalesce, NullIf, Now, Round
 from django.contrib.auth.models import User
 from django.core.validators import MinValueValidator, MaxValueValidator
+from django.utils import timezone
+
+from .grading import DEFAULT_SCALE
+
+
+class StudentQuerySet(models.QuerySet):
+    def with_gpa(self, semester=None, course=None):
+        """Annotate each student with GPA computed by the database in one query.
+        
+        Adds ``gpa`` (plain average of grade points, as ``calculate_gpa``),
+        ``weighted_gpa`` (weighted by ``Course.credits``), ``gpa_credits`` and
+        ``gpa_results``. Only results matching ``semester`` and ``course`` (a
+        Course or its pk) are counted.
+        """
+        result_filter = Q()
+        if semester is not None:
+            result_filter &= Q(result__course__semester=semester)
+        if course is not None:
+            result_filter &= Q(result__course=course)
+        
+        points = Result.grade_point_expression('result__grade')
+        credits = F('result__course__credits')
+        weighted_points = ExpressionWrapper(points * credits, output_field=FloatField())
+        
+        return self.annotate(
+            gpa_results=Count('result', filter=result_filter),
+            gpa_credits=Coalesce(Sum(credits, filter=result_filter), 0),
+            gpa=Coalesce(Round(Avg(points, filter=result_filter), 2), 0.0),
+            weighted_gpa=Coalesce(
+                Round(
+                    Sum(weighted_points, filter=result_filter)
+                    / NullIf(Sum(credits, filter=result_filter, output_field=FloatField()), Value(0.0)),
+                    2,
+                ),
+                0.0,
+            ),
+        )
 
 
 class Student(models.Model):
@@ -17,6 +58,10 @@ class Student(models.Model):
     address = models.TextField()
     enrollment_date = models.DateField(auto_now_add=True)
     photo = models.ImageField(upload_to='students/', blank=True, null=True)
+    # {size name: storage name}, filled in from ``photo`` (see thumbnails.py)
+    thumbnails = models.JSONField(default=dict, blank=True, editable=False)
+    
+    objects = StudentQuerySet.as_manager()
     
     class Meta:
         ordering = ['student_id']
@@ -27,8 +72,53 @@ class Student(models.Model):
     def get_full_name(self):
         return f"{self.first_name} {self.last_name}"
     
+    def save(self, *args, **kwargs):
+        """Regenerate the photo thumbnails when the photo is replaced or cleared"""
+        previous_photo = None
+        if self.pk:
+            previous_photo = Student.objects.filter(pk=self.pk).values_list('photo', flat=True).first()
+        
+        super().save(*args, **kwargs)
+        
+        if (self.photo.name or None) != (previous_photo or None) or (self.photo and not self.thumbnails):
+            self.refresh_thumbnails()
+    
+    def refresh_thumbnails(self):
+        """Render thumbnails for the current photo and store their names"""
+        from .thumbnails import generate_thumbnails
+        
+        thumbnails = {}
+        if self.photo:
+            try:
+                thumbnails = generate_thumbnails(self.photo)
+            except OSError:
+                # Missing or unreadable file: fall back to the initials avatar
+                thumbnails = {}
+        if thumbnails != self.thumbnails:
+            self.thumbnails = thumbnails
+            Student.objects.filter(pk=self.pk).update(thumbnails=thumbnails)
+    
+    def thumbnail_url(self, size):
+        from .thumbnails import thumbnail_url
+        
+        name = self.thumbnails.get(size)
+        return thumbnail_url(name) if name else None
+    
+    @property
+    def thumbnail_small_url(self):
+        return self.thumbnail_url('small')
+    
+    @property
+    def thumbnail_medium_url(self):
+        return self.thumbnail_url('medium')
+    
     def calculate_gpa(self):
         """Calculate overall GPA for the student"""
+        try:
+            return float(self.standing.gpa)
+        except StudentStanding.DoesNotExist:
+            pass
+        
         results = self.result_set.all()
         if not results:
             return 0.0
@@ -50,6 +140,22 @@ class Course(models.Model):
     
     def __str__(self):
         return f"{self.course_code} - {self.course_name}"
+    
+    def save(self, *args, **kwargs):
+        """Rebuild affected standings and rankings when a course's credits or semester change"""
+        previous = None
+        if self.pk:
+            previous = Course.objects.filter(pk=self.pk).values('credits', 'semester').first()
+        
+        super().save(*args, **kwargs)
+        
+        if previous and previous['credits'] != self.credits:
+            student_ids = Result.objects.filter(course=self).values_list('student_id', flat=True)
+            StudentStanding.rebuild(student_ids=list(student_ids))
+        if previous and previous['semester'] != self.semester:
+            from .ranking import schedule_ranking_rebuild
+            
+            schedule_ranking_rebuild(semesters=[previous['semester'], self.semester])
 
 
 class Teacher(models.Model):
@@ -64,20 +170,31 @@ class Teacher(models.Model):
         return f"{self.employee_id} - {self.user.get_full_name()}"
 
 
+class ResultQuerySet(models.QuerySet):
+    def regrade(self, progress=None):
+        """Recompute stored grades from marks in the database, e.g. after the scale changes
+        
+        ``progress()`` is called between batches of the standings and ranking rebuilds.
+        """
+        student_ids = list(self.order_by().values_list('student_id', flat=True).distinct())
+        course_ids = list(self.order_by().values_list('course_id', flat=True).distinct())
+        semesters = list(self.order_by().values_list('course__semester', flat=True).distinct())
+        from .caching import bump_data_version, bump_course_versions
+        from .ranking import rebuild_semester_rankings
+        
+        # The API reports updated_at; the grade has just changed
+        updated = self.update(grade=DEFAULT_SCALE.grade_expression('marks'), updated_at=Now())
+        StudentStanding.rebuild(student_ids=student_ids, progress=progress)
+        # Marks are unchanged, so course rankings stand; semester GPAs move
+        rebuild_semester_rankings(semesters, progress=progress)
+        bump_course_versions(course_ids)
+        bump_data_version()
+        return updated
+
+
 class Result(models.Model):
     """Result model to store student exam results"""
-    GRADE_CHOICES = [
-        ('A+', 'A+ (90-100)'),
-        ('A', 'A (85-89)'),
-        ('A-', 'A- (80-84)'),
-        ('B+', 'B+ (75-79)'),
-        ('B', 'B (70-74)'),
-        ('B-', 'B- (65-69)'),
-        ('C+', 'C+ (60-64)'),
-        ('C', 'C (55-59)'),
-        ('D', 'D (50-54)'),
-        ('F', 'F (0-49)'),
-    ]
+    GRADE_CHOICES = DEFAULT_SCALE.choices
     
     student = models.ForeignKey(Student, on_delete=models.CASCADE)
     course = models.ForeignKey(Course, on_delete=models.CASCADE)
@@ -93,43 +210,327 @@ class Result(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = ResultQuerySet.as_manager()
+    
     class Meta:
         ordering = ['-exam_date']
         unique_together = ['student', 'course']
+        indexes = [
+            # Default ordering, the admin changelist (which appends -pk) and search pagination
+            models.Index(fields=['-exam_date', '-id'], name='result_exam_date_idx'),
+            # Dashboard "recent results"
+            models.Index(fields=['-created_at'], name='result_created_at_idx'),
+            # Admin list_filter on grade / course, still ordered by exam date
+            models.Index(fields=['grade', '-exam_date'], name='result_grade_exam_date_idx'),
+            models.Index(fields=['course', '-exam_date'], name='result_course_exam_date_idx'),
+        ]
+    
+    GRADE_POINTS = DEFAULT_SCALE.grade_points
     
     def __str__(self):
         return f"{self.student.student_id} - {self.course.course_code} - {self.grade}"
     
     def save(self, *args, **kwargs):
-        """Auto-calculate grade based on marks"""
-        if self.marks >= 90:
-            self.grade = 'A+'
-        elif self.marks >= 85:
-            self.grade = 'A'
-        elif self.marks >= 80:
-            self.grade = 'A-'
-        elif self.marks >= 75:
-            self.grade = 'B+'
-        elif self.marks >= 70:
-            self.grade = 'B'
-        elif self.marks >= 65:
-            self.grade = 'B-'
-        elif self.marks >= 60:
-            self.grade = 'C+'
-        elif self.marks >= 55:
-            self.grade = 'C'
-        elif self.marks >= 50:
-            self.grade = 'D'
-        else:
-            self.grade = 'F'
+        """Auto-calculate grade based on marks and keep the student's standing in step"""
+        previous = None
+        if self.pk:
+            previous = Result.objects.filter(pk=self.pk).values(
+                'student_id', 'course_id', 'grade', 'course__credits'
+            ).first()
         
-        super().save(*args, **kwargs)
+        self.grade = self.grade_for_marks(self.marks)
+        
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            
+            if previous and previous['course_id'] != self.course_id:
+                # Signals cover the new course; the old one's rankings and statistics change too
+                from .caching import bump_course_versions
+                from .ranking import schedule_ranking_rebuild
+                
+                schedule_ranking_rebuild(course_ids=[previous['course_id']])
+                transaction.on_commit(lambda: bump_course_versions([previous['course_id']]))
+            
+            points = self.get_grade_point()
+            credits = self.course.credits
+            if previous and previous['student_id'] == self.student_id:
+                StudentStanding.apply_delta(
+                    self.student_id,
+                    points=points - self.GRADE_POINTS.get(previous['grade'], 0.0),
+                    credits=credits - previous['course__credits'],
+                    count=0,
+                )
+                return
+            
+            if previous:
+                StudentStanding.apply_delta(
+                    previous['student_id'],
+                    points=-self.GRADE_POINTS.get(previous['grade'], 0.0),
+                    credits=-previous['course__credits'],
+                    count=-1,
+                )
+            StudentStanding.apply_delta(self.student_id, points=points, credits=credits, count=1)
+    
+    @staticmethod
+    def grade_for_marks(marks):
+        """Return the letter grade for a mark out of 100"""
+        return DEFAULT_SCALE.grade(marks)
+    
+    @staticmethod
+    def grades_for_marks(marks_list):
+        """Grade a sequence of marks in one pass (used by bulk imports)"""
+        return DEFAULT_SCALE.grade_many(marks_list)
     
     def get_grade_point(self):
         """Return grade point for GPA calculation"""
-        grade_points = {
-            'A+': 4.0, 'A': 3.7, 'A-': 3.3,
-            'B+': 3.0, 'B': 2.7, 'B-': 2.3,
-            'C+': 2.0, 'C': 1.7, 'D': 1.0, 'F': 0.0
+        return DEFAULT_SCALE.grade_point(self.grade)
+    
+    @staticmethod
+    def grade_point_expression(field='grade'):
+        """SQL expression mapping a grade column to its grade point"""
+        return DEFAULT_SCALE.grade_point_expression(field)
+
+
+class StudentStanding(models.Model):
+    """Materialised GPA summary for a student, maintained on Result writes"""
+    student = models.OneToOneField(
+        Student, on_delete=models.CASCADE, primary_key=True, related_name='standing'
+    )
+    grade_point_sum = models.DecimalField(max_digits=8, decimal_places=2, default=0)
+    credit_sum = models.IntegerField(default=0)
+    result_count = models.IntegerField(default=0)
+    gpa = models.DecimalField(max_digits=3, decimal_places=2, default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"{self.student_id} - GPA {self.gpa}"
+    
+    def recalculate_gpa(self):
+        if self.result_count > 0:
+            self.gpa = round(Decimal(self.grade_point_sum) / self.result_count, 2)
+        else:
+            self.gpa = Decimal('0.00')
+    
+    @classmethod
+    def apply_delta(cls, student_id, points, credits, count):
+        """Adjust a student's standing by one result being added or removed"""
+        with transaction.atomic():
+            standing = cls.objects.select_for_update().filter(student_id=student_id).first()
+            if standing is None:
+                # No summary yet, so build it from the transcript (which already includes this write)
+                cls.rebuild(student_ids=[student_id])
+                return
+            
+            standing.grade_point_sum = Decimal(standing.grade_point_sum) + Decimal(str(points))
+            standing.credit_sum += credits
+            standing.result_count += count
+            standing.recalculate_gpa()
+            standing.save()
+    
+    @classmethod
+    def rebuild(cls, student_ids=None, batch_size=1000, progress=None):
+        """Recompute standings from the Result table, for all or some students
+        
+        ``progress()`` is called after each batch.
+        """
+        if student_ids is None:
+            student_ids = Student.objects.values_list('id', flat=True).iterator(chunk_size=batch_size)
+        
+        batch = []
+        for student_id in student_ids:
+            batch.append(student_id)
+            if len(batch) >= batch_size:
+                cls._rebuild_batch(batch)
+                batch = []
+                if progress is not None:
+                    progress()
+        if batch:
+            cls._rebuild_batch(batch)
+    
+    @classmethod
+    def _rebuild_batch(cls, student_ids):
+        totals = {
+            row['student_id']: row
+            for row in Result.objects.filter(student_id__in=student_ids)
+            .order_by()
+            .values('student_id')
+            .annotate(
+                points=Sum(Result.grade_point_expression()),
+                credits=Sum('course__credits'),
+                count=Count('id'),
+            )
         }
-        return grade_points.get(self.grade, 0.0)
+        
+        standings = []
+        for student_id in set(Student.objects.filter(id__in=student_ids).values_list('id', flat=True)):
+            row = totals.get(student_id)
+            standing = cls(
+                student_id=student_id,
+                grade_point_sum=Decimal(str(round(row['points'], 2))) if row else Decimal('0.00'),
+                credit_sum=row['credits'] if row else 0,
+                result_count=row['count'] if row else 0,
+            )
+            standing.recalculate_gpa()
+            standings.append(standing)
+        
+        cls.objects.bulk_create(
+            standings,
+            update_conflicts=True,
+            unique_fields=['student'],
+            update_fields=['grade_point_sum', 'credit_sum', 'result_count', 'gpa', 'updated_at'],
+        )
+
+
+class CourseRanking(models.Model):
+    """Precomputed position of a result within its course (see ranking.py)"""
+    result = models.OneToOneField(
+        Result, on_delete=models.CASCADE, primary_key=True, related_name='ranking'
+    )
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='rankings')
+    rank = models.PositiveIntegerField()
+    # PERCENT_RANK() and CUME_DIST() ordered by marks, best first
+    percent_rank = models.FloatField()
+    cume_dist = models.FloatField()
+    cohort_size = models.PositiveIntegerField()
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        indexes = [
+            # Course leaderboard, best first
+            models.Index(fields=['course', 'rank', 'result'], name='courseranking_leaderboard_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.result_id} - rank {self.rank}/{self.cohort_size}"
+    
+    @property
+    def percentile(self):
+        """Percentage of the course scoring below this result"""
+        return round((1 - self.percent_rank) * 100)
+    
+    @property
+    def top_percent(self):
+        """Smallest "top N%" band containing this result"""
+        return max(round(self.cume_dist * 100), 1)
+
+
+class SemesterRanking(models.Model):
+    """Precomputed GPA rank of a student among everyone with results in a semester"""
+    student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='semester_rankings')
+    semester = models.CharField(max_length=20)
+    gpa = models.DecimalField(max_digits=3, decimal_places=2)
+    rank = models.PositiveIntegerField()
+    percent_rank = models.FloatField()
+    cume_dist = models.FloatField()
+    cohort_size = models.PositiveIntegerField()
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['semester']
+        constraints = [
+            models.UniqueConstraint(fields=['student', 'semester'], name='semesterranking_student_semester_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['semester', 'rank'], name='semesterranking_rank_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.student_id} - {self.semester} rank {self.rank}/{self.cohort_size}"
+    
+    @property
+    def percentile(self):
+        return round((1 - self.percent_rank) * 100)
+    
+    @property
+    def top_percent(self):
+        return max(round(self.cume_dist * 100), 1)
+
+
+class CacheVersion(models.Model):
+    """A cache-invalidation counter (see caching.py), kept here so that every process sees its bumps"""
+    key = models.CharField(max_length=100, primary_key=True)
+    version = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"{self.key} = {self.version}"
+
+
+class Job(models.Model):
+    """A unit of background work (import, export, regrade, reranking) run by ``manage.py run_worker``"""
+    KIND_IMPORT = 'import'
+    KIND_EXPORT = 'export'
+    KIND_REGRADE = 'regrade'
+    KIND_REBUILD_STANDINGS = 'rebuild_standings'
+    KIND_RERANK_COURSE = 'rerank_course'
+    KIND_RERANK_SEMESTER = 'rerank_semester'
+    KIND_CHOICES = [
+        (KIND_IMPORT, 'Import results'),
+        (KIND_EXPORT, 'Export results'),
+        (KIND_REGRADE, 'Regrade results'),
+        (KIND_REBUILD_STANDINGS, 'Rebuild standings and rankings'),
+        (KIND_RERANK_COURSE, 'Rebuild course rankings'),
+        (KIND_RERANK_SEMESTER, 'Rebuild semester rankings'),
+    ]
+    # Queued by result edits rather than by a user
+    RERANK_KINDS = [KIND_RERANK_COURSE, KIND_RERANK_SEMESTER]
+    
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    SUCCEEDED = 'succeeded'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (QUEUED, 'Queued'),
+        (RUNNING, 'Running'),
+        (SUCCEEDED, 'Succeeded'),
+        (FAILED, 'Failed'),
+    ]
+    
+    kind = models.CharField(max_length=30, choices=KIND_CHOICES)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=QUEUED)
+    params = models.JSONField(default=dict, blank=True)
+    input_file = models.FileField(upload_to='jobs/input/', blank=True)
+    output_file = models.FileField(upload_to='jobs/output/', blank=True)
+    result = models.JSONField(default=dict, blank=True)
+    progress = models.PositiveIntegerField(default=0)
+    total = models.PositiveIntegerField(null=True, blank=True)
+    message = models.CharField(max_length=255, blank=True)
+    error = models.TextField(blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=3)
+    run_after = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=100, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='jobs')
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            # The worker's claim query: oldest due job in a status
+            models.Index(fields=['status', 'run_after'], name='job_claim_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.get_kind_display()} #{self.pk} ({self.status})"
+    
+    @property
+    def is_finished(self):
+        return self.status in (self.SUCCEEDED, self.FAILED)
+    
+    @property
+    def percent(self):
+        """Progress as a whole percentage, or None while the total is unknown"""
+        if self.status == self.SUCCEEDED:
+            return 100
+        if not self.total:
+            return None
+        return min(round(self.progress / self.total * 100), 100)
+    
+    @property
+    def error_summary(self):
+        """Last line of the stored error (the exception message of a traceback)"""
+        lines = self.error.strip().splitlines()
+        return lines[-1] if lines else ''
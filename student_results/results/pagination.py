@@ -0,0 +1,199 @@
+import base64
+import json
+
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.db.models import Q
+
+
+class KeysetPage:
+    """One page of a keyset-paginated queryset"""
+    
+    def __init__(self, object_list, paginator, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+    
+    def __iter__(self):
+        return iter(self.object_list)
+    
+    def __len__(self):
+        return len(self.object_list)
+    
+    def has_next(self):
+        return self.next_cursor is not None
+    
+    def has_previous(self):
+        return self.previous_cursor is not None
+    
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator:
+    """Cursor-based paginator that seeks on the ordering columns instead of using OFFSET.
+    
+    ``ordering`` is a sequence of field names (prefixed with ``-`` for descending)
+    that must uniquely identify a row, e.g. ``('-exam_date', 'id')``. Cursors are
+    opaque URL-safe strings encoding the ordering values of the boundary row.
+    """
+    
+    def __init__(self, queryset, ordering, per_page=24):
+        self.queryset = queryset
+        self.ordering = tuple(ordering)
+        self.per_page = per_page
+        self.fields = [name.lstrip('-') for name in self.ordering]
+    
+    def get_page(self, after=None, before=None):
+        """Return the page following ``after`` or preceding ``before`` (first page by default)"""
+        queryset, values, backwards = self._page_queryset(after, before)
+        return self._build_page(list(queryset[:self.per_page + 1]), values, backwards)
+    
+    async def aget_page(self, after=None, before=None):
+        """Async ``get_page``"""
+        queryset, values, backwards = self._page_queryset(after, before)
+        rows = [row async for row in queryset[:self.per_page + 1]]
+        return self._build_page(rows, values, backwards)
+    
+    def _page_queryset(self, after, before):
+        queryset = self.queryset.order_by(*self.ordering)
+        
+        values = self.decode_cursor(before) if before else None
+        if values is not None:
+            queryset = queryset.filter(self._seek(values, reverse=True)).order_by(*self._reversed_ordering())
+            return queryset, values, True
+        
+        values = self.decode_cursor(after) if after else None
+        if values is not None:
+            queryset = queryset.filter(self._seek(values))
+        return queryset, values, False
+    
+    def _build_page(self, rows, values, backwards):
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        
+        if backwards:
+            rows.reverse()
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, values is not None
+        
+        return KeysetPage(
+            rows,
+            self,
+            next_cursor=self.encode_cursor(rows[-1]) if rows and has_next else None,
+            previous_cursor=self.encode_cursor(rows[0]) if rows and has_previous else None,
+        )
+    
+    def _reversed_ordering(self):
+        return [name[1:] if name.startswith('-') else f'-{name}' for name in self.ordering]
+    
+    def _seek(self, values, reverse=False):
+        """Build the row-value comparison ``(a, b) > (x, y)`` as an OR of prefixes"""
+        condition = Q()
+        for index, name in enumerate(self.ordering):
+            descending = name.startswith('-') != reverse
+            lookup = 'lt' if descending else 'gt'
+            term = Q(**{f'{self.fields[index]}__{lookup}': values[index]})
+            for prior in range(index):
+                term &= Q(**{self.fields[prior]: values[prior]})
+            condition |= term
+        return condition
+    
+    def _output_field(self, name):
+        annotation = self.queryset.query.annotations.get(name)
+        if annotation is not None:
+            return annotation.output_field
+        return self.queryset.model._meta.get_field(name)
+    
+    def encode_cursor(self, obj):
+        values = []
+        for name in self.fields:
+            value = obj[name] if isinstance(obj, dict) else getattr(obj, name)
+            values.append(value if value is None or isinstance(value, (int, float)) else str(value))
+        return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip('=')
+    
+    def decode_cursor(self, cursor):
+        """Return the ordering values stored in ``cursor``, or None if it is malformed"""
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            raw = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            if not isinstance(raw, list) or len(raw) != len(self.fields):
+                return None
+            return [self._output_field(name).to_python(value) for name, value in zip(self.fields, raw)]
+        except (ValueError, TypeError, ValidationError):
+            return None
+
+
+def _planner_estimate(queryset):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT reltuples::bigint FROM pg_class WHERE relname = %s',
+            [queryset.model._meta.db_table],
+        )
+        row = cursor.fetchone()
+    return row[0] if row else None
+
+
+def approximate_count(queryset, cap=1000):
+    """Return ``(count, is_estimate)`` without counting more than ``cap`` rows.
+    
+    Unfiltered querysets on PostgreSQL use the planner's row estimate from
+    ``pg_class``; everything else counts at most ``cap + 1`` matching rows.
+    """
+    if not queryset.query.where and connection.vendor == 'postgresql':
+        estimate = _planner_estimate(queryset)
+        if estimate is not None and estimate > cap:
+            return estimate, True
+    
+    count = queryset.order_by()[:cap + 1].count()
+    if count > cap:
+        return cap, True
+    return count, False
+
+
+async def aapproximate_count(queryset, cap=1000):
+    """Async ``approximate_count``"""
+    if not queryset.query.where and connection.vendor == 'postgresql':
+        # Raw cursors have no async API
+        estimate = await sync_to_async(_planner_estimate)(queryset)
+        if estimate is not None and estimate > cap:
+            return estimate, True
+    
+    count = await queryset.order_by()[:cap + 1].acount()
+    if count > cap:
+        return cap, True
+    return count, False
+
+
+def _link_queries(request, page):
+    params = request.GET.copy()
+    params.pop('after', None)
+    params.pop('before', None)
+    if page.has_next():
+        params['after'] = page.next_cursor
+        page.next_query = params.urlencode()
+        del params['after']
+    if page.has_previous():
+        params['before'] = page.previous_cursor
+        page.previous_query = params.urlencode()
+
+
+def paginate(request, queryset, ordering, per_page=24):
+    """Paginate ``queryset`` using the ``after``/``before`` cursors in the query string"""
+    paginator = KeysetPaginator(queryset, ordering, per_page=per_page)
+    page = paginator.get_page(after=request.GET.get('after'), before=request.GET.get('before'))
+    _link_queries(request, page)
+    page.total_count, page.total_is_estimate = approximate_count(queryset)
+    return page
+
+
+async def apaginate(request, queryset, ordering, per_page=24):
+    """Async ``paginate``"""
+    paginator = KeysetPaginator(queryset, ordering, per_page=per_page)
+    page = await paginator.aget_page(after=request.GET.get('after'), before=request.GET.get('before'))
+    _link_queries(request, page)
+    page.total_count, page.total_is_estimate = await aapproximate_count(queryset)
+    return page
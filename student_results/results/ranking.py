@@ -0,0 +1,193 @@
+"""
+Class rank and percentiles, computed with SQL window functions.
+
+Course rankings order each course's results by marks (``RANK``,
+``PERCENT_RANK`` and ``CUME_DIST`` partitioned by course); semester rankings
+order students by their GPA over that semester's courses. Both are stored in
+``CourseRanking``/``SemesterRanking`` so page views only read them. Result
+writes queue a rerank job per affected course and semester once the
+transaction commits (see ``signals.py``), so a request that saves one mark
+does not rank the whole course; ``manage.py run_worker`` brings the stored
+ranks up to date shortly afterwards. A job still waiting in the queue covers
+later edits to the same course or semester. Bulk paths and the worker's own
+jobs call the rebuild functions directly.
+
+Rebuilds upsert rows rather than deleting and recreating them, so two
+rebuilds of the same course or semester running at once (two requests saving
+marks, say) both succeed instead of colliding on the unique keys.
+"""
+import threading
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, F, Window
+from django.db.models.functions import Rank, PercentRank, CumeDist
+
+from .models import Student, Course, Result, CourseRanking, SemesterRanking
+
+
+DEFAULT_BATCH_SIZE = 2000
+
+_pending = threading.local()
+
+
+def _window_annotations(partition_by=None, order_by=None):
+    window = {'partition_by': partition_by, 'order_by': order_by}
+    return {
+        'rank': Window(Rank(), **window),
+        'percent_rank': Window(PercentRank(), **window),
+        'cume_dist': Window(CumeDist(), **window),
+        'cohort_size': Window(Count('id'), partition_by=partition_by),
+    }
+
+
+def course_ranking_queryset(course_ids=None):
+    """Result rows annotated with their rank within the course, best mark first"""
+    results = Result.objects.all()
+    if course_ids is not None:
+        results = results.filter(course_id__in=course_ids)
+    return results.order_by().annotate(
+        **_window_annotations(partition_by=[F('course_id')], order_by=F('marks').desc())
+    ).values('id', 'course_id', 'rank', 'percent_rank', 'cume_dist', 'cohort_size')
+
+
+def semester_ranking_queryset(semester):
+    """Students with results in ``semester`` annotated with their GPA rank, best first"""
+    return Student.objects.with_gpa(semester=semester).filter(gpa_results__gt=0).order_by().annotate(
+        **_window_annotations(order_by=F('gpa').desc())
+    ).values('id', 'gpa', 'rank', 'percent_rank', 'cume_dist', 'cohort_size')
+
+
+COURSE_RANKING_FIELDS = ['course', 'rank', 'percent_rank', 'cume_dist', 'cohort_size', 'updated_at']
+SEMESTER_RANKING_FIELDS = ['gpa', 'rank', 'percent_rank', 'cume_dist', 'cohort_size', 'updated_at']
+
+
+def _upsert_course_rankings(batch):
+    CourseRanking.objects.bulk_create(
+        batch, update_conflicts=True, unique_fields=['result'], update_fields=COURSE_RANKING_FIELDS,
+    )
+
+
+def rebuild_course_rankings(course_ids=None, batch_size=DEFAULT_BATCH_SIZE, progress=None):
+    """Bring the stored rankings of the given courses (all courses by default) up to date
+    
+    A ranking row belongs to its result (and is deleted with it), so upserting
+    one row per current result leaves nothing stale; a result that moved to
+    another course gets its row's course updated. ``progress()`` is called
+    after each batch.
+    """
+    if course_ids is not None:
+        course_ids = list(course_ids)
+    with transaction.atomic():
+        batch = []
+        # Primary key order, so concurrent rebuilds lock rows in the same order
+        for row in course_ranking_queryset(course_ids).order_by('id').iterator(chunk_size=batch_size):
+            batch.append(CourseRanking(
+                result_id=row['id'],
+                course_id=row['course_id'],
+                rank=row['rank'],
+                percent_rank=row['percent_rank'],
+                cume_dist=row['cume_dist'],
+                cohort_size=row['cohort_size'],
+            ))
+            if len(batch) >= batch_size:
+                _upsert_course_rankings(batch)
+                batch = []
+                if progress is not None:
+                    progress()
+        if batch:
+            _upsert_course_rankings(batch)
+
+
+def rebuild_semester_rankings(semesters=None, batch_size=DEFAULT_BATCH_SIZE, progress=None):
+    """Bring the stored GPA rankings of the given semesters (all by default) up to date
+    
+    ``progress()`` is called after each semester.
+    """
+    if semesters is None:
+        semesters = Course.objects.order_by().values_list('semester', flat=True).distinct()
+    for semester in sorted(set(semesters)):
+        with transaction.atomic():
+            rows = semester_ranking_queryset(semester).order_by('id')
+            rankings = [
+                SemesterRanking(
+                    student_id=row['id'],
+                    semester=semester,
+                    gpa=Decimal(str(row['gpa'])),
+                    rank=row['rank'],
+                    percent_rank=row['percent_rank'],
+                    cume_dist=row['cume_dist'],
+                    cohort_size=row['cohort_size'],
+                )
+                for row in rows.iterator(chunk_size=batch_size)
+            ]
+            SemesterRanking.objects.bulk_create(
+                rankings,
+                batch_size=batch_size,
+                update_conflicts=True,
+                unique_fields=['student', 'semester'],
+                update_fields=SEMESTER_RANKING_FIELDS,
+            )
+            # Students who no longer have results in the semester
+            SemesterRanking.objects.filter(semester=semester).exclude(
+                student_id__in=[ranking.student_id for ranking in rankings]
+            ).delete()
+        if progress is not None:
+            progress()
+
+
+def rebuild_rankings(course_ids=None, progress=None):
+    """Rebuild the given courses and the semesters they belong to (everything by default)"""
+    if course_ids is None:
+        rebuild_course_rankings(progress=progress)
+        rebuild_semester_rankings(progress=progress)
+        return
+    course_ids = list(course_ids)
+    rebuild_course_rankings(course_ids, progress=progress)
+    rebuild_semester_rankings(
+        Course.objects.filter(pk__in=course_ids).order_by().values_list('semester', flat=True).distinct(),
+        progress=progress,
+    )
+
+
+def _flush_ranking_rebuilds():
+    # jobs.py runs the rebuilds, so it imports this module
+    from .jobs import enqueue_rerank
+    
+    course_ids = getattr(_pending, 'course_ids', set())
+    semesters = getattr(_pending, 'semesters', set())
+    _pending.course_ids, _pending.semesters = set(), set()
+    if course_ids:
+        semesters |= set(Course.objects.filter(pk__in=course_ids).values_list('semester', flat=True))
+    enqueue_rerank(course_ids=sorted(course_ids), semesters=sorted(semesters))
+
+
+def schedule_ranking_rebuild(course_ids=(), semesters=()):
+    """Queue rebuilds of these courses' (and their semesters') rankings once the transaction commits"""
+    if not hasattr(_pending, 'course_ids'):
+        _pending.course_ids, _pending.semesters = set(), set()
+    _pending.course_ids.update(course_ids)
+    _pending.semesters.update(semesters)
+    # The first callback to run queues everything pending; later ones find nothing
+    transaction.on_commit(_flush_ranking_rebuilds)
+
+
+def student_course_rankings(student):
+    """``{result pk: CourseRanking}`` for a student's transcript"""
+    return {
+        ranking.result_id: ranking
+        for ranking in CourseRanking.objects.filter(result__student=student)
+    }
+
+
+async def astudent_course_rankings(student):
+    """Async ``student_course_rankings``"""
+    return {
+        ranking.result_id: ranking
+        async for ranking in CourseRanking.objects.filter(result__student=student)
+    }
+
+
+def course_leaderboard(course):
+    """The course's results with their stored rank, best first"""
+    return CourseRanking.objects.filter(course=course).select_related('result__student')
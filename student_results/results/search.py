@@ -0,0 +1,90 @@
+"""
+Search backend for the public student and result search pages.
+
+Matching is a case-insensitive substring test on each searchable column. On
+PostgreSQL those columns carry ``pg_trgm`` GIN indexes on ``UPPER(column)``
+(see migration 0003), which is exactly the expression Django generates for
+``icontains``, so the OR-chains become bitmap index scans instead of
+sequential scans. Matches are ranked by trigram word similarity on
+PostgreSQL, and by a simple exact/prefix/substring score elsewhere (SQLite).
+"""
+from django.db import connection
+from django.db.models import Case, When, Value, Q, IntegerField
+from django.db.models.functions import Cast, Greatest
+
+from .models import Student, Course, Result
+
+
+STUDENT_SEARCH_FIELDS = ['student_id', 'first_name', 'last_name', 'email']
+RESULT_STUDENT_SEARCH_FIELDS = ['student_id', 'first_name', 'last_name']
+COURSE_SEARCH_FIELDS = ['course_code', 'course_name']
+# Results are ranked on the matched student or course columns through the join
+RESULT_RANK_FIELDS = (
+    [f'student__{field}' for field in RESULT_STUDENT_SEARCH_FIELDS]
+    + [f'course__{field}' for field in COURSE_SEARCH_FIELDS]
+)
+
+
+def _matches(fields, query):
+    condition = Q()
+    for field in fields:
+        condition |= Q(**{f'{field}__icontains': query})
+    return condition
+
+
+def _rank(fields, query, exact_fields=None):
+    """Integer relevance score (0-1000), higher is better
+
+    Outside PostgreSQL an exact match on one of ``exact_fields`` (by default
+    the first field, the identifier) scores highest.
+    """
+    if connection.vendor == 'postgresql':
+        from django.contrib.postgres.search import TrigramWordSimilarity
+        
+        similarity = Greatest(*[TrigramWordSimilarity(query, field) for field in fields])
+        # Bucket to an integer so keyset cursors compare exactly
+        return Cast(similarity * Value(1000.0), IntegerField())
+    
+    prefix = Q()
+    for field in fields:
+        prefix |= Q(**{f'{field}__istartswith': query})
+    exact = Q()
+    for field in exact_fields or fields[:1]:
+        exact |= Q(**{f'{field}__iexact': query})
+    return Case(
+        When(exact, then=Value(1000)),
+        When(prefix, then=Value(500)),
+        default=Value(100),
+        output_field=IntegerField(),
+    )
+
+
+def search_students(query):
+    """Students matching ``query``, annotated with ``rank``"""
+    return Student.objects.filter(_matches(STUDENT_SEARCH_FIELDS, query)).annotate(
+        rank=_rank(STUDENT_SEARCH_FIELDS, query)
+    )
+
+
+def search_courses(query):
+    """Courses matching ``query``, annotated with ``rank``"""
+    return Course.objects.filter(_matches(COURSE_SEARCH_FIELDS, query)).annotate(
+        rank=_rank(COURSE_SEARCH_FIELDS, query)
+    )
+
+
+def search_results(query):
+    """Results whose student or course matches ``query``, annotated with ``rank``.
+    
+    Students and courses are matched first (each through its own index) and
+    results are then fetched by foreign key, rather than OR-ing substring
+    tests across a three-way join. The score is only computed for the matched
+    rows.
+    """
+    student_ids = Student.objects.filter(_matches(RESULT_STUDENT_SEARCH_FIELDS, query)).values('id')
+    course_ids = Course.objects.filter(_matches(COURSE_SEARCH_FIELDS, query)).values('id')
+    return Result.objects.filter(
+        Q(student_id__in=student_ids) | Q(course_id__in=course_ids)
+    ).select_related('student', 'course').annotate(
+        rank=_rank(RESULT_RANK_FIELDS, query, exact_fields=['student__student_id', 'course__course_code'])
+    )
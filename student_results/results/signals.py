@@ -0,0 +1,93 @@
+import threading
+
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .models import Student, Course, Result, StudentStanding
+from .caching import bump_data_version, bump_course_versions, bump_student_versions
+from .ranking import schedule_ranking_rebuild
+from .stats import invalidate_site_stats
+
+
+_pending = threading.local()
+
+
+def _flush_standing_rebuilds():
+    student_ids = getattr(_pending, 'student_ids', set())
+    _pending.student_ids = set()
+    if student_ids:
+        StudentStanding.rebuild(student_ids=sorted(student_ids))
+
+
+@receiver(post_delete, sender=Result)
+def update_standing_on_result_delete(sender, instance, origin=None, **kwargs):
+    """Keep the student's standing in step when a result is removed"""
+    if origin is instance:
+        StudentStanding.apply_delta(
+            instance.student_id,
+            points=-instance.get_grade_point(),
+            credits=-instance.course.credits,
+            count=-1,
+        )
+        return
+    
+    # Queryset and cascade deletes remove many rows at once; rebuild each
+    # affected student once after the whole delete has been committed.
+    if not hasattr(_pending, 'student_ids'):
+        _pending.student_ids = set()
+    _pending.student_ids.add(instance.student_id)
+    transaction.on_commit(_flush_standing_rebuilds)
+
+
+@receiver(post_save, sender=Student)
+@receiver(post_save, sender=Course)
+@receiver(post_save, sender=Result)
+def invalidate_stats_on_create(sender, instance, created, **kwargs):
+    if created:
+        transaction.on_commit(invalidate_site_stats)
+
+
+@receiver(post_delete, sender=Student)
+@receiver(post_delete, sender=Course)
+@receiver(post_delete, sender=Result)
+def invalidate_stats_on_delete(sender, instance, **kwargs):
+    transaction.on_commit(invalidate_site_stats)
+
+
+@receiver(post_save, sender=Student)
+@receiver(post_save, sender=Course)
+@receiver(post_save, sender=Result)
+@receiver(post_delete, sender=Student)
+@receiver(post_delete, sender=Course)
+@receiver(post_delete, sender=Result)
+def bump_version_on_change(sender, instance, **kwargs):
+    transaction.on_commit(bump_data_version)
+
+
+@receiver(post_save, sender=Result)
+@receiver(post_delete, sender=Result)
+def rerank_on_result_change(sender, instance, **kwargs):
+    schedule_ranking_rebuild(course_ids=[instance.course_id])
+
+
+@receiver(post_save, sender=Result)
+@receiver(post_delete, sender=Result)
+def bump_course_version_on_result_change(sender, instance, **kwargs):
+    course_id, student_id = instance.course_id, instance.student_id
+    transaction.on_commit(lambda: bump_course_versions([course_id]))
+    transaction.on_commit(lambda: bump_student_versions([student_id]))
+
+
+@receiver(post_save, sender=Course)
+def bump_course_version_on_course_change(sender, instance, created, **kwargs):
+    # Course names and codes appear in cached transcripts
+    if not created:
+        course_id = instance.pk
+        transaction.on_commit(lambda: bump_course_versions([course_id]))
+
+
+@receiver(post_delete, sender=Course)
+def rerank_on_course_delete(sender, instance, **kwargs):
+    # The course's results are gone, but its semester cohort has changed
+    schedule_ranking_rebuild(semesters=[instance.semester])
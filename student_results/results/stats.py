@@ -0,0 +1,60 @@
+"""
+Cached site-wide statistics for the home page and dashboard.
+
+The counts are cached in Django's cache framework under the site-stats
+version (see ``caching.py``), which is bumped whenever a Student, Course or
+Result is created or deleted (see ``signals.py``). The version lives in the
+database, so a bump made by one process (the job worker after an import,
+say) is seen by every other. The cache timeout is only a safety net for
+writes that bypass model signals, such as ``bulk_create`` or raw SQL.
+"""
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+
+from .caching import bump_site_stats_version, get_site_stats_version
+from .models import Student, Course, Result
+
+
+SITE_STATS_CACHE_KEY = 'results:site-stats'
+
+
+def _site_stats_key(version):
+    return f'{SITE_STATS_CACHE_KEY}:{version}'
+
+
+def get_site_stats():
+    """Return the student, course and result totals, from cache when possible"""
+    key = _site_stats_key(get_site_stats_version())
+    stats = cache.get(key)
+    if stats is None:
+        stats = {
+            'total_students': Student.objects.count(),
+            'total_courses': Course.objects.count(),
+            'total_results': Result.objects.count(),
+        }
+        cache.set(key, stats, settings.RESULTS_STATS_CACHE_TIMEOUT)
+    return stats
+
+
+async def aget_site_stats():
+    """Async ``get_site_stats``
+    
+    The counts are awaited one after another: the async ORM runs every query
+    on the request's one connection, in one thread, so gathering them would
+    not run them concurrently.
+    """
+    key = _site_stats_key(await sync_to_async(get_site_stats_version)())
+    stats = await cache.aget(key)
+    if stats is None:
+        stats = {
+            'total_students': await Student.objects.acount(),
+            'total_courses': await Course.objects.acount(),
+            'total_results': await Result.objects.acount(),
+        }
+        await cache.aset(key, stats, settings.RESULTS_STATS_CACHE_TIMEOUT)
+    return stats
+
+
+def invalidate_site_stats():
+    bump_site_stats_version()
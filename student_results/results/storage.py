@@ -0,0 +1,19 @@
+"""
+Static files storage for the stylesheets and other app assets.
+
+WhiteNoise's ``CompressedManifestStaticFilesStorage`` gives every file a
+content-hashed name (``base.3f2a1c9e.css``) plus gzip/Brotli copies when
+``collectstatic`` runs, so browsers can cache assets for a year. Until the
+manifest has been written (development, tests, a deploy that skipped
+collectstatic) it would refuse to build any ``{% static %}`` URL; this
+subclass links the unhashed name instead, which WhiteNoise then serves from
+the app directories (``WHITENOISE_USE_FINDERS``, see settings.py).
+"""
+from whitenoise.storage import CompressedManifestStaticFilesStorage
+
+
+class OptionalManifestStaticFilesStorage(CompressedManifestStaticFilesStorage):
+    def stored_name(self, name):
+        if not self.hashed_files:
+            return name
+        return super().stored_name(name)
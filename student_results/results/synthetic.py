@@ -0,0 +1,196 @@
+"""
+Deterministic synthetic datasets for benchmarks and load tests.
+
+``seed_dataset(students=N, courses=M, seed=S)`` always produces the same rows
+for the same arguments, so benchmark runs are comparable. Rows are written
+with ``bulk_create`` in batches and standings are rebuilt once at the end;
+teacher accounts share one password hash, and each course's teacher is kept
+in memory when results are attributed. Synthetic students, courses and
+teachers use the ``SYN``/``SC``/``SYNT`` code prefixes.
+"""
+import random
+from datetime import date, timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+
+from .models import Student, Course, Teacher, Result, StudentStanding
+from .caching import bump_data_version, bump_course_versions
+from .ranking import rebuild_rankings
+from .stats import invalidate_site_stats
+
+
+FIRST_NAMES = [
+    'Emily', 'Michael', 'Sarah', 'David', 'Jessica', 'James', 'Olivia', 'Daniel',
+    'Sophia', 'Aryan', 'Priya', 'Lucas', 'Amara', 'Mateo', 'Hana', 'Omar',
+]
+LAST_NAMES = [
+    'Johnson', 'Chen', 'Williams', 'Martinez', 'Anderson', 'Taylor', 'Brown', 'Garcia',
+    'Nguyen', 'Patel', 'Okafor', 'Silva', 'Kim', 'Haddad', 'Novak', 'Wilson',
+]
+SUBJECTS = [
+    'Computer Science', 'Mathematics', 'Physics', 'Chemistry', 'Biology',
+    'Economics', 'Statistics', 'Philosophy', 'History', 'Literature',
+]
+SEMESTERS = ['Fall 2024', 'Spring 2025', 'Fall 2025', 'Spring 2026']
+DEPARTMENTS = ['Computer Science', 'Mathematics', 'Natural Sciences', 'Humanities']
+DEFAULT_BATCH_SIZE = 2000
+DEFAULT_PASSWORD = 'teacher123'
+
+
+def student_code(index):
+    return f'SYN{index:07d}'
+
+
+def course_code(index):
+    return f'SC{index:04d}'
+
+
+def teacher_username(index):
+    return f'synthetic.teacher{index:04d}'
+
+
+def build_courses(count, rng):
+    return [
+        Course(
+            course_code=course_code(index),
+            course_name=f'{SUBJECTS[index % len(SUBJECTS)]} {100 + index}',
+            description=f'Synthetic course {index}',
+            credits=rng.choice([2, 3, 3, 4]),
+            semester=SEMESTERS[index % len(SEMESTERS)],
+        )
+        for index in range(count)
+    ]
+
+
+def build_students(start, stop, rng):
+    students = []
+    for index in range(start, stop):
+        first_name = FIRST_NAMES[index % len(FIRST_NAMES)]
+        last_name = LAST_NAMES[(index // len(FIRST_NAMES)) % len(LAST_NAMES)]
+        students.append(Student(
+            student_id=student_code(index),
+            first_name=first_name,
+            last_name=last_name,
+            email=f'{first_name.lower()}.{last_name.lower()}.{index}@example.edu',
+            phone=f'+1-555-{index % 10000:04d}',
+            date_of_birth=date(2000, 1, 1) + timedelta(days=rng.randrange(2000)),
+            address=f'{rng.randrange(1, 999)} Synthetic Street',
+        ))
+    return students
+
+
+def create_teachers(count, courses, password=DEFAULT_PASSWORD):
+    """Create ``count`` teacher accounts, assigning ``courses`` round-robin.
+    
+    Returns ``{course pk: user pk}`` for attributing results.
+    """
+    if not count:
+        return {}
+    
+    # One hash for every account: hashing is deliberately slow
+    password_hash = make_password(password)
+    usernames = [teacher_username(index) for index in range(count)]
+    User.objects.bulk_create([
+        User(
+            username=username,
+            password=password_hash,
+            first_name=FIRST_NAMES[index % len(FIRST_NAMES)],
+            last_name=LAST_NAMES[index % len(LAST_NAMES)],
+            email=f'{username}@example.edu',
+        )
+        for index, username in enumerate(usernames)
+    ])
+    user_pks = dict(User.objects.filter(username__in=usernames).values_list('username', 'id'))
+    
+    Teacher.objects.bulk_create([
+        Teacher(
+            user_id=user_pks[username],
+            employee_id=f'SYNT{index:04d}',
+            phone=f'+1-555-9{index % 1000:03d}',
+            department=DEPARTMENTS[index % len(DEPARTMENTS)],
+        )
+        for index, username in enumerate(usernames)
+    ])
+    teacher_pks = dict(Teacher.objects.filter(user_id__in=user_pks.values()).values_list('user_id', 'id'))
+    
+    course_users = {}
+    assignments = []
+    for index, course in enumerate(courses):
+        user_pk = user_pks[usernames[index % count]]
+        course_users[course.pk] = user_pk
+        assignments.append(Teacher.courses.through(teacher_id=teacher_pks[user_pk], course_id=course.pk))
+    Teacher.courses.through.objects.bulk_create(assignments)
+    return course_users
+
+
+def build_results(student_pks, courses, per_student, rng, course_users=None):
+    """Results for ``student_pks``, each taking ``per_student`` distinct courses.
+    
+    ``course_users`` maps a course pk to the user recorded as ``created_by``.
+    """
+    course_users = course_users or {}
+    per_student = min(per_student, len(courses))
+    rows = []
+    for student_pk in student_pks:
+        for course in rng.sample(courses, per_student):
+            # Marks roughly normal around 70, clipped to 0-100
+            marks = round(min(max(rng.gauss(70, 12), 0), 100), 2)
+            rows.append((student_pk, course, marks))
+    
+    grades = Result.grades_for_marks([marks for _, _, marks in rows])
+    exam_base = date(2024, 11, 1)
+    exam_dates = {course.pk: exam_base + timedelta(weeks=index % 12) for index, course in enumerate(courses)}
+    return [
+        Result(
+            student_id=student_pk,
+            course=course,
+            marks=marks,
+            grade=grade,
+            exam_date=exam_dates[course.pk],
+            created_by_id=course_users.get(course.pk),
+        )
+        for (student_pk, course, marks), grade in zip(rows, grades)
+    ]
+
+
+def seed_dataset(students=1000, courses=20, results_per_student=6, seed=0, teachers=0,
+                 batch_size=DEFAULT_BATCH_SIZE, created_by=None, password=DEFAULT_PASSWORD, progress=None):
+    """Create ``students`` x ``courses`` synthetic rows; return the row counts.
+    
+    Results are attributed to ``created_by`` if given, otherwise to the
+    course's synthetic teacher. ``progress(students_done, results_done)`` is
+    called after each batch.
+    """
+    rng = random.Random(seed)
+    
+    new_courses = build_courses(courses, rng)
+    Course.objects.bulk_create(new_courses, batch_size=batch_size)
+    course_list = list(Course.objects.filter(
+        course_code__in=[course.course_code for course in new_courses]
+    ).order_by('course_code'))
+    
+    course_users = create_teachers(teachers, course_list, password)
+    if created_by is not None:
+        course_users = {course.pk: created_by.pk for course in course_list}
+    
+    result_count = 0
+    for start in range(0, students, batch_size):
+        batch = build_students(start, min(start + batch_size, students), rng)
+        Student.objects.bulk_create(batch)
+        student_pks = Student.objects.filter(
+            student_id__in=[student.student_id for student in batch]
+        ).order_by('student_id').values_list('id', flat=True)
+        results = build_results(student_pks, course_list, results_per_student, rng, course_users)
+        Result.objects.bulk_create(results, batch_size=batch_size)
+        result_count += len(results)
+        if progress is not None:
+            progress(start + len(batch), result_count)
+    
+    # bulk_create bypasses Result.save() and the model signals
+    StudentStanding.rebuild()
+    rebuild_rankings()
+    bump_course_versions([course.pk for course in course_list])
+    invalidate_site_stats()
+    bump_data_version()
+    return {'students': students, 'courses': courses, 'teachers': teachers, 'results': result_count}
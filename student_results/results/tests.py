@@ -1,3 +1,1345 @@
-from django.test import TestCase
+import gzip
+import importlib
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+from datetime import date, timedelta
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest import mock, skipIf
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import F
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import http_date
+
+from .forms import ResultForm
+from .models import Student, Course, Teacher, Result, StudentStanding, CourseRanking, SemesterRanking, Job, CacheVersion
+from .benchmarks import run_benchmarks, compare
+from .synthetic import seed_dataset
+from .metrics import QueryMetricsMiddleware, registry
+from .analytics import course_statistics
+from .caching import DATA_VERSION_KEY, SITE_STATS_VERSION_KEY, bump_data_version, get_data_version, transcript_version
+from .stats import get_site_stats
+from .importer import import_file
+from .exports import iter_rows
+from .ranking import rebuild_course_rankings, rebuild_semester_rankings
+from .grading import DEFAULT_SCALE
+from .thumbnails import THUMBNAIL_SIZES
+from .pagination import KeysetPaginator, approximate_count, paginate
+from . import search
+from .jobs import HANDLERS, PermanentJobError, ProgressReporter, claim_job, enqueue, run_job
+
+
+def create_student(student_id='STU001', first_name='Emily', last_name='Johnson', **fields):
+    """A student with placeholder contact details; tests pass only the fields they look at"""
+    fields = {
+        'email': f'{student_id.lower()}@example.com',
+        'phone': '555-0101',
+        'date_of_birth': date(2002, 3, 15),
+        'address': '123 Oak Street',
+        **fields,
+    }
+    return Student.objects.create(student_id=student_id, first_name=first_name, last_name=last_name, **fields)
+
+
+def run_jobs():
+    """Drain the job queue (rankings are rebuilt there after result edits)"""
+    call_command('run_worker', once=True, stdout=io.StringIO())
+
+
+class StudentStandingTests(TestCase):
+    """The incrementally maintained standings must equal a fresh database-side recomputation"""
+    
+    def setUp(self):
+        self.emily, self.michael = [
+            create_student(student_id, first_name, 'Test')
+            for student_id, first_name in [('STU001', 'Emily'), ('STU002', 'Michael')]
+        ]
+        self.cs = Course.objects.create(course_code='CS101', course_name='Programming', credits=3, semester='Fall 2025')
+        self.math = Course.objects.create(course_code='MATH201', course_name='Calculus', credits=4, semester='Fall 2025')
+    
+    def assertStandingsMatch(self):
+        for student in Student.objects.with_gpa():
+            standing = StudentStanding.objects.filter(student=student).first()
+            if standing is None:
+                self.assertEqual(student.gpa_results, 0)
+                continue
+            self.assertEqual(
+                (standing.result_count, standing.credit_sum, float(standing.gpa)),
+                (student.gpa_results, student.gpa_credits, student.gpa),
+                student.student_id,
+            )
+    
+    def test_incremental_maintenance(self):
+        result = Result.objects.create(student=self.emily, course=self.cs, marks=91, exam_date=date(2025, 12, 1))
+        Result.objects.create(student=self.emily, course=self.math, marks=72, exam_date=date(2025, 12, 2))
+        self.assertStandingsMatch()
+        self.assertEqual(float(self.emily.standing.gpa), round((4.0 + 2.7) / 2, 2))
+        
+        # Mark change
+        result.marks = 55
+        result.save()
+        self.assertStandingsMatch()
+        
+        # Moved to another student
+        result.student = self.michael
+        result.save()
+        self.assertStandingsMatch()
+        self.assertEqual(StudentStanding.objects.get(student=self.emily).result_count, 1)
+        
+        # Course credits change
+        self.math.credits = 2
+        self.math.save()
+        self.assertStandingsMatch()
+        
+        # Single delete
+        result.delete()
+        self.assertStandingsMatch()
+        self.assertEqual(StudentStanding.objects.get(student=self.michael).result_count, 0)
+        
+        # Queryset delete, rebuilt on commit
+        with self.captureOnCommitCallbacks(execute=True):
+            Result.objects.filter(student=self.emily).delete()
+        self.assertStandingsMatch()
+        self.assertEqual(float(StudentStanding.objects.get(student=self.emily).gpa), 0.0)
+    
+    def test_rebuild_matches(self):
+        Result.objects.create(student=self.emily, course=self.cs, marks=84, exam_date=date(2025, 12, 1))
+        StudentStanding.objects.all().delete()
+        StudentStanding.rebuild()
+        self.assertStandingsMatch()
+        self.assertEqual(StudentStanding.objects.count(), 2)
+
+
+class WithGpaTests(TestCase):
+    def setUp(self):
+        def student(student_id, first_name):
+            return create_student(student_id, first_name, 'Test')
+        
+        self.emily = student('STU001', 'Emily')
+        self.michael = student('STU002', 'Michael')
+        self.sarah = student('STU003', 'Sarah')
+        cs = Course.objects.create(course_code='CS101', course_name='Programming', credits=4, semester='Fall 2025')
+        math = Course.objects.create(course_code='MATH201', course_name='Calculus', credits=3, semester='Spring 2026')
+        seminar = Course.objects.create(course_code='SEM100', course_name='Seminar', credits=0, semester='Fall 2025')
+        for student_obj, course, marks in [
+            (self.emily, cs, 91), (self.emily, math, 72), (self.emily, seminar, 65),
+            (self.michael, seminar, 88),
+        ]:
+            Result.objects.create(student=student_obj, course=course, marks=marks, exam_date=date(2025, 12, 1))
+    
+    def test_matches_python_gpa(self):
+        # Without standings, calculate_gpa() averages the grade points in Python
+        StudentStanding.objects.all().delete()
+        annotated = {student.pk: student for student in Student.objects.with_gpa()}
+        for student in Student.objects.all():
+            self.assertEqual(annotated[student.pk].gpa, student.calculate_gpa(), student.student_id)
+        
+        emily = annotated[self.emily.pk]
+        self.assertEqual((emily.gpa_results, emily.gpa_credits), (3, 7))
+        self.assertEqual(emily.weighted_gpa, round((4.0 * 4 + 2.7 * 3 + 2.3 * 0) / 7, 2))
+    
+    def test_no_results_and_zero_credits(self):
+        annotated = {student.pk: student for student in Student.objects.with_gpa()}
+        sarah = annotated[self.sarah.pk]
+        self.assertEqual((sarah.gpa, sarah.weighted_gpa, sarah.gpa_results, sarah.gpa_credits), (0.0, 0.0, 0, 0))
+        # Only zero-credit courses: the plain GPA counts them, the weighted one has nothing to weigh
+        michael = annotated[self.michael.pk]
+        self.assertEqual((michael.gpa, michael.weighted_gpa, michael.gpa_credits), (3.7, 0.0, 0))
+    
+    def test_semester_filter(self):
+        emily = Student.objects.with_gpa(semester='Fall 2025').get(pk=self.emily.pk)
+        self.assertEqual((emily.gpa_results, emily.gpa), (2, round((4.0 + 2.3) / 2, 2)))
+
+
+class KeysetPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        # Two students share each birthday, so the id breaks ties
+        for index in range(7):
+            create_student(f'STU{index:03d}', 'Student', str(index), date_of_birth=date(2002, 1, 1 + index // 2))
+        cls.ordering = ('-date_of_birth', 'id')
+        cls.expected = list(Student.objects.order_by(*cls.ordering))
+    
+    def paginator(self):
+        return KeysetPaginator(Student.objects.all(), self.ordering, per_page=3)
+    
+    def test_cursor_round_trip(self):
+        paginator = self.paginator()
+        student = self.expected[2]
+        self.assertEqual(
+            paginator.decode_cursor(paginator.encode_cursor(student)),
+            [student.date_of_birth, student.pk],
+        )
+    
+    def test_forward_and_back(self):
+        paginator = self.paginator()
+        first = paginator.get_page()
+        self.assertEqual(list(first), self.expected[:3])
+        self.assertFalse(first.has_previous())
+        self.assertTrue(first.has_next())
+        
+        second = paginator.get_page(after=first.next_cursor)
+        self.assertEqual(list(second), self.expected[3:6])
+        last = paginator.get_page(after=second.next_cursor)
+        self.assertEqual(list(last), self.expected[6:])
+        self.assertFalse(last.has_next())
+        self.assertTrue(last.has_previous())
+        
+        self.assertEqual(list(paginator.get_page(before=last.previous_cursor)), self.expected[3:6])
+        back_to_first = paginator.get_page(before=second.previous_cursor)
+        self.assertEqual(list(back_to_first), self.expected[:3])
+        self.assertFalse(back_to_first.has_previous())
+        self.assertTrue(back_to_first.has_next())
+    
+    def test_tampered_cursor_gives_first_page(self):
+        paginator = self.paginator()
+        for cursor in ['not-a-cursor', paginator.encode_cursor({'date_of_birth': 'x', 'id': 1}), 'WzFd']:
+            self.assertIsNone(paginator.decode_cursor(cursor), cursor)
+            self.assertEqual(list(paginator.get_page(after=cursor)), self.expected[:3])
+        
+        request = RequestFactory().get('/students/', {'after': '%%%', 'q': 'x'})
+        page = paginate(request, Student.objects.all(), self.ordering, per_page=3)
+        self.assertEqual(list(page), self.expected[:3])
+        self.assertIn('q=x', page.next_query)
+    
+    def test_approximate_count(self):
+        # Outside PostgreSQL there is no planner estimate: count up to the cap
+        self.assertEqual(approximate_count(Student.objects.all(), cap=10), (7, False))
+        self.assertEqual(approximate_count(Student.objects.all(), cap=5), (5, True))
+        self.assertEqual(approximate_count(Student.objects.filter(last_name='1'), cap=5), (1, False))
+
+
+class SearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.emily = create_student()
+        cls.emil = create_student('STU002', 'Emil', 'Fremily')
+        cls.course = Course.objects.create(course_code='CS101', course_name='Programming', credits=3, semester='Fall 2025')
+        cls.result = Result.objects.create(student=cls.emily, course=cls.course, marks=80, exam_date=date(2025, 12, 1))
+    
+    def test_case_insensitive(self):
+        self.assertEqual(set(search.search_students('EMILY')), {self.emily, self.emil})
+        self.assertEqual(list(search.search_students('stu001')), [self.emily])
+        self.assertEqual(list(search.search_courses('programming')), [self.course])
+        self.assertEqual(list(search.search_results('cs101')), [self.result])
+        self.assertEqual(list(search.search_results('johnson')), [self.result])
+        self.assertFalse(search.search_students('nobody').exists())
+    
+    def test_prefix_ranks_above_substring(self):
+        ranked = list(search.search_students('emily').order_by('-rank', 'id'))
+        self.assertEqual(ranked, [self.emily, self.emil])
+        self.assertGreater(ranked[0].rank, ranked[1].rank)
+    
+    def test_results_ranked_before_date(self):
+        # A later exam whose course only mentions the code in its name
+        bridging = Course.objects.create(course_code='MATH150', course_name='Maths for CS101', credits=3, semester='Fall 2025')
+        later = Result.objects.create(student=self.emil, course=bridging, marks=70, exam_date=date(2025, 12, 20))
+        ranked = list(search.search_results('cs101').order_by('-rank', '-exam_date', '-id'))
+        self.assertEqual(ranked, [self.result, later])
+        self.assertGreater(ranked[0].rank, ranked[1].rank)
+        
+        response = self.client.get(reverse('search_results'), {'search': 'cs101'})
+        self.assertEqual(list(response.context['results']), [self.result, later])
+    
+    @skipIf(connection.vendor == 'postgresql', 'the trigram indexes are created on PostgreSQL')
+    def test_trigram_migration_is_noop_elsewhere(self):
+        migration = importlib.import_module('results.migrations.0003_search_trigram_indexes')
+        executed = []
+        schema_editor = SimpleNamespace(connection=connection, execute=executed.append)
+        migration.create_trigram_indexes(apps, schema_editor)
+        migration.drop_trigram_indexes(apps, schema_editor)
+        self.assertEqual(executed, [])
+
+
+class ResultIndexTests(TestCase):
+    """Check the hot Result queries are served by an index rather than a scan + sort"""
+    
+    @classmethod
+    def setUpTestData(cls):
+        student = create_student()
+        for code, credits in [('CS101', 4), ('CS201', 3), ('MATH201', 3)]:
+            course = Course.objects.create(
+                course_code=code, course_name=code, description='', credits=credits, semester='Fall 2024',
+            )
+            Result.objects.create(student=student, course=course, marks=80, exam_date=date(2024, 11, 1))
+    
+    def explain(self, queryset):
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('SET enable_seqscan = off')
+            try:
+                return queryset.explain()
+            finally:
+                with connection.cursor() as cursor:
+                    cursor.execute('RESET enable_seqscan')
+        return queryset.explain()
+    
+    def assertUsesIndex(self, queryset, index_name):
+        plan = self.explain(queryset)
+        self.assertIn(index_name, plan)
+        if connection.vendor == 'postgresql':
+            self.assertNotIn('Seq Scan', plan)
+            self.assertNotRegex(plan, r'\bSort\b')
+        else:
+            self.assertNotIn('TEMP B-TREE', plan)
+    
+    def test_dashboard_recent_results(self):
+        queryset = Result.objects.select_related('student', 'course').order_by('-created_at')[:10]
+        self.assertUsesIndex(queryset, 'result_created_at_idx')
+    
+    def test_default_ordering(self):
+        self.assertUsesIndex(Result.objects.order_by('-exam_date', '-id')[:25], 'result_exam_date_idx')
+    
+    def test_filter_by_grade(self):
+        self.assertUsesIndex(Result.objects.filter(grade='A-')[:25], 'result_grade_exam_date_idx')
+    
+    def test_filter_by_course(self):
+        course = Course.objects.get(course_code='CS101')
+        self.assertUsesIndex(Result.objects.filter(course=course)[:25], 'result_course_exam_date_idx')
+
+
+class SiteStatsCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+    
+    def counts(self):
+        stats = get_site_stats()
+        return stats['total_students'], stats['total_courses'], stats['total_results']
+    
+    def test_writes_invalidate_cached_counts(self):
+        self.assertEqual(self.counts(), (0, 0, 0))
+        # Served from cache: a write that bypasses signals is not seen
+        Course.objects.bulk_create([Course(course_code='BULK1', course_name='Bulk', credits=3, semester='Fall 2025')])
+        with self.assertNumQueries(1):
+            self.assertEqual(self.counts(), (0, 0, 0))
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            student = create_student()
+        self.assertEqual(self.counts(), (1, 1, 0))
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            course = Course.objects.create(course_code='CS101', course_name='Programming', credits=3, semester='Fall 2025')
+        with self.captureOnCommitCallbacks(execute=True):
+            result = Result.objects.create(student=student, course=course, marks=80, exam_date=date(2025, 12, 1))
+        self.assertEqual(self.counts(), (1, 2, 1))
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            result.delete()
+        self.assertEqual(self.counts(), (1, 2, 0))
+        with self.captureOnCommitCallbacks(execute=True):
+            course.delete()
+        with self.captureOnCommitCallbacks(execute=True):
+            student.delete()
+        self.assertEqual(self.counts(), (0, 1, 0))
+    
+    def test_invalidated_by_another_process(self):
+        self.assertEqual(self.counts(), (0, 0, 0))
+        # The job worker imports a student (its on-commit hooks never run here) and bumps the version in the database
+        create_student()
+        CacheVersion.objects.filter(key=SITE_STATS_VERSION_KEY).update(version=F('version') + 1)
+        self.assertEqual(self.counts(), (1, 0, 0))
+
+
+class ImporterTests(TestCase):
+    def setUp(self):
+        self.emily = create_student()
+        self.cs = Course.objects.create(course_code='CS101', course_name='Programming', credits=3, semester='Fall 2025')
+        self.math = Course.objects.create(course_code='MATH201', course_name='Calculus', credits=4, semester='Fall 2025')
+    
+    def import_csv(self, *lines, **kwargs):
+        sheet = '\n'.join(['student_id,course_code,marks,exam_date,remarks', *lines]).encode()
+        return import_file(io.BytesIO(sheet), 'marks.csv', **kwargs)
+    
+    def test_invalid_rows_are_reported(self):
+        report = self.import_csv(
+            'STU001,CS101,NaN,2025-12-01,',
+            'STU001,CS101,Infinity,2025-12-01,',
+            'STU001,CS101,100.5,2025-12-01,',
+            'STU001,CS101,-1,2025-12-01,',
+            'STU001,CS101,abc,2025-12-01,',
+            'STU001,CS101,80,01/12/2025,',
+            'STU404,CS101,80,2025-12-01,',
+            'STU001,NOPE,80,2025-12-01,',
+            'STU001,MATH201,100.00,2025-12-01,top mark',
+        )
+        self.assertEqual(report.imported, 1)
+        self.assertEqual([row for row, _ in report.errors], [2, 3, 4, 5, 6, 7, 8, 9])
+        self.assertEqual(report.errors[0][1], 'invalid marks "NaN"')
+        self.assertEqual(report.errors[2][1], 'marks 100.50 out of range 0-100')
+        result = Result.objects.get()
+        self.assertEqual((result.course, result.grade, result.remarks), (self.math, 'A+', 'top mark'))
+    
+    def test_duplicates_and_reimport_upsert(self):
+        # The later of two rows for the same student and course wins, also across batches
+        report = self.import_csv(
+            'STU001,CS101,50,2025-12-01,first',
+            'STU001,MATH201,72,2025-12-01,',
+            'STU001,CS101,91,2025-12-02,second',
+            batch_size=2,
+        )
+        self.assertEqual((report.imported, report.errors), (3, []))
+        result = Result.objects.get(course=self.cs)
+        self.assertEqual((result.marks, result.grade, result.remarks), (Decimal('91.00'), 'A+', 'second'))
+        
+        report = self.import_csv('STU001,CS101,60,2025-12-03,')
+        self.assertEqual(report.imported, 1)
+        self.assertEqual(Result.objects.count(), 2)
+        result.refresh_from_db()
+        self.assertEqual((result.marks, result.grade, result.exam_date), (Decimal('60.00'), 'C+', date(2025, 12, 3)))
+        self.assertEqual(float(StudentStanding.objects.get(student=self.emily).gpa), round((2.0 + 2.7) / 2, 2))
+    
+    def test_xlsx(self):
+        from openpyxl import Workbook
+        
+        workbook = Workbook()
+        workbook.active.append(['Student_ID', 'Course_Code', 'Marks', 'Exam_Date'])
+        workbook.active.append(['STU001', 'CS101', 88, date(2025, 12, 1)])
+        workbook.active.append(['STU001', 'MATH201', float('nan'), date(2025, 12, 1)])
+        output = io.BytesIO()
+        workbook.save(output)
+        output.seek(0)
+        
+        report = import_file(output, 'marks.xlsx')
+        self.assertEqual((report.imported, [row for row, _ in report.errors]), (1, [3]))
+        self.assertEqual(Result.objects.get().grade, 'A')
+    
+    def test_command_rejects_nan_rows(self):
+        path = f'{tempfile.mkdtemp()}/marks.csv'
+        self.addCleanup(shutil.rmtree, path.rsplit('/', 1)[0])
+        with open(path, 'w') as sheet:
+            sheet.write('student_id,course_code,marks,exam_date\nSTU001,CS101,nan,2025-12-01\n')
+        stdout, stderr = io.StringIO(), io.StringIO()
+        call_command('import_results', path, stdout=stdout, stderr=stderr)
+        self.assertIn('Imported 0 results (1 rows rejected)', stdout.getvalue())
+        self.assertIn('Row 2: invalid marks "nan"', stderr.getvalue())
+
+
+def ladder_grade(marks):
+    """The if/elif ladder Result.save() used before grading.py"""
+    for grade, min_marks in [
+        ('A+', 90), ('A', 85), ('A-', 80), ('B+', 75), ('B', 70),
+        ('B-', 65), ('C+', 60), ('C', 55), ('D', 50),
+    ]:
+        if marks >= min_marks:
+            return grade
+    return 'F'
+
+
+class GradingScaleTests(TestCase):
+    # Every band edge and the mark just below it, plus the ends of the range
+    MARKS = sorted({Decimal('0.00'), Decimal('39.99'), Decimal('40.00'), Decimal('100.00')} | {
+        edge + offset
+        for edge in [Decimal(threshold) for threshold in DEFAULT_SCALE.thresholds[1:]]
+        for offset in (Decimal('-0.01'), Decimal('0.00'), Decimal('0.01'))
+    })
+    
+    def test_grade_matches_old_ladder(self):
+        for marks in self.MARKS:
+            self.assertEqual(DEFAULT_SCALE.grade(marks), ladder_grade(marks), marks)
+            self.assertEqual(DEFAULT_SCALE.grade(float(marks)), ladder_grade(marks), marks)
+        self.assertEqual((DEFAULT_SCALE.grade(39.99), DEFAULT_SCALE.grade(40)), ('F', 'F'))
+        self.assertEqual((DEFAULT_SCALE.grade(49.99), DEFAULT_SCALE.grade(50)), ('F', 'D'))
+        self.assertEqual(DEFAULT_SCALE.grade(Decimal('100.00')), 'A+')
+    
+    def test_grade_many(self):
+        expected = [ladder_grade(marks) for marks in self.MARKS]
+        self.assertEqual(DEFAULT_SCALE.grade_many(self.MARKS), expected)
+        self.assertEqual(DEFAULT_SCALE.grade_many([float(marks) for marks in self.MARKS]), expected)
+        self.assertEqual(DEFAULT_SCALE.grade_many([]), [])
+    
+    def test_grade_expression_and_regrade(self):
+        student = create_student()
+        courses = Course.objects.bulk_create([
+            Course(course_code=f'C{index:03d}', course_name='Course', credits=3, semester='Fall 2025')
+            for index in range(len(self.MARKS))
+        ])
+        # Stored with a wrong grade, as if the scale had changed since
+        Result.objects.bulk_create([
+            Result(student=student, course=course, marks=marks, grade='F', exam_date=date(2025, 12, 1))
+            for course, marks in zip(courses, self.MARKS)
+        ])
+        before = Result.objects.latest('updated_at').updated_at
+        
+        self.assertEqual(Result.objects.regrade(), len(self.MARKS))
+        for marks, grade, updated_at in Result.objects.values_list('marks', 'grade', 'updated_at'):
+            self.assertEqual(grade, ladder_grade(marks), marks)
+            self.assertGreater(updated_at, before)
+        self.assertEqual(StudentStanding.objects.get(student=student).result_count, len(self.MARKS))
+
+
+class AutocompleteTests(TestCase):
+    def setUp(self):
+        self.emily = create_student()
+        self.lowercase = create_student('ext-042', 'Michael', 'Chen')
+        self.cs = Course.objects.create(course_code='CS101', course_name='Programming', credits=3, semester='Fall 2025')
+        self.math = Course.objects.create(course_code='MATH201', course_name='Calculus', credits=4, semester='Fall 2025')
+        self.client.force_login(User.objects.create_user('teacher', password='secret'))
+    
+    def ids(self, url_name, query):
+        response = self.client.get(reverse(url_name), {'q': query})
+        return [item['id'] for item in response.json()['results']]
+    
+    def test_student_autocomplete(self):
+        self.assertEqual(self.ids('student_autocomplete', 'stu0'), [self.emily.pk])
+        self.assertEqual(self.ids('student_autocomplete', 'EXT-'), [self.lowercase.pk])
+        self.assertEqual(self.ids('student_autocomplete', 'ext-'), [self.lowercase.pk])
+        self.assertEqual(self.ids('student_autocomplete', 'chen'), [self.lowercase.pk])
+        self.assertEqual(self.ids('student_autocomplete', ''), [])
+        response = self.client.get(reverse('student_autocomplete'), {'q': 'emily'})
+        self.assertEqual(response.json()['results'], [{'id': self.emily.pk, 'text': 'STU001 - Emily Johnson'}])
+    
+    def test_course_autocomplete(self):
+        self.assertEqual(self.ids('course_autocomplete', 'cs1'), [self.cs.pk])
+        self.assertEqual(self.ids('course_autocomplete', 'calc'), [self.math.pk])
+        self.client.logout()
+        self.assertEqual(self.client.get(reverse('course_autocomplete'), {'q': 'cs'}).status_code, 302)
+    
+    def test_widget_renders_only_selected_option(self):
+        form = ResultForm({'student': 'abc', 'course': str(self.cs.pk), 'marks': '80', 'exam_date': '2025-12-01'})
+        self.assertFalse(form.is_valid())
+        student_html, course_html = str(form['student']), str(form['course'])
+        self.assertEqual(student_html.count('<option'), 1)
+        self.assertIn('<option value="" selected>', student_html)
+        self.assertIn(f'<option value="{self.cs.pk}" selected>', course_html)
+        self.assertNotIn('MATH201', course_html)
+        self.assertIn(f'data-autocomplete-url="{reverse("course_autocomplete")}"', course_html)
+        
+        # A tampered POST re-renders the form instead of failing
+        response = self.client.post(reverse('result_create'), {'student': '1 OR 1=1', 'course': ['x', str(self.cs.pk)]})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context['form'].errors)
+
+
+class ExportTests(TestCase):
+    def setUp(self):
+        student = create_student()
+        for number, marks in enumerate([91, 84, 77, 66, 42], start=1):
+            course = Course.objects.create(course_code=f'CS10{number}', course_name=f'Course {number}', credits=3, semester='Fall 2025')
+            Result.objects.create(student=student, course=course, marks=marks, exam_date=date(2025, 12, number))
+    
+    def export(self, export_format, **options):
+        stdout = io.StringIO()
+        call_command('export_results', format=export_format, stdout=stdout, **options)
+        return stdout.getvalue()
+    
+    def test_csv(self):
+        lines = self.export('csv').splitlines()
+        self.assertEqual(lines[0], 'student_id,first_name,last_name,course_code,course_name,semester,credits,marks,grade,exam_date')
+        self.assertEqual(lines[1], 'STU001,Emily,Johnson,CS101,Course 1,Fall 2025,3,91.00,A+,2025-12-01')
+        self.assertEqual(len(lines), 6)
+        self.assertEqual(self.export('csv', grade='F').splitlines()[1:], ['STU001,Emily,Johnson,CS105,Course 5,Fall 2025,3,42.00,F,2025-12-05'])
+    
+    def test_jsonl(self):
+        rows = [json.loads(line) for line in self.export('jsonl').splitlines()]
+        self.assertEqual([row['course_code'] for row in rows], ['CS101', 'CS102', 'CS103', 'CS104', 'CS105'])
+        self.assertEqual(rows[2], {
+            'student_id': 'STU001', 'first_name': 'Emily', 'last_name': 'Johnson',
+            'course_code': 'CS103', 'course_name': 'Course 3', 'semester': 'Fall 2025',
+            'credits': 3, 'marks': 77.0, 'grade': 'B+', 'exam_date': '2025-12-03',
+        })
+    
+    def test_batch_boundaries(self):
+        expected = list(iter_rows(Result.objects.all(), chunk_size=100))
+        self.assertEqual(len(expected), 5)
+        # One query per batch plus the empty one that ends the export
+        for chunk_size, queries in [(1, 6), (2, 4), (4, 3), (5, 2), (6, 2)]:
+            with self.subTest(chunk_size=chunk_size), self.assertNumQueries(queries):
+                self.assertEqual(list(iter_rows(Result.objects.all(), chunk_size=chunk_size)), expected)
+        self.assertEqual(self.export('jsonl', chunk_size=2), self.export('jsonl'))
+    
+    def test_output_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'results.csv')
+            self.assertEqual(self.export('csv', output=path), '')
+            with open(path, newline='', encoding='utf-8') as output:
+                self.assertEqual(output.read(), self.export('csv'))
+
+
+class ApiTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.student = create_student()
+        self.course = Course.objects.create(course_code='CS101', course_name='Programming', credits=3, semester='Fall 2025')
+        self.result = Result.objects.create(student=self.student, course=self.course, marks=91, exam_date=date(2025, 12, 1))
+        self.transcript_url = reverse('api_student_transcript', args=['STU001'])
+    
+    def test_fields(self):
+        response = self.client.get(reverse('api_student_list'), {'fields': 'student_id,first_name'})
+        self.assertEqual(response.json()['results'], [{'student_id': 'STU001', 'first_name': 'Emily'}])
+        self.assertEqual(response.json()['next'], None)
+        
+        response = self.client.get(reverse('api_result_list'), {'fields': 'course_code,marks,grade'})
+        self.assertEqual(response.json()['results'], [{'course_code': 'CS101', 'marks': 91.0, 'grade': 'A+'}])
+        
+        response = self.client.get(reverse('api_course_detail', args=['CS101']), {'fields': 'nope,credits'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('Unknown field(s): nope', response.json()['error'])
+        self.assertEqual(self.client.get(reverse('api_student_detail', args=['STU404'])).status_code, 404)
+    
+    def test_transcript(self):
+        data = self.client.get(self.transcript_url).json()
+        self.assertEqual((data['name'], data['gpa'], data['credits'], data['result_count']), ('Emily Johnson', 4.0, 3, 1))
+        self.assertEqual(data['results'], [{
+            'course_code': 'CS101', 'course_name': 'Programming', 'credits': 3, 'semester': 'Fall 2025',
+            'marks': 91.0, 'grade': 'A+', 'exam_date': '2025-12-01',
+        }])
+    
+    def assertRevalidates(self, url, etag):
+        # The data version and the newest updated_at
+        with self.assertNumQueries(2):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+    
+    def test_last_modified(self):
+        Result.objects.filter(pk=self.result.pk).update(updated_at=timezone.now() - timedelta(days=1))
+        with self.captureOnCommitCallbacks(execute=True):
+            bump_data_version()
+        response = self.client.get(self.transcript_url)
+        self.assertEqual(response['Last-Modified'], http_date(CacheVersion.objects.get(key=DATA_VERSION_KEY).updated_at.timestamp()))
+        self.assertEqual(self.client.get(self.transcript_url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']).status_code, 304)
+        
+        # A result edited after the last version bump moves it forward
+        later = timezone.now() + timedelta(hours=1)
+        Result.objects.filter(pk=self.result.pk).update(updated_at=later)
+        response = self.client.get(reverse('api_result_list'), HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Last-Modified'], http_date(later.timestamp()))
+    
+    def test_not_modified_until_data_changes(self):
+        list_url = reverse('api_result_list')
+        transcript_etag = self.client.get(self.transcript_url)['ETag']
+        list_etag = self.client.get(list_url)['ETag']
+        self.assertNotEqual(transcript_etag, list_etag)
+        self.assertRevalidates(self.transcript_url, transcript_etag)
+        self.assertRevalidates(list_url, list_etag)
+        
+        # Course rename and credits change: no Result row is touched
+        with self.captureOnCommitCallbacks(execute=True):
+            self.course.course_name = 'Programming I'
+            self.course.credits = 4
+            self.course.save()
+        response = self.client.get(self.transcript_url, HTTP_IF_NONE_MATCH=transcript_etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['results'][0]['course_name'], 'Programming I')
+        self.assertEqual(response.json()['credits'], 4)
+        
+        list_etag = self.client.get(list_url)['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            self.result.marks = 55
+            self.result.save()
+        response = self.client.get(list_url, HTTP_IF_NONE_MATCH=list_etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['results'][0]['grade'], 'C')
+        
+        # Bulk paths bump the version themselves
+        list_etag = response['ETag']
+        Result.objects.all().regrade()
+        self.assertEqual(self.client.get(list_url, HTTP_IF_NONE_MATCH=list_etag).status_code, 200)
+
+
+class AdminQueryCountTests(TestCase):
+    """Admin changelists must issue a bounded number of queries, whatever the page size"""
+    
+    MAX_QUERIES = 12
+    
+    def setUp(self):
+        self.admin = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.client.force_login(self.admin)
+    
+    def create_rows(self, count, offset=0):
+        course = Course.objects.create(
+            course_code=f'CS{offset}', course_name='Course', description='', credits=3, semester='Fall 2024',
+        )
+        for index in range(offset, offset + count):
+            student = create_student(f'STU{index:04}', 'First', f'Last{index}')
+            Result.objects.create(
+                student=student, course=course, marks=70, exam_date=date(2024, 11, 1), created_by=self.admin,
+            )
+            user = User.objects.create_user(f'teacher{index}', first_name='T', last_name=f'{index}')
+            teacher = Teacher.objects.create(
+                user=user, employee_id=f'EMP{index:04}', phone='555-0200', department='CS',
+            )
+            teacher.courses.add(course)
+    
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+    
+    def assertBoundedQueries(self, url):
+        self.create_rows(3)
+        small = self.count_queries(url)
+        self.create_rows(40, offset=100)
+        large = self.count_queries(url)
+        self.assertEqual(small, large, f'{url} query count grows with rows ({small} -> {large})')
+        self.assertLessEqual(large, self.MAX_QUERIES)
+    
+    def test_result_changelist(self):
+        self.assertBoundedQueries(reverse('admin:results_result_changelist'))
+    
+    def test_teacher_changelist(self):
+        self.assertBoundedQueries(reverse('admin:results_teacher_changelist'))
+    
+    def test_student_changelist(self):
+        self.assertBoundedQueries(reverse('admin:results_student_changelist'))
+    
+    def test_result_change_form(self):
+        self.create_rows(40)
+        result = Result.objects.first()
+        queries = self.count_queries(reverse('admin:results_result_change', args=[result.pk]))
+        self.assertLessEqual(queries, self.MAX_QUERIES)
+
+
+class BenchmarkTests(TestCase):
+    """The synthetic dataset is deterministic and every hot view benchmarks cleanly"""
+    
+    def test_seed_is_deterministic(self):
+        counts = seed_dataset(students=30, courses=8, results_per_student=4, seed=7, teachers=3)
+        self.assertEqual(counts, {'students': 30, 'courses': 8, 'teachers': 3, 'results': 120})
+        # Every result is attributed to a teacher of its course
+        self.assertEqual(Result.objects.filter(created_by__teacher__courses=F('course')).count(), 120)
+        first = list(Result.objects.order_by('student__student_id', 'course__course_code').values_list('marks', 'grade'))
+        self.assertEqual(Student.objects.filter(standing__result_count=4).count(), 30)
+        
+        Result.objects.all().delete()
+        Student.objects.all().delete()
+        Course.objects.all().delete()
+        seed_dataset(students=30, courses=8, results_per_student=4, seed=7, teachers=0)
+        second = list(Result.objects.order_by('student__student_id', 'course__course_code').values_list('marks', 'grade'))
+        self.assertEqual(first, second)
+    
+    def test_run_and_compare(self):
+        seed_dataset(students=30, courses=8, results_per_student=4)
+        report = run_benchmarks(User.objects.create_user('bench'), iterations=2)
+        self.assertEqual(set(report), {'home', 'student_list', 'student_detail', 'search_results', 'dashboard'})
+        self.assertEqual(compare(report, report), [])
+        
+        slower = {name: dict(row, queries=row['queries'] + 1) for name, row in report.items()}
+        self.assertEqual(len(compare(slower, report)), len(report))
+
+
+@override_settings(
+    RESULTS_QUERY_METRICS=True,
+    RESULTS_METRICS_TOKEN='',
+    MIDDLEWARE=['results.metrics.QueryMetricsMiddleware'] + settings.MIDDLEWARE,
+)
+class QueryMetricsTests(TestCase):
+    def setUp(self):
+        registry.reset()
+        seed_dataset(students=5, courses=3, results_per_student=2)
+    
+    def test_server_timing_and_prometheus(self):
+        response = self.client.get(reverse('student_list'))
+        self.assertRegex(response['Server-Timing'], r'db;dur=[\d.]+;desc="\d+ queries"')
+        
+        metrics = self.client.get(reverse('metrics')).content.decode()
+        self.assertIn('results_requests_total{view="student_list"} 1', metrics)
+        self.assertIn('results_request_duration_seconds_count{view="student_list"} 1', metrics)
+    
+    def test_repeated_statements_logged(self):
+        def view(request):
+            for student in Student.objects.all():
+                student.result_set.count()
+            return HttpResponse()
+        
+        with self.assertLogs('results.metrics', 'WARNING') as logs:
+            response = QueryMetricsMiddleware(view)(RequestFactory().get('/'))
+        self.assertIn('desc="6 queries"', response['Server-Timing'])
+        self.assertIn('ran the same statement 5 times', logs.output[0])
+        self.assertIn('slowest statement', logs.output[0])
+    
+    @override_settings(RESULTS_SLOW_QUERY_THRESHOLD_MS=0)
+    def test_slow_statement_logged(self):
+        def view(request):
+            list(Course.objects.all())
+            return HttpResponse()
+        
+        with self.assertLogs('results.metrics', 'WARNING') as logs:
+            QueryMetricsMiddleware(view)(RequestFactory().get('/'))
+        self.assertIn('ran a slow statement', logs.output[0])
+        self.assertIn('results_course', logs.output[0])
+    
+    @override_settings(RESULTS_METRICS_TOKEN='secret')
+    def test_metrics_token(self):
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 401)
+        response = self.client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer secret')
+        self.assertEqual(response.status_code, 200)
+    
+    @override_settings(RESULTS_QUERY_METRICS=False)
+    def test_metrics_disabled(self):
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 404)
+
+
+class RankingTests(TestCase):
+    """Rankings are rebuilt after commit when results change"""
+    
+    def setUp(self):
+        self.courses = [
+            Course.objects.create(
+                course_code=code, course_name=code, description='', credits=3, semester='Fall 2024',
+            )
+            for code in ['CS101', 'CS201']
+        ]
+        self.students = [
+            create_student(f'STU{index:03}', 'First', f'Last{index}')
+            for index in range(4)
+        ]
+    
+    def add_result(self, student, course, marks):
+        with self.captureOnCommitCallbacks(execute=True):
+            result = Result.objects.create(student=student, course=course, marks=marks, exam_date=date(2024, 11, 1))
+        run_jobs()
+        return result
+    
+    def test_course_rank_with_ties(self):
+        results = [self.add_result(student, self.courses[0], marks) for student, marks in zip(self.students, [90, 75, 90, 60])]
+        ranks = {ranking.result_id: ranking for ranking in CourseRanking.objects.all()}
+        self.assertEqual([ranks[result.pk].rank for result in results], [1, 3, 1, 4])
+        self.assertEqual(ranks[results[3].pk].percentile, 0)
+        self.assertEqual(ranks[results[1].pk].top_percent, 75)
+        self.assertEqual({ranking.cohort_size for ranking in ranks.values()}, {4})
+    
+    def test_semester_rank_and_moves(self):
+        self.add_result(self.students[0], self.courses[0], 95)
+        self.add_result(self.students[1], self.courses[0], 55)
+        moved = self.add_result(self.students[2], self.courses[0], 70)
+        self.assertEqual(
+            list(SemesterRanking.objects.order_by('rank').values_list('student__student_id', 'rank')),
+            [('STU000', 1), ('STU002', 2), ('STU001', 3)],
+        )
+        
+        moved.course = self.courses[1]
+        with self.captureOnCommitCallbacks(execute=True):
+            moved.save()
+        run_jobs()
+        self.assertEqual(CourseRanking.objects.filter(course=self.courses[0]).count(), 2)
+        self.assertEqual(CourseRanking.objects.get(result=moved).cohort_size, 1)
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            moved.delete()
+        run_jobs()
+        self.assertFalse(SemesterRanking.objects.filter(student=self.students[2]).exists())
+        self.assertEqual(SemesterRanking.objects.get(student=self.students[1]).cohort_size, 2)
+    
+    def test_edits_queue_rerank_jobs(self):
+        for student, marks in zip(self.students, [90, 75]):
+            with self.captureOnCommitCallbacks(execute=True):
+                Result.objects.create(student=student, course=self.courses[0], marks=marks, exam_date=date(2024, 11, 1))
+        # Ranks wait for the worker; the second edit found the first one's jobs still queued
+        self.assertFalse(CourseRanking.objects.exists())
+        self.assertEqual(
+            list(Job.objects.order_by('id').values_list('kind', 'params')),
+            [(Job.KIND_RERANK_COURSE, {'course': self.courses[0].pk}), (Job.KIND_RERANK_SEMESTER, {'semester': 'Fall 2024'})],
+        )
+        
+        run_jobs()
+        self.assertEqual(CourseRanking.objects.count(), 2)
+        self.assertEqual(SemesterRanking.objects.count(), 2)
+        self.assertFalse(Job.objects.exclude(status=Job.SUCCEEDED).exists())
+        # Automatic jobs stay off the dashboard's recent jobs
+        self.client.force_login(User.objects.create_user('teacher', password='secret'))
+        self.assertEqual(list(self.client.get(reverse('dashboard')).context['recent_jobs']), [])
+    
+    def test_rebuilds_update_existing_rows(self):
+        results = [self.add_result(student, self.courses[0], marks) for student, marks in zip(self.students, [90, 75, 60])]
+        # A rebuild that finds the rows already there (another request got in first) updates them
+        Result.objects.filter(pk=results[2].pk).update(marks=99)
+        rebuild_course_rankings([self.courses[0].pk])
+        rebuild_semester_rankings(['Fall 2024'])
+        self.assertEqual(CourseRanking.objects.get(result=results[2]).rank, 1)
+        self.assertEqual(CourseRanking.objects.count(), 3)
+        self.assertEqual(SemesterRanking.objects.count(), 3)
+    
+    def test_pages_show_rank(self):
+        self.add_result(self.students[0], self.courses[0], 95)
+        self.add_result(self.students[1], self.courses[0], 55)
+        
+        response = self.client.get(reverse('course_leaderboard', args=['CS101']))
+        self.assertContains(response, '1 / 2')
+        self.assertContains(response, '2 / 2')
+        response = self.client.get(reverse('student_detail', args=['STU001']))
+        self.assertContains(response, 'rank 2 of 2')
+
+
+class CourseStatisticsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.course = Course.objects.create(
+            course_code='CS101', course_name='CS101', description='', credits=3, semester='Fall 2024',
+        )
+        for index, marks in enumerate([40, 60, 70, 90]):
+            student = create_student(f'STU{index:03}', 'First', f'Last{index}')
+            Result.objects.create(student=student, course=self.course, marks=marks, exam_date=date(2024, 11, 1))
+    
+    def test_statistics(self):
+        stats = course_statistics([self.course.pk])[self.course.pk]
+        self.assertEqual(stats['result_count'], 4)
+        self.assertEqual(stats['mean'], 65.0)
+        self.assertEqual(stats['median'], 65.0)
+        self.assertEqual(stats['stddev'], 18.03)
+        self.assertEqual((stats['lowest'], stats['highest']), (40.0, 90.0))
+        self.assertEqual((stats['pass_count'], stats['pass_rate']), (3, 75.0))
+        self.assertEqual(stats['grades']['A+'], 1)
+        self.assertEqual(stats['grades']['F'], 1)
+        self.assertEqual(sum(stats['grades'].values()), 4)
+    
+    def test_cached_until_results_change(self):
+        course_statistics([self.course.pk])
+        # Only the course version is read
+        with self.assertNumQueries(1):
+            course_statistics([self.course.pk])
+        
+        result = Result.objects.get(student__student_id='STU000')
+        result.marks = 100
+        with self.captureOnCommitCallbacks(execute=True):
+            result.save()
+        self.assertEqual(course_statistics([self.course.pk])[self.course.pk]['highest'], 100.0)
+    
+    def test_version_bumped_by_another_process(self):
+        course_statistics([self.course.pk])
+        Result.objects.filter(student__student_id='STU000').update(marks=100)
+        # What the job worker's bump_course_versions leaves behind: only the row
+        CacheVersion.objects.filter(key=f'course:{self.course.pk}').update(version=F('version') + 1)
+        self.assertEqual(course_statistics([self.course.pk])[self.course.pk]['highest'], 100.0)
+    
+    def test_page_and_api(self):
+        response = self.client.get(reverse('course_analytics'))
+        self.assertContains(response, '75.0%')
+        response = self.client.get(reverse('api_course_statistics_detail', args=['CS101']))
+        self.assertEqual(response.json()['pass_rate'], 75.0)
+
+
+class TranscriptFragmentTests(TestCase):
+    """The student page's transcript table is cached until the student's or a course's results change"""
+    
+    def setUp(self):
+        cache.clear()
+        self.course = Course.objects.create(
+            course_code='CS101', course_name='Programming', description='', credits=3, semester='Fall 2024',
+        )
+        self.students = [
+            create_student(f'STU{index:03}', 'First', f'Last{index}')
+            for index in range(2)
+        ]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.result = Result.objects.create(
+                student=self.students[0], course=self.course, marks=80, exam_date=date(2024, 11, 1),
+            )
+        run_jobs()
+    
+    def get_page(self):
+        # Skip the whole-page cache so only the fragment cache is exercised
+        bump_data_version()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('student_detail', args=['STU000']))
+        return response, len(queries)
+    
+    def test_cached_until_results_change(self):
+        response, cold_queries = self.get_page()
+        self.assertContains(response, '1 / 1')
+        response, warm_queries = self.get_page()
+        self.assertContains(response, '1 / 1')
+        self.assertLess(warm_queries, cold_queries)
+        
+        # Another student's result moves this student's class rank once the worker reranks the course
+        with self.captureOnCommitCallbacks(execute=True):
+            Result.objects.create(student=self.students[1], course=self.course, marks=90, exam_date=date(2024, 11, 1))
+        self.assertContains(self.get_page()[0], '1 / 1')
+        run_jobs()
+        self.assertContains(self.get_page()[0], '2 / 2')
+        
+        self.course.course_name = 'Programming I'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.course.save()
+        self.assertContains(self.get_page()[0], 'Programming I')
+    
+    def test_write_from_another_process(self):
+        self.assertContains(self.get_page()[0], 'grade-A')
+        # An import run by another process: new marks, then bumps seen only in the database
+        Result.objects.filter(pk=self.result.pk).update(marks=10, grade='F')
+        CacheVersion.objects.filter(key=f'student:{self.students[0].pk}').update(version=F('version') + 1)
+        response = self.get_page()[0]
+        self.assertContains(response, 'grade-F')
+        self.assertNotContains(response, 'grade-A')
+    
+    def test_stylesheets_are_static_files(self):
+        response = self.client.get(reverse('student_detail', args=['STU000']))
+        self.assertContains(response, 'href="/static/results/css/base.css"')
+        self.assertContains(response, 'href="/static/results/css/student_detail.css"')
+        self.assertNotContains(response, '<style>')
+
+
+class PageCacheTests(TestCase):
+    """Cached public pages are served until a Student, Course or Result write bumps the data version"""
+    
+    def setUp(self):
+        cache.clear()
+        self.student = create_student()
+        self.course = Course.objects.create(course_code='CS101', course_name='Programming', credits=3, semester='Fall 2025')
+    
+    def assertServed(self, url, text, present=True):
+        content = self.client.get(url).content.decode()
+        (self.assertIn if present else self.assertNotIn)(text, content)
+    
+    def test_course_write(self):
+        url = reverse('course_list')
+        self.assertServed(url, 'Programming')
+        # A write that sends no signals is not seen: the page really is cached
+        Course.objects.filter(pk=self.course.pk).update(course_name='Unsignalled')
+        self.assertServed(url, 'Programming')
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            self.course.course_name = 'Algorithms'
+            self.course.save()
+        self.assertServed(url, 'Algorithms')
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            self.course.delete()
+        self.assertServed(url, 'Algorithms', present=False)
+    
+    def test_student_write(self):
+        url = reverse('student_detail', args=['STU001'])
+        self.assertServed(url, 'Emily')
+        Student.objects.filter(pk=self.student.pk).update(first_name='Unsignalled')
+        self.assertServed(url, 'Emily')
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            self.student.first_name = 'Emma'
+            self.student.save()
+        self.assertServed(url, 'Emma')
+    
+    def test_result_write(self):
+        detail_url = reverse('student_detail', args=['STU001'])
+        search_url = reverse('search_results') + '?search=STU001'
+        self.assertServed(detail_url, 'CS101', present=False)
+        self.assertServed(search_url, 'CS101', present=False)
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            result = Result.objects.create(student=self.student, course=self.course, marks=91, exam_date=date(2025, 12, 1))
+        self.assertServed(detail_url, 'CS101')
+        self.assertServed(search_url, 'CS101')
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            result.delete()
+        self.assertServed(detail_url, 'CS101', present=False)
+        self.assertServed(search_url, 'CS101', present=False)
+    
+    def test_versions_shared_between_processes(self):
+        url = reverse('course_list')
+        self.assertServed(url, 'Programming')
+        Course.objects.filter(pk=self.course.pk).update(course_name='Algorithms')
+        # Another worker's edit only reaches this process through the database
+        CacheVersion.objects.filter(key=DATA_VERSION_KEY).update(version=F('version') + 1)
+        self.assertServed(url, 'Algorithms')
+        # Losing the local cache does not reset the version
+        version = get_data_version()
+        cache.clear()
+        self.assertEqual(get_data_version(), version)
+    
+    def test_users_cached_separately(self):
+        url = reverse('course_list')
+        self.assertServed(url, 'Logout', present=False)
+        self.client.force_login(User.objects.create_user('teacher', password='secret'))
+        self.assertServed(url, 'Logout (teacher)')
+
+
+class HttpCachingTests(TestCase):
+    """Dynamic pages are compressed, carry weak ETags and per-view Cache-Control"""
+    
+    def setUp(self):
+        cache.clear()
+        for index in range(30):
+            create_student(f'STU{index:03}', 'First', f'Last{index}')
+    
+    def test_compression_and_not_modified(self):
+        url = reverse('student_list')
+        plain = self.client.get(url)
+        self.assertNotIn('Content-Encoding', plain)
+        self.assertTrue(plain['ETag'].startswith('W/"'))
+        
+        compressed = self.client.get(url, headers={'Accept-Encoding': 'gzip, deflate'})
+        self.assertEqual(compressed['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', compressed['Vary'])
+        self.assertEqual(gzip.decompress(compressed.content), plain.content)
+        self.assertEqual(compressed['ETag'], plain['ETag'])
+        
+        revalidated = self.client.get(url, headers={'If-None-Match': plain['ETag'], 'Accept-Encoding': 'gzip'})
+        self.assertEqual(revalidated.status_code, 304)
+        self.assertEqual(revalidated.content, b'')
+    
+    @override_settings(RESULTS_COMPRESSION_MIN_SIZE=10 ** 6)
+    def test_small_responses_sent_as_is(self):
+        response = self.client.get(reverse('student_list'), headers={'Accept-Encoding': 'gzip'})
+        self.assertNotIn('Content-Encoding', response)
+    
+    def test_cache_control(self):
+        response = self.client.get(reverse('student_list'))
+        self.assertIn('public', response['Cache-Control'])
+        self.assertIn('max-age=60', response['Cache-Control'])
+        
+        self.client.force_login(User.objects.create_user('teacher', password='secret'))
+        response = self.client.get(reverse('student_list'))
+        self.assertIn('private', response['Cache-Control'])
+        self.assertIn('no-cache', response['Cache-Control'])
+
+
+@override_settings(ROOT_URLCONF='results.async_test_urls')
+class AsyncViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        course = Course.objects.create(
+            course_code='CS101', course_name='Programming', description='', credits=3, semester='Fall 2024',
+        )
+        student = create_student()
+        with self.captureOnCommitCallbacks(execute=True):
+            Result.objects.create(student=student, course=course, marks=80, exam_date=date(2024, 11, 1))
+        run_jobs()
+    
+    async def test_pages(self):
+        for url, text in [
+            ('/', 'Student Result'),
+            ('/courses/', 'Programming'),
+            ('/results/search/?search=Emily', 'STU001'),
+            ('/students/STU001/', '1 / 1'),
+        ]:
+            response = await self.async_client.get(url)
+            self.assertContains(response, text)
+    
+    async def test_transcript_fragment_and_login(self):
+        for _ in range(2):
+            # The second request renders the cached transcript fragment
+            await sync_to_async(bump_data_version)()
+            response = await self.async_client.get('/students/STU001/')
+            self.assertContains(response, 'Programming')
+            self.assertContains(response, '1 / 1')
+            self.assertNotContains(response, '>Edit</a>')
+        
+        user = await User.objects.acreate_user('teacher', password='secret')
+        await self.async_client.aforce_login(user)
+        response = await self.async_client.get('/students/STU001/')
+        self.assertContains(response, '>Edit</a>')
+        self.assertIn('private', response['Cache-Control'])
+    
+    async def test_cache_io_off_the_event_loop(self):
+        threads = []
+        
+        def version(*args):
+            threads.append(threading.get_ident())
+            return transcript_version(*args)
+        
+        with mock.patch('results.async_views.transcript_version', version):
+            response = await self.async_client.get('/students/STU001/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(threads), 1)
+        self.assertNotEqual(threads[0], threading.get_ident())
+
+
+class ProductionSettingsTests(TestCase):
+    def load(self, **environ):
+        sys.modules.pop('student_results.settings_production', None)
+        with mock.patch.dict(os.environ, environ):
+            try:
+                return importlib.import_module('student_results.settings_production')
+            finally:
+                sys.modules.pop('student_results.settings_production', None)
+    
+    def test_secret_key_required(self):
+        with mock.patch.dict(os.environ):
+            os.environ.pop('DJANGO_SECRET_KEY', None)
+            with self.assertRaises(ImproperlyConfigured):
+                self.load()
+        self.assertEqual(self.load(DJANGO_SECRET_KEY='from-the-environment').SECRET_KEY, 'from-the-environment')
+
+
+class ThumbnailTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        override = override_settings(MEDIA_ROOT=self.media_root)
+        override.enable()
+        self.addCleanup(override.disable)
+    
+    def photo(self, color='red', name='photo.jpg'):
+        from PIL import Image
+        
+        output = io.BytesIO()
+        Image.new('RGB', (1200, 900), color).save(output, 'JPEG')
+        return SimpleUploadedFile(name, output.getvalue(), content_type='image/jpeg')
+    
+    def test_generated_on_upload(self):
+        from PIL import Image
+        
+        student = create_student(photo=self.photo())
+        self.assertEqual(set(student.thumbnails), set(THUMBNAIL_SIZES))
+        self.assertEqual(Student.objects.get(pk=student.pk).thumbnails, student.thumbnails)
+        with Image.open(f"{self.media_root}/{student.thumbnails['small']}") as image:
+            self.assertEqual(max(image.size), THUMBNAIL_SIZES['small'])
+        
+        # Same content, same names; new content, new names; no photo, no thumbnails
+        names = dict(student.thumbnails)
+        student.photo = self.photo(name='again.jpg')
+        student.save()
+        self.assertEqual(student.thumbnails, names)
+        student.photo = self.photo(color='blue')
+        student.save()
+        self.assertNotEqual(student.thumbnails['small'], names['small'])
+        student.photo = None
+        student.save()
+        self.assertEqual(Student.objects.get(pk=student.pk).thumbnails, {})
+    
+    def test_served_lazily_with_long_cache(self):
+        student = create_student(photo=self.photo())
+        response = self.client.get(reverse('student_list'))
+        self.assertContains(response, f'src="{student.thumbnail_small_url}"')
+        self.assertContains(response, 'loading="lazy"')
+        
+        response = self.client.get(student.thumbnail_small_url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertIn('max-age=31536000', response['Cache-Control'])
+        response.close()
+        self.assertEqual(self.client.get(reverse('student_thumbnail', args=['secrets.jpg'])).status_code, 404)
+
+
+class JobTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        override = override_settings(MEDIA_ROOT=self.media_root, RESULTS_JOB_RETRY_DELAY=30)
+        override.enable()
+        self.addCleanup(override.disable)
+        
+        self.user = User.objects.create_user('teacher', password='secret')
+        self.client.force_login(self.user)
+        self.student = create_student()
+        self.course = Course.objects.create(course_code='CS101', course_name='Programming', credits=3, semester='Fall 2025')
+    
+    def test_import_runs_in_worker(self):
+        sheet = SimpleUploadedFile(
+            'marks.csv',
+            b'student_id,course_code,marks,exam_date\n'
+            b'STU001,CS101,91,2025-12-01\n'
+            b'STU404,CS101,50,2025-12-01\n',
+        )
+        response = self.client.post(reverse('result_import'), {'file': sheet})
+        job = Job.objects.get()
+        self.assertRedirects(response, reverse('job_detail', args=[job.pk]))
+        self.assertEqual((job.kind, job.status), (Job.KIND_IMPORT, Job.QUEUED))
+        self.assertFalse(Result.objects.exists())
+        
+        run_jobs()
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.SUCCEEDED)
+        self.assertEqual((job.result['imported'], job.result['rejected']), (1, 1))
+        self.assertEqual(job.result['errors'], [[3, 'unknown student_id "STU404"']])
+        self.assertEqual(Result.objects.get().grade, 'A+')
+        self.assertFalse(job.input_file)
+        
+        status = self.client.get(reverse('job_status', args=[job.pk])).json()
+        self.assertEqual((status['status'], status['percent'], status['finished']), ('succeeded', 100, True))
+        self.assertContains(self.client.get(reverse('job_detail', args=[job.pk])), 'unknown student_id')
+    
+    def test_bad_upload_fails_without_retry(self):
+        sheet = SimpleUploadedFile('marks.csv', b'student_id,marks\nSTU001,91\n')
+        self.client.post(reverse('result_import'), {'file': sheet})
+        run_jobs()
+        job = Job.objects.get()
+        self.assertEqual((job.status, job.attempts), (Job.FAILED, 1))
+        self.assertIn('Missing required column(s): course_code, exam_date', job.error)
+    
+    def test_export_job_and_download(self):
+        Result.objects.create(student=self.student, course=self.course, marks=88, exam_date=date(2025, 12, 1))
+        response = self.client.post(reverse('result_export'), {'semester': 'Fall 2025', 'format': 'csv'})
+        job = Job.objects.get()
+        self.assertEqual(job.params, {'semester': 'Fall 2025', 'format': 'csv'})
+        self.assertRedirects(response, reverse('job_detail', args=[job.pk]))
+        self.assertEqual(self.client.get(reverse('job_download', args=[job.pk])).status_code, 404)
+        
+        run_jobs()
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.result, job.progress, job.total), (Job.SUCCEEDED, {'rows': 1}, 1, 1))
+        response = self.client.get(reverse('job_download', args=[job.pk]))
+        content = b''.join(response.streaming_content).decode()
+        self.assertEqual(content.splitlines()[1].split(',')[:4], ['STU001', 'Emily', 'Johnson', 'CS101'])
+    
+    def test_retries_with_backoff_then_fails(self):
+        def flaky(job, report):
+            raise RuntimeError('database went away')
+        
+        with mock.patch.dict(HANDLERS, {Job.KIND_REGRADE: flaky}), self.assertLogs('results.jobs', 'ERROR'):
+            job = enqueue(Job.KIND_REGRADE)
+            run_job(claim_job('test'))
+            job.refresh_from_db()
+            self.assertEqual((job.status, job.attempts), (Job.QUEUED, 1))
+            self.assertEqual(job.error_summary, 'RuntimeError: database went away')
+            # Not due again until the backoff has passed; the delay doubles per attempt
+            self.assertIsNone(claim_job('test'))
+            self.assertAlmostEqual((job.run_after - timezone.now()).total_seconds(), 30, delta=5)
+            run_job(claim_job('test', now=job.run_after))
+            job.refresh_from_db()
+            self.assertAlmostEqual((job.run_after - timezone.now()).total_seconds(), 60, delta=5)
+            run_job(claim_job('test', now=job.run_after))
+        
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.FAILED, 3))
+        self.assertIsNotNone(job.finished_at)
+    
+    def test_stale_running_job_is_requeued(self):
+        job = enqueue(Job.KIND_REBUILD_STANDINGS)
+        claimed = claim_job('worker-1')
+        self.assertEqual((claimed.pk, claimed.status, claimed.locked_by), (job.pk, Job.RUNNING, 'worker-1'))
+        self.assertIsNone(claim_job('worker-2'))
+        
+        # worker-1 dies; once its heartbeat is stale another worker takes over
+        later = timezone.now() + timedelta(seconds=settings.RESULTS_JOB_STALE_AFTER + 1)
+        reclaimed = claim_job('worker-2', now=later)
+        self.assertEqual((reclaimed.pk, reclaimed.locked_by, reclaimed.attempts), (job.pk, 'worker-2', 2))
+        self.assertEqual(run_job(reclaimed).status, Job.SUCCEEDED)
+    
+    def test_worker_given_up_on_cannot_overwrite(self):
+        job = enqueue(Job.KIND_REBUILD_STANDINGS)
+        slow = claim_job('worker-1')
+        later = timezone.now() + timedelta(seconds=settings.RESULTS_JOB_STALE_AFTER + 1)
+        reclaimed = claim_job('worker-2', now=later)
+        
+        def failing(job, report):
+            report(5, message='still here', force=True)
+            raise PermanentJobError('too late')
+        
+        # worker-1 was only slow: its progress and outcome are both dropped
+        with mock.patch.dict(HANDLERS, {Job.KIND_REBUILD_STANDINGS: failing}), self.assertLogs('results.jobs', 'WARNING'):
+            self.assertEqual(run_job(slow).status, Job.RUNNING)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.locked_by, job.progress, job.message, job.error), (Job.RUNNING, 'worker-2', 0, '', ''))
+        
+        self.assertEqual(run_job(reclaimed).status, Job.SUCCEEDED)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.locked_by), (Job.SUCCEEDED, ''))
+    
+    def test_long_steps_refresh_the_heartbeat(self):
+        Result.objects.create(student=self.student, course=self.course, marks=88, exam_date=date(2025, 12, 1))
+        for kind in [Job.KIND_REGRADE, Job.KIND_REBUILD_STANDINGS]:
+            with self.subTest(kind=kind), mock.patch.object(ProgressReporter, 'heartbeat', autospec=True) as heartbeat:
+                enqueue(kind, {'semester': 'Fall 2025'})
+                job = run_job(claim_job('test'))
+                self.assertEqual(job.status, Job.SUCCEEDED)
+                self.assertTrue(heartbeat.called)
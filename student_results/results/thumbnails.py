@@ -0,0 +1,110 @@
+"""
+Fixed-size thumbnails for ``Student.photo``.
+
+When a photo is saved, each size in ``THUMBNAIL_SIZES`` is rendered once:
+``Image.draft()`` lets the JPEG decoder downscale while decoding (so a 12 MB
+phone photo is never fully decompressed), EXIF orientation is applied, and
+``Image.thumbnail()`` does the final resize. Thumbnails are stored as WebP
+(JPEG where Pillow lacks WebP support) under a name derived from the source
+file's SHA-256, so identical uploads share files and a name never changes
+content; ``thumbnail_view`` serves them with an immutable, year-long
+``Cache-Control``. Pillow is imported on first use, not at startup.
+"""
+import hashlib
+import io
+import re
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.http import FileResponse, Http404
+from django.urls import reverse
+from django.utils.cache import patch_cache_control
+from django.utils.http import quote_etag
+
+
+# Rendered square bounds in pixels: list cards and the profile header (2x for HiDPI)
+THUMBNAIL_SIZES = {
+    'small': 160,
+    'medium': 480,
+}
+THUMBNAIL_DIR = 'thumbs'
+THUMBNAIL_MAX_AGE = 60 * 60 * 24 * 365
+WEBP_QUALITY = 80
+JPEG_QUALITY = 82
+
+THUMBNAIL_NAME = re.compile(r'^[0-9a-f]{16}-\d+\.(webp|jpg)$')
+
+
+def _output_format():
+    from PIL import features
+    
+    return ('WEBP', 'webp') if features.check('webp') else ('JPEG', 'jpg')
+
+
+def source_digest(fileobj):
+    """Short SHA-256 of the uploaded file, read in chunks"""
+    digest = hashlib.sha256()
+    fileobj.seek(0)
+    for chunk in iter(lambda: fileobj.read(1 << 16), b''):
+        digest.update(chunk)
+    fileobj.seek(0)
+    return digest.hexdigest()[:16]
+
+
+def render_thumbnail(fileobj, size, image_format):
+    """Return the encoded bytes of ``fileobj`` scaled to fit ``size`` x ``size``"""
+    from PIL import Image, ImageOps
+    
+    fileobj.seek(0)
+    with Image.open(fileobj) as image:
+        # JPEG only: decode at the smallest 1/2, 1/4 or 1/8 scale still >= size
+        image.draft('RGB', (size, size))
+        image = ImageOps.exif_transpose(image)
+        if image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGBA' if 'transparency' in image.info else 'RGB')
+        if image_format == 'JPEG' and image.mode == 'RGBA':
+            image = image.convert('RGB')
+        image.thumbnail((size, size), Image.Resampling.LANCZOS)
+        
+        output = io.BytesIO()
+        if image_format == 'WEBP':
+            image.save(output, 'WEBP', quality=WEBP_QUALITY, method=4)
+        else:
+            image.save(output, 'JPEG', quality=JPEG_QUALITY, optimize=True, progressive=True)
+        return output.getvalue()
+
+
+def generate_thumbnails(photo):
+    """Render every size for ``photo`` (a FieldFile) and return ``{size name: storage name}``"""
+    image_format, extension = _output_format()
+    with photo.open('rb') as fileobj:
+        digest = source_digest(fileobj)
+        thumbnails = {}
+        for label, size in THUMBNAIL_SIZES.items():
+            name = f'{THUMBNAIL_DIR}/{digest}-{size}.{extension}'
+            if not default_storage.exists(name):
+                default_storage.save(name, ContentFile(render_thumbnail(fileobj, size, image_format)))
+            thumbnails[label] = name
+    return thumbnails
+
+
+def thumbnail_url(name):
+    """URL of a stored thumbnail (``thumbs/<digest>-<size>.<ext>``)"""
+    return reverse('student_thumbnail', args=[name.rsplit('/', 1)[-1]])
+
+
+def thumbnail_view(request, name):
+    """Serve a thumbnail; its name changes whenever its content would"""
+    if not THUMBNAIL_NAME.match(name):
+        raise Http404
+    path = f'{THUMBNAIL_DIR}/{name}'
+    try:
+        fileobj = default_storage.open(path, 'rb')
+    except (FileNotFoundError, OSError):
+        raise Http404
+    
+    content_type = 'image/webp' if name.endswith('.webp') else 'image/jpeg'
+    response = FileResponse(fileobj, content_type=content_type)
+    patch_cache_control(response, public=True, max_age=THUMBNAIL_MAX_AGE, immutable=True)
+    response.headers['ETag'] = quote_etag(name)
+    return response
@@ -1,27 +1,56 @@
-from django.urls import path
+from django.conf import settings
+from django.urls import path, include
 from . import views
+from .metrics import metrics_view
+from .thumbnails import thumbnail_view
+
+if settings.RESULTS_ASYNC_VIEWS:
+    from . import async_views as read_views
+else:
+    read_views = views
 
 urlpatterns = [
     # Home and authentication
-    path('', views.home, name='home'),
+    path('', read_views.home, name='home'),
     path('login/', views.login_view, name='login'),
     path('logout/', views.logout_view, name='logout'),
     path('dashboard/', views.dashboard, name='dashboard'),
     
     # Student URLs
     path('students/', views.student_list, name='student_list'),
-    path('students/<str:student_id>/', views.student_detail, name='student_detail'),
+    path('students/<str:student_id>/', read_views.student_detail, name='student_detail'),
     path('students/create/new/', views.student_create, name='student_create'),
     path('students/<str:student_id>/edit/', views.student_edit, name='student_edit'),
     path('students/<str:student_id>/delete/', views.student_delete, name='student_delete'),
+    path('thumbnails/<str:name>', thumbnail_view, name='student_thumbnail'),
     
     # Course URLs
-    path('courses/', views.course_list, name='course_list'),
+    path('courses/', read_views.course_list, name='course_list'),
     path('courses/create/', views.course_create, name='course_create'),
+    path('courses/statistics/', views.course_analytics, name='course_analytics'),
+    path('courses/<str:course_code>/leaderboard/', views.course_leaderboard_view, name='course_leaderboard'),
     
     # Result URLs
     path('results/create/', views.result_create, name='result_create'),
+    path('results/import/', views.result_import, name='result_import'),
+    path('results/export/', views.result_export, name='result_export'),
     path('results/<int:result_id>/edit/', views.result_edit, name='result_edit'),
     path('results/<int:result_id>/delete/', views.result_delete, name='result_delete'),
-    path('results/search/', views.search_results, name='search_results'),
+    path('results/search/', read_views.search_results, name='search_results'),
+    
+    # Background jobs
+    path('jobs/<int:job_id>/', views.job_detail, name='job_detail'),
+    path('jobs/<int:job_id>/status/', views.job_status, name='job_status'),
+    path('jobs/<int:job_id>/download/', views.job_download, name='job_download'),
+    path('jobs/<str:kind>/enqueue/', views.job_enqueue, name='job_enqueue'),
+    
+    # Autocomplete (JSON)
+    path('autocomplete/students/', views.student_autocomplete, name='student_autocomplete'),
+    path('autocomplete/courses/', views.course_autocomplete, name='course_autocomplete'),
+    
+    # JSON API
+    path('api/v1/', include('results.api_urls')),
+    
+    # Prometheus metrics (only when RESULTS_QUERY_METRICS is enabled)
+    path('metrics', metrics_view, name='metrics'),
 ]
@@ -1,20 +1,28 @@
+from django.conf import settings
+from django.http import FileResponse, Http404, JsonResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.functional import SimpleLazyObject
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth import login, logout, authenticate
 from django.contrib import messages
 from django.db.models import Q, Avg, Count
-from .models import Student, Course, Teacher, Result
-from .forms import StudentForm, CourseForm, ResultForm
+from .models import Student, Course, Teacher, Result, Job
+from .forms import StudentForm, CourseForm, ResultForm, ResultImportForm
+from .exports import filtered_results, export_lines, EXPORT_FORMATS, EXPORT_FILTERS
+from .jobs import enqueue
+from .pagination import paginate
+from .stats import get_site_stats
+from .caching import cache_public_page, public_cache_control, transcript_version
+from .ranking import student_course_rankings, course_leaderboard
+from .analytics import course_statistics, grade_histogram
+from . import search
 
 
+@public_cache_control(max_age=60, stale_while_revalidate=300)
 def home(request):
     """Home page view"""
-    context = {
-        'total_students': Student.objects.count(),
-        'total_courses': Course.objects.count(),
-        'total_results': Result.objects.count(),
-    }
-    return render(request, 'results/home.html', context)
+    return render(request, 'results/home.html', get_site_stats())
 
 
 def login_view(request):
@@ -46,44 +54,58 @@ def logout_view(request):
 def dashboard(request):
     """Dashboard view for logged-in users"""
     context = {
-        'total_students': Student.objects.count(),
-        'total_courses': Course.objects.count(),
-        'total_results': Result.objects.count(),
+        **get_site_stats(),
         'recent_results': Result.objects.select_related('student', 'course').order_by('-created_at')[:10],
+        'recent_jobs': Job.objects.exclude(kind__in=Job.RERANK_KINDS).select_related('created_by')[:5],
+        'semesters': Course.objects.order_by('semester').values_list('semester', flat=True).distinct(),
     }
     return render(request, 'results/dashboard.html', context)
 
 
+@public_cache_control(max_age=60, stale_while_revalidate=300)
 def student_list(request):
     """List all students with search functionality"""
     search_query = request.GET.get('search', '')
     students = Student.objects.all()
+    ordering = ('student_id',)
     
     if search_query:
-        students = students.filter(
-            Q(student_id__icontains=search_query) |
-            Q(first_name__icontains=search_query) |
-            Q(last_name__icontains=search_query) |
-            Q(email__icontains=search_query)
-        )
+        students = search.search_students(search_query)
+        ordering = ('-rank', 'student_id')
+    
+    page = paginate(request, students, ordering)
     
     context = {
-        'students': students,
+        'students': page.object_list,
+        'page': page,
         'search_query': search_query,
     }
     return render(request, 'results/student_list.html', context)
 
 
+@public_cache_control(max_age=60, stale_while_revalidate=300)
+@cache_public_page
 def student_detail(request, student_id):
     """View student details and their results"""
-    student = get_object_or_404(Student, student_id=student_id)
-    results = Result.objects.filter(student=student).select_related('course')
+    student = get_object_or_404(Student.objects.select_related('standing'), student_id=student_id)
     gpa = student.calculate_gpa()
+    course_ids = Result.objects.filter(student=student).values_list('course_id', flat=True)
+    
+    def transcript():
+        # Only evaluated when the cached transcript fragment is missing
+        results = list(Result.objects.filter(student=student).select_related('course'))
+        course_rankings = student_course_rankings(student)
+        for result in results:
+            result.course_ranking = course_rankings.get(result.pk)
+        return results
     
     context = {
         'student': student,
-        'results': results,
+        'results': SimpleLazyObject(transcript),
+        'transcript_version': transcript_version(student.pk, course_ids),
+        'fragment_cache_timeout': settings.RESULTS_FRAGMENT_CACHE_TIMEOUT,
         'gpa': gpa,
+        'semester_rankings': list(student.semester_rankings.all()),
     }
     return render(request, 'results/student_detail.html', context)
 
@@ -134,10 +156,48 @@ def student_delete(request, student_id):
     return render(request, 'results/student_confirm_delete.html', {'student': student})
 
 
+@public_cache_control(max_age=300, stale_while_revalidate=600)
+@cache_public_page
 def course_list(request):
     """List all courses"""
+    page = paginate(request, Course.objects.all(), ('course_code',))
+    return render(request, 'results/course_list.html', {'courses': page.object_list, 'page': page})
+
+
+@public_cache_control(max_age=300, stale_while_revalidate=600)
+@cache_public_page
+def course_analytics(request):
+    """Mark statistics and grade distribution for each course"""
+    semester = request.GET.get('semester', '')
     courses = Course.objects.all()
-    return render(request, 'results/course_list.html', {'courses': courses})
+    if semester:
+        courses = courses.filter(semester=semester)
+    page = paginate(request, courses, ('course_code',))
+    
+    stats = course_statistics([course.pk for course in page.object_list])
+    for course in page.object_list:
+        course.stats = stats[course.pk]
+        course.histogram = grade_histogram(course.stats)
+    
+    return render(request, 'results/course_analytics.html', {
+        'courses': page.object_list,
+        'page': page,
+        'semester': semester,
+        'semesters': Course.objects.order_by('semester').values_list('semester', flat=True).distinct(),
+    })
+
+
+@public_cache_control(max_age=300, stale_while_revalidate=600)
+@cache_public_page
+def course_leaderboard_view(request, course_code):
+    """Results of a course by precomputed rank, best first"""
+    course = get_object_or_404(Course, course_code=course_code)
+    page = paginate(request, course_leaderboard(course), ('rank', 'result_id'), per_page=50)
+    return render(request, 'results/course_leaderboard.html', {
+        'course': course,
+        'rankings': page.object_list,
+        'page': page,
+    })
 
 
 @login_required
@@ -172,6 +232,22 @@ def result_create(request):
     return render(request, 'results/result_form.html', {'form': form})
 
 
+@login_required
+def result_import(request):
+    """Queue a bulk import of an uploaded marks sheet; the worker runs it"""
+    if request.method == 'POST':
+        form = ResultImportForm(request.POST, request.FILES)
+        if form.is_valid():
+            upload = form.cleaned_data['file']
+            job = enqueue(Job.KIND_IMPORT, {'filename': upload.name}, created_by=request.user, input_file=upload)
+            messages.info(request, f'{upload.name} has been queued for import.')
+            return redirect('job_detail', job_id=job.pk)
+    else:
+        form = ResultImportForm()
+    
+    return render(request, 'results/result_import.html', {'form': form})
+
+
 @login_required
 def result_edit(request, result_id):
     """Edit an existing result"""
@@ -203,22 +279,156 @@ def result_delete(request, result_id):
     return render(request, 'results/result_confirm_delete.html', {'result': result})
 
 
+@login_required
+def result_export(request):
+    """Stream results as CSV or JSON Lines, filtered by semester, course, grade or student.
+    
+    A POST with the same fields queues the export as a background job instead.
+    """
+    data = request.POST if request.method == 'POST' else request.GET
+    export_format = data.get('format', 'csv')
+    if export_format not in EXPORT_FORMATS:
+        export_format = 'csv'
+    
+    if request.method == 'POST':
+        params = {name: data[name] for name in EXPORT_FILTERS if data.get(name)}
+        job = enqueue(Job.KIND_EXPORT, {**params, 'format': export_format}, created_by=request.user)
+        messages.info(request, 'The export has been queued.')
+        return redirect('job_detail', job_id=job.pk)
+    
+    results = filtered_results(**{name: data.get(name) for name in EXPORT_FILTERS})
+    
+    response = StreamingHttpResponse(
+        export_lines(results, export_format),
+        content_type=EXPORT_FORMATS[export_format],
+    )
+    filename = f"results-{timezone.now():%Y%m%d}.{export_format}"
+    if data.get('student'):
+        filename = f"transcript-{data['student']}.{export_format}"
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+# Recomputations that can be queued from the dashboard
+ENQUEUEABLE_JOBS = [Job.KIND_REGRADE, Job.KIND_REBUILD_STANDINGS]
+
+
+@login_required
+def job_enqueue(request, kind):
+    """Queue a regrade or a standings rebuild"""
+    if kind not in ENQUEUEABLE_JOBS:
+        raise Http404
+    if request.method != 'POST':
+        return redirect('dashboard')
+    
+    params = {'course': request.POST['course']} if request.POST.get('course') else {}
+    job = enqueue(kind, params, created_by=request.user)
+    messages.info(request, f'{job.get_kind_display()} has been queued.')
+    return redirect('job_detail', job_id=job.pk)
+
+
+def _job_status(job):
+    return {
+        'id': job.pk,
+        'kind': job.kind,
+        'status': job.status,
+        'status_display': job.get_status_display(),
+        'finished': job.is_finished,
+        'progress': job.progress,
+        'total': job.total,
+        'percent': job.percent,
+        'message': job.message,
+        'attempts': job.attempts,
+        'error': job.error_summary,
+        'result': {key: value for key, value in job.result.items() if key != 'errors'},
+    }
+
+
+@login_required
+def job_detail(request, job_id):
+    """Progress of a background job; the page polls job_status until it finishes"""
+    job = get_object_or_404(Job.objects.select_related('created_by'), pk=job_id)
+    return render(request, 'results/job_detail.html', {'job': job})
+
+
+@login_required
+def job_status(request, job_id):
+    """Current state of a job as JSON"""
+    job = get_object_or_404(Job, pk=job_id)
+    response = JsonResponse(_job_status(job))
+    response['Cache-Control'] = 'no-store'
+    return response
+
+
+@login_required
+def job_download(request, job_id):
+    """The file written by a finished export job"""
+    job = get_object_or_404(Job, pk=job_id, kind=Job.KIND_EXPORT, status=Job.SUCCEEDED)
+    if not job.output_file:
+        raise Http404
+    return FileResponse(
+        job.output_file.open('rb'),
+        as_attachment=True,
+        filename=job.output_file.name.rsplit('/', 1)[-1],
+    )
+
+
+AUTOCOMPLETE_LIMIT = 20
+
+
+@login_required
+def student_autocomplete(request):
+    """Prefix search over student ID and names for the result form"""
+    query = request.GET.get('q', '').strip()
+    students = []
+    
+    if query:
+        students = Student.objects.filter(
+            Q(student_id__istartswith=query) |
+            Q(first_name__istartswith=query) |
+            Q(last_name__istartswith=query)
+        ).values('id', 'student_id', 'first_name', 'last_name')[:AUTOCOMPLETE_LIMIT]
+    
+    return JsonResponse({'results': [
+        {'id': s['id'], 'text': f"{s['student_id']} - {s['first_name']} {s['last_name']}"}
+        for s in students
+    ]})
+
+
+@login_required
+def course_autocomplete(request):
+    """Prefix search over course code and name for the result form"""
+    query = request.GET.get('q', '').strip()
+    courses = []
+    
+    if query:
+        courses = Course.objects.filter(
+            Q(course_code__istartswith=query) |
+            Q(course_name__istartswith=query)
+        ).values('id', 'course_code', 'course_name')[:AUTOCOMPLETE_LIMIT]
+    
+    return JsonResponse({'results': [
+        {'id': c['id'], 'text': f"{c['course_code']} - {c['course_name']}"}
+        for c in courses
+    ]})
+
+
+@public_cache_control(max_age=30, stale_while_revalidate=120)
+@cache_public_page
 def search_results(request):
     """Search for student results"""
     search_query = request.GET.get('search', '')
     results = []
+    page = None
     
     if search_query:
-        results = Result.objects.filter(
-            Q(student__student_id__icontains=search_query) |
-            Q(student__first_name__icontains=search_query) |
-            Q(student__last_name__icontains=search_query) |
-            Q(course__course_code__icontains=search_query) |
-            Q(course__course_name__icontains=search_query)
-        ).select_related('student', 'course')
+        results = search.search_results(search_query)
+        page = paginate(request, results, ('-rank', '-exam_date', '-id'), per_page=50)
+        results = page.object_list
     
     context = {
         'results': results,
+        'page': page,
         'search_query': search_query,
     }
     return render(request, 'results/search_results.html', context)
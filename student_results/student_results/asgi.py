@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'student_results.settings')
+# Serve the read-heavy pages with the async views (results/async_views.py)
+os.environ.setdefault('RESULTS_ASYNC_VIEWS', '1')
 
 application = get_asgi_application()
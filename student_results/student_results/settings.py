@@ -5,6 +5,7 @@ Django settings for student_results project.
 from pathlib import Path
 import os
 import dj_database_url
+from django.core.exceptions import ImproperlyConfigured
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -37,6 +38,9 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
+    # Compress the body after the weak ETag has been taken from it
+    'results.middleware.CompressionMiddleware',
+    'results.middleware.ConditionalGetMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -80,9 +84,98 @@ DATABASES = {
     }
 }
 
-db_from_env = dj_database_url.config(conn_max_age=600)
+# Connection handling, selected with DATABASE_POOL_MODE:
+#   persistent - each process keeps its connection open for DATABASE_CONN_MAX_AGE
+#                seconds (default 600); suits long-running servers
+#   pgbouncer  - connect through a transaction-mode pooler (PgBouncer, Supavisor,
+#                Neon's "-pooler" host); connections close after each request
+#                unless DATABASE_CONN_MAX_AGE is set, and server-side cursors
+#                are disabled because they cannot outlive a pooled transaction
+#   pool       - psycopg 3 connection pool inside each process, bounded by
+#                DATABASE_POOL_MAX_SIZE (psycopg[pool], in requirements.txt)
+# Use pgbouncer on serverless platforms: every lambda instance holds its own
+# connections, so only an external pooler keeps the server-side count bounded.
+DATABASE_POOL_MODE = os.environ.get('DATABASE_POOL_MODE', 'persistent')
+if DATABASE_POOL_MODE not in ('persistent', 'pgbouncer', 'pool'):
+    raise ImproperlyConfigured(f'Unknown DATABASE_POOL_MODE "{DATABASE_POOL_MODE}"')
+
+if DATABASE_POOL_MODE == 'persistent':
+    conn_max_age = int(os.environ.get('DATABASE_CONN_MAX_AGE', 600))
+else:
+    conn_max_age = int(os.environ.get('DATABASE_CONN_MAX_AGE', 0))
+
+db_from_env = dj_database_url.config(conn_max_age=conn_max_age, conn_health_checks=True)
 DATABASES['default'].update(db_from_env)
 
+if DATABASES['default']['ENGINE'] == 'django.db.backends.postgresql':
+    if DATABASE_POOL_MODE == 'pgbouncer':
+        DATABASES['default']['DISABLE_SERVER_SIDE_CURSORS'] = True
+    elif DATABASE_POOL_MODE == 'pool':
+        DATABASES['default']['CONN_MAX_AGE'] = 0
+        DATABASES['default'].setdefault('OPTIONS', {})['pool'] = {
+            'min_size': int(os.environ.get('DATABASE_POOL_MIN_SIZE', 0)),
+            'max_size': int(os.environ.get('DATABASE_POOL_MAX_SIZE', 4)),
+            'timeout': float(os.environ.get('DATABASE_POOL_TIMEOUT', 10)),
+        }
+
+
+# Cache
+# Local memory by default; point CACHE_BACKEND/CACHE_LOCATION at a shared
+# cache (e.g. django.core.cache.backends.redis.RedisCache) in production so
+# workers share entries. Invalidation does not depend on it: the version
+# counters cached entries are keyed by live in the database.
+
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('CACHE_LOCATION', 'student-results'),
+    }
+}
+
+# Safety-net TTL (seconds) for the cached home/dashboard counts
+RESULTS_STATS_CACHE_TIMEOUT = int(os.environ.get('RESULTS_STATS_CACHE_TIMEOUT', 60))
+
+# TTL (seconds) for cached public pages; edits invalidate them immediately,
+# in every process
+RESULTS_PAGE_CACHE_TIMEOUT = int(os.environ.get('RESULTS_PAGE_CACHE_TIMEOUT', 300))
+
+# TTL (seconds) for per-course statistics; result changes invalidate them
+RESULTS_COURSE_STATS_CACHE_TIMEOUT = int(os.environ.get('RESULTS_COURSE_STATS_CACHE_TIMEOUT', 86400))
+
+# Route the read-heavy public pages to their async versions
+# (results/async_views.py); asgi.py turns this on unless it is set
+RESULTS_ASYNC_VIEWS = os.environ.get('RESULTS_ASYNC_VIEWS', '0') == '1'
+
+# Dynamic responses smaller than this many bytes are sent uncompressed;
+# larger ones use Brotli (if the brotli package is installed) or gzip
+RESULTS_COMPRESSION_MIN_SIZE = int(os.environ.get('RESULTS_COMPRESSION_MIN_SIZE', 1024))
+RESULTS_BROTLI_QUALITY = int(os.environ.get('RESULTS_BROTLI_QUALITY', 5))
+
+# TTL (seconds) for cached template fragments such as a student's transcript
+# table; they are keyed by data versions, so edits invalidate them immediately
+RESULTS_FRAGMENT_CACHE_TIMEOUT = int(os.environ.get('RESULTS_FRAGMENT_CACHE_TIMEOUT', 86400))
+
+# Background jobs (results/jobs.py, run by `manage.py run_worker`): seconds
+# before the first retry of a failed job (doubling per attempt), and how long
+# a running job may go without a progress heartbeat before it is requeued
+RESULTS_JOB_RETRY_DELAY = int(os.environ.get('RESULTS_JOB_RETRY_DELAY', 30))
+RESULTS_JOB_STALE_AFTER = int(os.environ.get('RESULTS_JOB_STALE_AFTER', 600))
+
+
+# Query metrics: per-request query counts and SQL time in Server-Timing
+# headers, plus Prometheus counters at /metrics (protected by
+# RESULTS_METRICS_TOKEN as a bearer token when set). Off by default.
+RESULTS_QUERY_METRICS = os.environ.get('RESULTS_QUERY_METRICS', '0') == '1'
+RESULTS_METRICS_TOKEN = os.environ.get('RESULTS_METRICS_TOKEN', '')
+# Log a possible N+1 when one statement runs this many times in a request
+RESULTS_REPEATED_QUERY_THRESHOLD = int(os.environ.get('RESULTS_REPEATED_QUERY_THRESHOLD', 5))
+# Log a request's slowest statement, with its SQL, when it takes this many milliseconds
+RESULTS_SLOW_QUERY_THRESHOLD_MS = float(os.environ.get('RESULTS_SLOW_QUERY_THRESHOLD_MS', 100))
+
+if RESULTS_QUERY_METRICS:
+    # First, so session and authentication queries are counted too
+    MIDDLEWARE.insert(0, 'results.metrics.QueryMetricsMiddleware')
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -121,7 +214,16 @@ USE_TZ = True
 STATIC_URL = '/static/'
 STATICFILES_DIRS = [BASE_DIR / 'static']
 STATIC_ROOT = BASE_DIR / 'staticfiles'
-STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
+
+# Once collectstatic has run, templates link content-hashed, pre-compressed
+# files (base.3f2a1c9e.css) that WhiteNoise serves with year-long cache
+# headers. Without a manifest (development, tests) files are linked unhashed
+# and served straight from the app directories.
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'results.storage.OptionalManifestStaticFilesStorage'},
+}
+WHITENOISE_USE_FINDERS = not (STATIC_ROOT / 'staticfiles.json').exists()
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
@@ -0,0 +1,62 @@
+"""
+Slim production settings for the serverless (Vercel) deployment.
+
+Everything not set here comes from settings.py. This profile trims work done
+on every cold start and every request:
+
+- DEBUG off, and templates compiled once per process by the cached loader
+- signed-cookie sessions, so reading request.user costs no session query
+- the admin can be left out of the public lambda with DJANGO_ADMIN_ENABLED=0
+
+DJANGO_SECRET_KEY must be set: it signs the session cookies, so the key
+committed in settings.py would let anyone forge a login.
+"""
+
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+from .settings import *  # noqa: F401,F403
+
+
+DEBUG = os.environ.get('DJANGO_DEBUG', '0') == '1'
+
+SECRET_KEY = os.environ.get('DJANGO_SECRET_KEY')
+if not SECRET_KEY:
+    raise ImproperlyConfigured('Set DJANGO_SECRET_KEY for the production settings')
+
+# The admin (and its ~30 modules, imported at startup by autodiscover) is only
+# needed where staff log in; deploy it separately if the public site is hot.
+if os.environ.get('DJANGO_ADMIN_ENABLED', '1') != '1':
+    INSTALLED_APPS = [app for app in INSTALLED_APPS if app != 'django.contrib.admin']  # noqa: F405
+
+SESSION_ENGINE = 'django.contrib.sessions.backends.signed_cookies'
+SESSION_COOKIE_SECURE = True
+CSRF_COOKIE_SECURE = True
+
+TEMPLATES = [{
+    **TEMPLATES[0],  # noqa: F405
+    'APP_DIRS': False,
+    'OPTIONS': {
+        **TEMPLATES[0]['OPTIONS'],  # noqa: F405
+        'loaders': [
+            ('django.template.loaders.cached.Loader', [
+                'django.template.loaders.filesystem.Loader',
+                'django.template.loaders.app_directories.Loader',
+            ]),
+        ],
+    },
+}]
+
+# Run collectstatic in the build step to get hashed, compressed assets (see
+# settings.py); if a file is missing from the manifest, fall back to its
+# unhashed name instead of raising.
+STATICFILES_DIRS = []
+WHITENOISE_MANIFEST_STRICT = False
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {'console': {'class': 'logging.StreamHandler'}},
+    'root': {'handlers': ['console'], 'level': 'WARNING'},
+}
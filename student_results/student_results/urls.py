@@ -1,16 +1,21 @@
 """
 URL configuration for student_results project.
 """
-from django.contrib import admin
+from django.apps import apps
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 
 urlpatterns = [
-    path('admin/', admin.site.urls),
     path('', include('results.urls')),
 ]
 
+# The slim production profile can leave the admin out entirely
+if apps.is_installed('django.contrib.admin'):
+    from django.contrib import admin
+    
+    urlpatterns.insert(0, path('admin/', admin.site.urls))
+
 if settings.DEBUG:
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
     urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)